@@ -1,7 +1,37 @@
 """KernelView - System information tool with Debian-themed output."""
 
-from .core import get_system_info, display_system_info  # Import key functions
-from .cli import main  # Import the CLI entry point
-
 __version__ = "1.0.0"  # Match version in pyproject.toml
-__all__ = ["get_system_info", "display_system_info", "main"]  # Public API
\ No newline at end of file
+
+# Public API -> module defining it. Imported on first access, so that
+# `import kernelview` (e.g. for __version__) does not load psutil and friends.
+_LAZY_ATTRIBUTES = {
+    "get_system_info": ".core",
+    "display_system_info": ".core",
+    "collect_system_info": ".core",
+    "iter_system_info": ".core",
+    "get_system_info_async": ".aio",
+    "collect_system_info_async": ".aio",
+    "get_snapshot": ".model",
+    "get_snapshot_async": ".model",
+    "Snapshot": ".model",
+    "main": ".cli",  # CLI entry point
+}
+
+__all__ = [  # Public API
+    "get_system_info", "display_system_info", "collect_system_info", "iter_system_info",
+    "get_system_info_async", "collect_system_info_async", "get_snapshot", "get_snapshot_async", "Snapshot", "main",
+]
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,201 @@
+import asyncio
+import concurrent.futures
+import functools
+import os
+import threading
+import time
+
+from . import cpu_sampler
+from .breaker import CircuitBreaker
+from .cache import FactCache
+from .collector import DEFAULT_MAX_WORKERS, command_killed, _DaemonPool, _Scheduler, _check_dependencies, _run_probe
+from .core import DEFAULT_COMMAND_TIMEOUT, PROBES, _cpu_usage_stats, _kill, format_fields, system_probes
+
+
+async def run_command_async(command, shell=False, suppress_errors=True, timeout=DEFAULT_COMMAND_TIMEOUT):
+    """Coroutine version of core._run_command: returns stripped output, or "".
+
+    The command runs in its own session; on timeout or cancellation its
+    whole process group is killed.
+    """
+    output, _ = await _run_command_async(command, shell, suppress_errors, timeout)
+    return output
+
+
+async def _run_command_async(command, shell, suppress_errors, timeout):
+    # Returns (output, whether the command was killed for running too long)
+    stderr = asyncio.subprocess.DEVNULL if suppress_errors else None
+    options = dict(stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.PIPE, stderr=stderr,
+                   start_new_session=True)
+    try:
+        # Popen runs a string as a command line on Windows, but as a program
+        # name elsewhere
+        if shell or (isinstance(command, str) and os.name == "nt"):
+            process = await asyncio.create_subprocess_shell(command, **options)
+        else:
+            args = [command] if isinstance(command, str) else list(command)
+            process = await asyncio.create_subprocess_exec(*args, **options)
+    except (FileNotFoundError, PermissionError):
+        return "", False
+    try:
+        output, _ = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        await _kill(process)
+        return "", True
+    except asyncio.CancelledError:
+        await _kill(process)
+        raise
+    return output.decode("utf-8").strip() if process.returncode == 0 else "", False
+
+
+class _CommandRunner:
+    """Runs the commands of probe threads on the event loop of one collection.
+
+    Probes call core._run_command from worker threads; with this runner
+    installed (see collector.command_runner) the command is started and
+    reaped by the loop, and cancel() kills every command still running.
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self._lock = threading.Lock()
+        self._running = set()
+        self._cancelled = False
+
+    def __call__(self, command, shell, suppress_errors, timeout):
+        # Runs on the probe's thread, so command_killed() marks that probe
+        coroutine = _run_command_async(command, shell, suppress_errors, timeout)
+        with self._lock:
+            if self._cancelled:
+                coroutine.close()
+                command_killed()
+                return ""
+            try:
+                future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+            except RuntimeError:  # The loop is closed: the collection is long gone
+                coroutine.close()
+                command_killed()
+                return ""
+            self._running.add(future)
+        try:
+            output, killed = future.result()
+        except concurrent.futures.CancelledError:
+            output, killed = "", True
+        finally:
+            with self._lock:
+                self._running.discard(future)
+        if killed:
+            command_killed()
+        return output
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled = True
+            running = list(self._running)
+        for future in running:
+            future.cancel()
+
+
+async def collect_async(probes, max_workers=None, deadline=None, breaker=None):
+    """Coroutine version of collector.collect.
+
+    Probes whose function is a coroutine function run on the event loop;
+    the others run on up to `max_workers` worker threads, with the external
+    commands they start run by the loop. Timeouts, `deadline` and `breaker`
+    work as in iter_collect. Cancelling the coroutine abandons the probes
+    still running and kills their commands.
+    """
+    probes = list(probes)
+    _check_dependencies(probes)
+    if not probes:
+        return {}
+    if max_workers is None:
+        max_workers = min(DEFAULT_MAX_WORKERS, len(probes))
+    loop = asyncio.get_running_loop()
+    runner = _CommandRunner(loop)
+    end = time.monotonic() + deadline if deadline is not None else None
+
+    pool = None
+
+    def submit(probe, args):
+        nonlocal pool
+        if asyncio.iscoroutinefunction(probe.func):
+            # Starts right away on the loop
+            started = loop.create_future()
+            started.set_result(time.monotonic())
+            return loop.create_task(probe.func(*args)), started
+        if pool is None:
+            pool = _DaemonPool(max(1, max_workers))
+        started = concurrent.futures.Future()
+        future = pool.submit(_run_probe, probe, args, end, started.set_result, runner)
+        return asyncio.wrap_future(future), asyncio.wrap_future(started)
+
+    schedule = _Scheduler(probes, submit, breaker, end)
+    try:
+        while schedule.pending or schedule.running:
+            schedule.start(time.monotonic())
+            if not schedule.running:
+                continue
+            done, _ = await asyncio.wait(schedule.waitables(), timeout=schedule.timeout(time.monotonic()),
+                                         return_when=asyncio.FIRST_COMPLETED)
+            now = time.monotonic()
+            schedule.finish(done, now)
+            schedule.expire(now)
+    finally:
+        schedule.cancel()
+        runner.cancel()
+        if pool is not None:
+            pool.shutdown()
+    return {probe.name: schedule.results[probe.name] for probe in probes if not probe.hidden}
+
+
+async def get_cpu_usage_stats_async(min_window=None):
+    """Coroutine version of core.get_cpu_usage_stats: sleeps with asyncio.sleep."""
+    try:
+        usage = await cpu_sampler.default_sampler.sample_async(min_window)
+    except Exception:
+        return None
+    return _cpu_usage_stats(usage)
+
+
+def _async_probes(probes, cpu_window):
+    # Probes with a coroutine version run on the event loop instead of a thread
+    return [
+        probe.bind(functools.partial(get_cpu_usage_stats_async, cpu_window)) if probe.name == "CPU Usage" else probe
+        for probe in probes
+    ]
+
+
+async def collect_system_info_async(fields=None, max_workers=None, cpu_window=None, use_cache=True,
+                                    refresh_cache=False, deadline=None, probe_timeout=None, use_breaker=True,
+                                    io_window=None):
+    """Coroutine version of collect_system_info: returns raw values."""
+    loop = asyncio.get_running_loop()
+    cache = FactCache(read=not refresh_cache) if use_cache or refresh_cache else None
+    breaker = CircuitBreaker() if use_breaker else None
+    probes = system_probes(fields, cpu_window, cache, probe_timeout=probe_timeout, io_window=io_window)
+    probes = _async_probes(probes, cpu_window)
+    raw = await collect_async(probes, max_workers, deadline, breaker)
+    # State files are small, but writing them is still blocking I/O
+    if cache is not None:
+        await loop.run_in_executor(None, cache.save)
+    if breaker is not None:
+        await loop.run_in_executor(None, breaker.save)
+    order = fields and [PROBES.resolve(field) for field in fields]
+    return {field: raw[field] for field in (order or PROBES.fields()) if field in raw}
+
+
+async def get_system_info_async(fields=None, max_workers=None, cpu_window=None, use_cache=True,
+                                refresh_cache=False, deadline=None, probe_timeout=None, use_breaker=True,
+                                io_window=None):
+    """Coroutine version of get_system_info, for asyncio applications.
+
+    Takes the same arguments and returns the same display strings, without
+    blocking the event loop: external commands run as asyncio subprocesses,
+    the CPU usage sampling window is waited out with asyncio.sleep, and
+    probes that make blocking calls (psutil, /proc reads) run on worker
+    threads. Cancelling the call kills the commands still running.
+    """
+    return format_fields(await collect_system_info_async(
+        fields, max_workers, cpu_window, use_cache, refresh_cache, deadline, probe_timeout, use_breaker, io_window,
+    ))
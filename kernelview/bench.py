@@ -0,0 +1,538 @@
+import contextlib
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from . import core, cpu_sampler, cpu_telemetry, disk_sampler, gpu, network, ports, session, storage
+from .packages import Backend, _count_dpkg
+
+# Fixture hosts the probes are benchmarked against, one per CPU count
+DEFAULT_CORES = [2, 64, 256]
+# Sockets in the fake /proc/net tables (spread over tcp, tcp6, udp and udp6)
+DEFAULT_SOCKETS = 50000
+DEFAULT_PACKAGES = 2000
+# Block devices in the fake /proc/diskstats (each with four partitions)
+DEFAULT_DISKS = 200
+# VLAN interfaces on the fixture's two bonded NICs
+DEFAULT_VLANS = 200
+# Processes in the fixture's /proc: a headless server, so nothing matches a desktop
+DEFAULT_PROCESSES = 400
+DEFAULT_ITERATIONS = 20
+
+# Budget every probe is held to unless BUDGETS says otherwise. Latencies are
+# warm p95s; `commands` counts _run_command calls (answered from
+# CANNED_OUTPUTS), `spawns` processes started any other way, which a probe
+# must never do; `alloc_kib` is the peak of memory allocated during a call.
+DEFAULT_BUDGET = {"p95_ms": 20.0, "commands": 0, "spawns": 0, "alloc_kib": 512}
+BUDGETS = {
+    "Shell": {"commands": 1},
+    "Open Ports": {"p95_ms": 250.0, "alloc_kib": 4096},
+    "Packages": {"p95_ms": 50.0},
+}
+
+# What _run_command returns during a benchmark, keyed by the command line
+CANNED_OUTPUTS = {
+    "/bin/bash --version": "GNU bash, version 5.2.15(1)-release (x86_64-pc-linux-gnu)",
+    "nvidia-smi --query-gpu=memory.total,memory.used,memory.free --format=csv,noheader,nounits": "",
+}
+
+# Environment the probes see, so results do not depend on the caller's session
+FIXTURE_ENVIRON = {
+    "SHELL": "/bin/bash",
+    "LANG": "en_US.UTF-8",
+    "TERM": "xterm-256color",
+}
+_SESSION_VARIABLES = [
+    "DISPLAY", "WAYLAND_DISPLAY", "XDG_CURRENT_DESKTOP", "DESKTOP_SESSION", "GDMSESSION", "TERM_PROGRAM",
+]
+
+_CPU_FLAGS = (
+    "fpu vme de pse tsc msr pae mce cx8 apic sep mtrr pge mca cmov pat pse36 clflush mmx fxsr sse sse2 ht "
+    "syscall nx mmxext fxsr_opt pdpe1gb rdtscp lm constant_tsc rep_good nopl nonstop_tsc cpuid extd_apicid "
+    "aperfmperf rapl pni pclmulqdq monitor ssse3 fma cx16 pcid sse4_1 sse4_2 x2apic movbe popcnt aes xsave "
+    "avx f16c rdrand lahf_lm cmp_legacy svm extapic cr8_legacy abm sse4a misalignsse 3dnowprefetch osvw ibs "
+    "skinit wdt tce topoext perfctr_core perfctr_nb bpext perfctr_llc mwaitx cpb cat_l3 cdp_l3 hw_pstate ssbd "
+    "mba ibrs ibpb stibp vmmcall fsgsbase bmi1 avx2 smep bmi2 erms invpcid cqm rdt_a rdseed adx smap clflushopt "
+    "clwb sha_ni xsaveopt xsavec xgetbv1 xsaves cqm_llc cqm_occup_llc cqm_mbm_total cqm_mbm_local clzero irperf"
+)
+
+_PCI_IDS = """\
+# Excerpt of pci.ids for the fixture devices
+1002  Advanced Micro Devices, Inc. [AMD/ATI]
+\t73bf  Navi 21 [Radeon RX 6800/6800 XT / 6900 XT]
+8086  Intel Corporation
+\t46a6  Alder Lake-P GT2 [Iris Xe Graphics]
+\t7a84  Z690 Chipset LPC/eSPI Controller
+
+C 03  Display controller
+"""
+
+# (address, class, vendor, device, VRAM total/used bytes or None)
+_PCI_DEVICES = [
+    ("0000:00:02.0", "0x030000", "0x8086", "0x46a6", None),
+    ("0000:00:1f.0", "0x060100", "0x8086", "0x7a84", None),
+    ("0000:03:00.0", "0x030000", "0x1002", "0x73bf", (16 * 1024**3, 1536 * 1024**2)),
+]
+
+# Executables on the fixture PATH, so language detection has something to find
+_FIXTURE_BINARIES = ["python3", "node", "gcc", "g++", "rustc", "go", "java", "ruby", "perl", "php"]
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(data)
+
+
+def _cpuinfo(cores):
+    blocks = []
+    for cpu in range(cores):
+        blocks.append(
+            f"processor\t: {cpu}\n"
+            "vendor_id\t: AuthenticAMD\n"
+            "cpu family\t: 25\n"
+            "model\t\t: 1\n"
+            "model name\t: AMD EPYC 7763 64-Core Processor\n"
+            "stepping\t: 1\n"
+            f"cpu MHz\t\t: {2450 + cpu % 7 * 100}.000\n"
+            "cache size\t: 512 KB\n"
+            f"physical id\t: {cpu // 128}\n"
+            f"siblings\t: {min(cores, 128)}\n"
+            f"core id\t\t: {cpu % 64}\n"
+            f"cpu cores\t: {min(cores, 64)}\n"
+            f"apicid\t\t: {cpu}\n"
+            "fpu\t\t: yes\n"
+            f"flags\t\t: {_CPU_FLAGS}\n"
+            "bogomips\t: 4890.81\n"
+            "clflush size\t: 64\n"
+            "address sizes\t: 48 bits physical, 48 bits virtual\n"
+        )
+    return "\n".join(blocks) + "\n"
+
+
+def _cpu_list(cpus):
+    # Kernel CPU list syntax: "0-63,128-191"
+    ranges = []
+    for cpu in sorted(cpus):
+        if ranges and ranges[-1][1] == cpu - 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(str(first) if first == last else f"{first}-{last}" for first, last in ranges)
+
+
+def _cpu_topology(root, cores):
+    # Same layout as _cpuinfo: 64 cores and 128 threads per socket, so hosts
+    # of more than 64 CPUs have SMT siblings; one NUMA node per socket
+    threads_per_socket = min(cores, 128)
+    cores_per_socket = min(cores, 64)
+    cpu_dir = os.path.join(root, "sys/devices/system/cpu")
+    _write(os.path.join(cpu_dir, "online"), f"0-{cores - 1}\n")
+    for cpu in range(cores):
+        socket = cpu // 128
+        package = [c for c in range(socket * 128, socket * 128 + threads_per_socket) if c < cores]
+        siblings = [c for c in package if c % 64 == cpu % 64]
+        topology = os.path.join(cpu_dir, f"cpu{cpu}", "topology")
+        _write(os.path.join(topology, "package_cpus_list"), _cpu_list(package) + "\n")
+        _write(os.path.join(topology, "core_cpus_list"), _cpu_list(siblings) + "\n")
+        caches = [(1, "Data", "48K", siblings), (1, "Instruction", "32K", siblings),
+                  (2, "Unified", "512K", siblings), (3, "Unified", "32768K", package)]
+        for index, (level, kind, size, shared) in enumerate(caches):
+            cache = os.path.join(cpu_dir, f"cpu{cpu}", "cache", f"index{index}")
+            _write(os.path.join(cache, "level"), f"{level}\n")
+            _write(os.path.join(cache, "type"), f"{kind}\n")
+            _write(os.path.join(cache, "size"), f"{size}\n")
+            _write(os.path.join(cache, "shared_cpu_list"), _cpu_list(shared) + "\n")
+        # One cpufreq policy per CPU, as with intel_pstate and amd-pstate
+        policy = os.path.join(cpu_dir, "cpufreq", f"policy{cpu}")
+        _write(os.path.join(policy, "affected_cpus"), f"{cpu}\n")
+        _write(os.path.join(policy, "scaling_cur_freq"), f"{2450000 + cpu % 7 * 100000}\n")
+        _write(os.path.join(policy, "scaling_governor"), "schedutil\n")
+    for socket in range((cores + 127) // 128):
+        node = [c for c in range(socket * 128, (socket + 1) * 128) if c < cores]
+        _write(os.path.join(root, f"sys/devices/system/node/node{socket}/cpulist"), _cpu_list(node) + "\n")
+
+
+def _net_table(protocol, count, first_slot):
+    header = (
+        "  sl  local_address                         remote_address                        st tx_queue rx_queue"
+        " tr tm->when retrnsmt   uid  timeout inode\n"
+    )
+    lines = [header]
+    listen_state = ports.TCP_LISTEN if protocol.startswith("tcp") else ports.UDP_UNCONNECTED
+    for slot in range(count):
+        # One socket in 50 is listening, the rest are established connections
+        state = listen_state if slot % 50 == 0 else "01"
+        port = 1024 + slot % 60000
+        if protocol.endswith("6"):
+            local = f"00000000000000000000000001000000:{port:04X}"
+            remote = f"0000000000000000FFFF00000A00000{slot % 10}:{(slot * 7) % 65536:04X}"
+        else:
+            local = f"0100007F:{port:04X}"
+            remote = f"0A00000{slot % 10}:{(slot * 7) % 65536:04X}"
+        lines.append(
+            f"{slot:5d}: {local} {remote} {state} 00000000:00000000 00:00000000 00000000  1000        0"
+            f" {first_slot + slot} 1 0000000000000000 20 4 30 10 -1\n"
+        )
+    return "".join(lines)
+
+
+def _mountinfo(root):
+    # Mostly kernel interfaces, cgroups and per-user tmpfs mounts; the
+    # fixture root itself is the only real data mount
+    lines = [
+        "22 28 0:21 / /proc rw,nosuid,nodev,noexec,relatime shared:5 - proc proc rw",
+        "23 28 0:22 / /sys rw,nosuid,nodev,noexec,relatime shared:6 - sysfs sysfs rw",
+        "24 28 0:5 / /dev rw,nosuid,relatime shared:2 - devtmpfs udev rw,size=4000000k,mode=755",
+        "25 24 0:23 / /dev/pts rw,nosuid,noexec,relatime shared:3 - devpts devpts rw,mode=600",
+        "26 28 0:24 / /run rw,nosuid,nodev,noexec,relatime shared:7 - tmpfs tmpfs rw,mode=755",
+        f"28 1 259:2 / {root} rw,relatime shared:1 - ext4 /dev/nvme0n1p2 rw,errors=remount-ro",
+    ]
+    for index in range(40):
+        lines.append(f"{100 + index} 23 0:{40 + index} / /sys/fs/cgroup/unit{index} rw,relatime - cgroup2 cgroup2 rw")
+        lines.append(f"{200 + index} 26 0:{90 + index} / /run/user/{1000 + index} rw,relatime - tmpfs tmpfs rw,mode=700")
+    return "\n".join(lines) + "\n"
+
+
+def _diskstats(root, disks):
+    # A storage node: `disks` NVMe namespaces with four partitions each,
+    # plus the loop devices every snap-enabled host has
+    lines = []
+    for index in range(8):
+        lines.append(f"   7       {index} loop{index} 12 0 24 1 0 0 0 0 0 4 1 0 0 0 0 0 0")
+    for disk in range(disks):
+        for partition in range(5):
+            name = f"nvme{disk}n1" + (f"p{partition}" if partition else "")
+            if not partition:
+                os.makedirs(os.path.join(root, "sys/block", name), exist_ok=True)
+            reads, writes = 100000 + disk * 37, 50000 + disk * 11
+            lines.append(
+                f" 259 {disk * 5 + partition:7d} {name} {reads} 12 {reads * 8} {reads // 10} {writes} 40"
+                f" {writes * 16} {writes // 5} 0 {reads // 20} {reads // 10 + writes // 5} 0 0 0 0 120 3"
+            )
+    return "\n".join(lines) + "\n"
+
+
+def _network(root, vlans):
+    # A hypervisor: two NICs in a bond carrying `vlans` VLANs, plus loopback.
+    # Writes /sys/class/net and returns /proc/net/dev.
+    links = [("lo", "unknown", None, 65536, False), ("eno1", "up", 25000, 9000, True),
+             ("eno2", "up", 25000, 9000, True), ("bond0", "up", 50000, 9000, False)]
+    links += [(f"bond0.{100 + index}", "up" if index % 7 else "down", None, 1500, False) for index in range(vlans)]
+    lines = [
+        "Inter-|   Receive                                                |  Transmit",
+        " face |bytes    packets errs drop fifo frame compressed multicast|"
+        "bytes    packets errs drop fifo colls carrier compressed",
+    ]
+    for index, (name, state, speed, mtu, physical) in enumerate(links):
+        directory = os.path.join(root, "sys/class/net", name)
+        _write(os.path.join(directory, "operstate"), state + "\n")
+        _write(os.path.join(directory, "flags"), ("0x1003" if state != "down" else "0x1002") + "\n")
+        _write(os.path.join(directory, "mtu"), f"{mtu}\n")
+        _write(os.path.join(directory, "address"), f"52:54:00:{index >> 8:02x}:{index & 255:02x}:01\n")
+        if speed:
+            _write(os.path.join(directory, "speed"), f"{speed}\n")
+        if physical:
+            os.makedirs(os.path.join(directory, "device"), exist_ok=True)
+        rx, tx = 10**9 + index * 4096, 5 * 10**8 + index * 1024
+        lines.append(f"{name:>6}: {rx} {rx // 1000} 0 {index % 3} 0 0 0 0 {tx} {tx // 1000} 0 0 0 0 0 0")
+    return "\n".join(lines) + "\n"
+
+
+def _dpkg_status(count):
+    stanzas = []
+    for index in range(count):
+        # Every tenth package was removed but kept its configuration
+        status = "deinstall ok config-files" if index % 10 == 9 else "install ok installed"
+        stanzas.append(
+            f"Package: bench-package-{index}\nStatus: {status}\nPriority: optional\nSection: misc\n"
+            f"Installed-Size: {index % 997}\nMaintainer: Bench <bench@example.org>\nArchitecture: amd64\n"
+            f"Version: 1.{index}-1\nDescription: fixture package {index}\n"
+        )
+    return "\n".join(stanzas)
+
+
+def build_fixture(root, cores, sockets=DEFAULT_SOCKETS, packages=DEFAULT_PACKAGES):
+    """Writes a fake host under `root`: proc, sys, etc, a dpkg database and a PATH."""
+    _write(os.path.join(root, "etc/os-release"), (
+        'PRETTY_NAME="Debian GNU/Linux 12 (bookworm)"\nNAME="Debian GNU/Linux"\nVERSION_ID="12"\n'
+        'VERSION="12 (bookworm)"\nVERSION_CODENAME=bookworm\nID=debian\n'
+        'HOME_URL="https://www.debian.org/"\n'
+    ))
+    _write(os.path.join(root, "etc/debian_version"), "12.5\n")
+    _write(os.path.join(root, "etc/default/locale"), "LANG=en_US.UTF-8\n")
+    _write(os.path.join(root, "proc/self/mountinfo"), _mountinfo(root))
+    _write(os.path.join(root, "proc/diskstats"), _diskstats(root, DEFAULT_DISKS))
+    _write(os.path.join(root, "proc/cpuinfo"), _cpuinfo(cores))
+    _write(os.path.join(root, "proc/net/dev"), _network(root, DEFAULT_VLANS))
+    _write(os.path.join(root, "proc/net/route"), (
+        "Iface\tDestination\tGateway \tFlags\tRefCnt\tUse\tMetric\tMask\t\tMTU\tWindow\tIRTT\n"
+        "bond0\t00000000\t0102000A\t0003\t0\t0\t100\t00000000\t0\t0\t0\n"
+        "bond0\t0002000A\t00000000\t0001\t0\t0\t100\t00FFFFFF\t0\t0\t0\n"
+    ))
+    _write(os.path.join(root, "proc/1/comm"), "systemd\n")
+    for pid in range(2, DEFAULT_PROCESSES):
+        _write(os.path.join(root, f"proc/{pid}/comm"), f"kworker/{pid % 64}:1\n")
+    _cpu_topology(root, cores)
+
+    shares = [("tcp", 0.6), ("tcp6", 0.2), ("udp", 0.15), ("udp6", 0.05)]
+    first_slot = 10000
+    for protocol, share in shares:
+        count = int(sockets * share)
+        _write(os.path.join(root, "proc/net", protocol), _net_table(protocol, count, first_slot))
+        first_slot += count
+
+    for address, pci_class, vendor, device, vram in _PCI_DEVICES:
+        device_dir = os.path.join(root, "sys/bus/pci/devices", address)
+        _write(os.path.join(device_dir, "class"), pci_class + "\n")
+        _write(os.path.join(device_dir, "vendor"), vendor + "\n")
+        _write(os.path.join(device_dir, "device"), device + "\n")
+        if vram:
+            _write(os.path.join(device_dir, "mem_info_vram_total"), f"{vram[0]}\n")
+            _write(os.path.join(device_dir, "mem_info_vram_used"), f"{vram[1]}\n")
+    _write(os.path.join(root, "usr/share/hwdata/pci.ids"), _PCI_IDS)
+
+    _write(os.path.join(root, "var/lib/dpkg/status"), _dpkg_status(packages))
+    for binary in _FIXTURE_BINARIES:
+        path = os.path.join(root, "bin", binary)
+        _write(path, "#!/bin/sh\n")
+        os.chmod(path, 0o755)
+
+
+class _CommandLog:
+    """Counts commands (stubbed _run_command calls) and real process spawns."""
+
+    def __init__(self):
+        self.commands = []
+        self.spawns = []
+
+    def reset(self):
+        self.commands = []
+        self.spawns = []
+
+    def run_command(self, command, shell=False, suppress_errors=True):
+        key = command if isinstance(command, str) else " ".join(command)
+        self.commands.append(key)
+        return CANNED_OUTPUTS.get(key, "")
+
+    def popen_class(self):
+        log = self
+
+        class CountingPopen(subprocess.Popen):
+            def __init__(self, args, *rest, **kwargs):
+                log.spawns.append(args if isinstance(args, str) else " ".join(map(str, args)))
+                super().__init__(args, *rest, **kwargs)
+
+        return CountingPopen
+
+
+@contextlib.contextmanager
+def _patched(obj, name, value):
+    original = getattr(obj, name)
+    setattr(obj, name, value)
+    try:
+        yield
+    finally:
+        setattr(obj, name, original)
+
+
+@contextlib.contextmanager
+def fixture_host(root, log):
+    """Points every probe at the fixture under `root` for the duration of the block."""
+    environ = dict(os.environ)
+    with contextlib.ExitStack() as stack:
+        for module, name, relative in [
+            (core, "PROCFS_PATH", "proc"),
+            (core, "SYSFS_PATH", "sys"),
+            (core, "ETC_PATH", "etc"),
+            (ports, "PROCFS_PATH", "proc"),
+            (gpu, "SYSFS_PATH", "sys"),
+            (cpu_telemetry, "SYSFS_PATH", "sys"),
+            (cpu_telemetry, "PROCFS_PATH", "proc"),
+            (storage, "PROCFS_PATH", "proc"),
+            (session, "PROCFS_PATH", "proc"),
+            (network, "PROCFS_PATH", "proc"),
+            (network, "SYSFS_PATH", "sys"),
+            (session, "ETC_PATH", "etc"),
+            (disk_sampler, "PROCFS_PATH", "proc"),
+            (disk_sampler, "SYSFS_PATH", "sys"),
+        ]:
+            stack.enter_context(_patched(module, name, os.path.join(root, relative)))
+        stack.enter_context(_patched(core, "SYSTEM_NAME", "Linux"))
+        stack.enter_context(_patched(core, "LINUX_BACKENDS", [
+            Backend("APT", [os.path.join(root, "var/lib/dpkg/status")], _count_dpkg),
+        ]))
+        stack.enter_context(_patched(gpu, "pci_ids", gpu.PciIds([os.path.join(root, "usr/share/hwdata/pci.ids")])))
+        # Non-persisting samplers, so CPU usage and disk and network I/O neither sleep nor write state
+        stack.enter_context(_patched(cpu_sampler, "default_sampler", cpu_sampler.CpuSampler(0, persist=False)))
+        stack.enter_context(_patched(disk_sampler, "default_sampler", disk_sampler.DiskSampler(0, persist=False)))
+        stack.enter_context(_patched(network, "default_sampler", network.NetworkSampler(0, persist=False)))
+        stack.enter_context(_patched(core, "_run_command", log.run_command))
+        stack.enter_context(_patched(subprocess, "Popen", log.popen_class()))
+        for variable in _SESSION_VARIABLES:
+            os.environ.pop(variable, None)
+        # Only the fixture binaries are on PATH: a stray spawn is counted but
+        # cannot run a real tool
+        os.environ.update(FIXTURE_ENVIRON, PATH=os.path.join(root, "bin"))
+        try:
+            yield
+        finally:
+            os.environ.clear()
+            os.environ.update(environ)
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+def budget_for(field, budgets=None):
+    """Returns the budget `field` is held to: DEFAULT_BUDGET overlaid with BUDGETS (or `budgets`)."""
+    budgets = BUDGETS if budgets is None else budgets
+    return dict(DEFAULT_BUDGET, **budgets.get("default", {}), **budgets.get(field, {}))
+
+
+def bench_probes(probes, log, iterations=DEFAULT_ITERATIONS, budgets=None):
+    """Times each probe in turn (dependencies are fed the result of their own run).
+
+    Returns one result dict per probe: the cold (first) call, the latency
+    distribution of `iterations` warm calls, commands and spawns per call,
+    peak allocation, and the budget violations.
+    """
+    results = {}
+    report = []
+    for probe in probes:
+        args = [results[dep] for dep in probe.deps]
+
+        log.reset()
+        start = time.perf_counter()
+        results[probe.name] = probe.func(*args)
+        cold = time.perf_counter() - start
+        commands, spawns = list(log.commands), list(log.spawns)
+
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            probe.func(*args)
+            samples.append(time.perf_counter() - start)
+
+        # Allocations are measured on a separate call, tracing slows everything down
+        tracemalloc.start()
+        try:
+            probe.func(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        entry = {
+            "probe": probe.name,
+            "cold_ms": _ms(cold),
+            "min_ms": _ms(min(samples)) if samples else None,
+            "median_ms": _ms(statistics.median(samples)) if samples else None,
+            "p95_ms": _ms(_percentile(samples, 0.95)) if samples else None,
+            "max_ms": _ms(max(samples)) if samples else None,
+            "commands": len(commands),
+            "spawns": len(spawns),
+            "alloc_kib": round(peak / 1024, 1),
+            "command_lines": commands + spawns,
+        }
+        budget = budget_for(probe.name, budgets)
+        measured = dict(entry, p95_ms=entry["p95_ms"] if samples else entry["cold_ms"])
+        entry["violations"] = [
+            f"{metric} {measured[metric]} > {limit}"
+            for metric, limit in budget.items()
+            if limit is not None and measured[metric] > limit
+        ]
+        report.append(entry)
+    return report
+
+
+def run_benchmarks(cores=None, sockets=DEFAULT_SOCKETS, iterations=DEFAULT_ITERATIONS, fields=None, budgets=None):
+    """Benchmarks every probe (or those `fields` need) on one fixture host per CPU count.
+
+    Returns [(scenario name, report)], see bench_probes for the report.
+    """
+    scenarios = []
+    root = tempfile.mkdtemp(prefix="kernelview-bench-")
+    try:
+        for core_count in cores or DEFAULT_CORES:
+            fixture = os.path.join(root, f"cores-{core_count}")
+            build_fixture(fixture, core_count, sockets)
+            log = _CommandLog()
+            with fixture_host(fixture, log):
+                probes = core.system_probes(fields)
+                scenarios.append((
+                    f"{core_count} cores, {sockets} sockets",
+                    bench_probes(probes, log, iterations, budgets),
+                ))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return scenarios
+
+
+_COLUMNS = [
+    ("cold_ms", "cold ms"), ("min_ms", "min ms"), ("median_ms", "median"), ("p95_ms", "p95 ms"),
+    ("max_ms", "max ms"), ("commands", "cmds"), ("spawns", "spawns"), ("alloc_kib", "alloc KiB"),
+]
+
+
+def format_report(scenarios):
+    """Renders benchmark results as one table per scenario, flagging budget violations."""
+    lines = []
+    for scenario, report in scenarios:
+        width = max([len("probe")] + [len(entry["probe"]) for entry in report])
+        lines.append(f"=== {scenario} ===")
+        lines.append("probe".ljust(width) + "".join(f"{title:>11}" for _, title in _COLUMNS))
+        for entry in report:
+            cells = "".join(f"{'-' if entry[key] is None else entry[key]:>11}" for key, _ in _COLUMNS)
+            flag = "  FAIL: " + "; ".join(entry["violations"]) if entry["violations"] else ""
+            lines.append(entry["probe"].ljust(width) + cells + flag)
+        lines.append("")
+    return lines
+
+
+def failures(scenarios):
+    """Returns (scenario, probe, violation) for every exceeded budget."""
+    return [
+        (scenario, entry["probe"], violation)
+        for scenario, report in scenarios
+        for entry in report
+        for violation in entry["violations"]
+    ]
+
+
+def load_budgets(path):
+    """Reads budget overrides: {"default": {...}, "<field>": {"p95_ms": ..., ...}}."""
+    with open(path) as f:
+        overrides = json.load(f)
+    budgets = {field: dict(budget) for field, budget in BUDGETS.items()}
+    for field, budget in overrides.items():
+        field = field if field == "default" else core.PROBES.resolve(field)
+        budgets.setdefault(field, {}).update(budget)
+    return budgets
+
+
+def main(cores=None, sockets=DEFAULT_SOCKETS, iterations=DEFAULT_ITERATIONS, fields=None, budgets=None,
+         output="text", stream=None):
+    """Runs the benchmarks, prints the report and returns 1 if a budget was exceeded."""
+    stream = stream or sys.stdout
+    scenarios = run_benchmarks(cores, sockets, iterations, fields, budgets)
+    if output == "json":
+        json.dump([{"scenario": name, "probes": report} for name, report in scenarios], stream, indent=2)
+        stream.write("\n")
+    else:
+        stream.write("\n".join(format_report(scenarios)) + "\n")
+    failed = failures(scenarios)
+    if failed and output != "json":
+        stream.write(f"{len(failed)} budget(s) exceeded\n")
+    return 1 if failed else 0
@@ -0,0 +1,73 @@
+import threading
+import time
+
+from .state import cache_path, load_json, save_json
+
+# How long a probe that timed out is skipped; doubled for every further
+# consecutive timeout, up to MAX_COOLDOWN
+DEFAULT_COOLDOWN = 300.0
+MAX_COOLDOWN = 3600.0
+
+
+class CircuitBreaker:
+    """Remembers probes that timed out and skips them until a cooldown expires.
+
+    A probe that hangs (nvidia-smi with a wedged driver, xrandr against a
+    dead X server) would otherwise cost every run its full timeout. Trips
+    are persisted in $XDG_CACHE_HOME/kernelview/breaker.json, so they carry
+    over between runs; a probe that completes after its cooldown is closed
+    again.
+    """
+
+    def __init__(self, path=None, cooldown=DEFAULT_COOLDOWN, persist=True):
+        self.path = path or cache_path("breaker.json")
+        self.cooldown = cooldown
+        self.persist = persist
+        self._lock = threading.Lock()
+        self._trips = None  # probe name -> {"until": wall clock time, "count": consecutive timeouts}
+        self._dirty = False
+
+    def _load(self):
+        if self._trips is None:
+            data = load_json(self.path) if self.persist else None
+            self._trips = {
+                name: trip for name, trip in (data or {}).items()
+                if isinstance(trip, dict) and isinstance(trip.get("until"), (int, float))
+            } if isinstance(data, dict) else {}
+        return self._trips
+
+    def is_open(self, name, now=None):
+        """Whether probe `name` timed out recently and should be skipped."""
+        now = time.time() if now is None else now
+        with self._lock:
+            trip = self._load().get(name)
+            return trip is not None and now < trip["until"]
+
+    def trip(self, name):
+        """Records that probe `name` timed out."""
+        with self._lock:
+            count = self._load().get(name, {}).get("count", 0) + 1
+            cooldown = min(MAX_COOLDOWN, self.cooldown * 2 ** (count - 1))
+            self._trips[name] = {"until": time.time() + cooldown, "count": count}
+            self._dirty = True
+
+    def reset(self, name):
+        """Records that probe `name` completed in time."""
+        with self._lock:
+            if self._load().pop(name, None) is not None:
+                self._dirty = True
+
+    def open_probes(self, now=None):
+        """Names of the probes currently being skipped."""
+        now = time.time() if now is None else now
+        with self._lock:
+            return sorted(name for name, trip in self._load().items() if now < trip["until"])
+
+    def save(self):
+        """Writes the trips back to disk if anything changed."""
+        with self._lock:
+            if not (self.persist and self._dirty):
+                return
+            trips = dict(self._trips)
+            self._dirty = False
+        save_json(self.path, trips)
@@ -0,0 +1,80 @@
+import json
+import threading
+
+from .collector import killed_commands
+from .probes import TIMED_OUT
+from .state import cache_path, load_json, save_json
+
+# Bump when the layout of cached values changes
+CACHE_FORMAT = 1
+
+
+def _normalise_key(key):
+    # Keys are compared against what was loaded from JSON, so round-trip them
+    # (tuples become lists, ints stay ints) before comparing.
+    return json.loads(json.dumps(key))
+
+
+class FactCache:
+    """On-disk cache for facts that rarely change between runs.
+
+    Every entry is stored with an invalidation key (boot time, file mtimes,
+    ...); a cached value is only reused while its key is unchanged. `read`
+    and `write` control whether the file is consulted and updated, which is
+    how --no-cache and --refresh are implemented. Values computed while a
+    command was killed for running too long are fallbacks, and are never
+    stored; neither are TIMED_OUT and "Unknown".
+    """
+
+    def __init__(self, path=None, read=True, write=True):
+        self.path = path or cache_path("facts.json")
+        self.read = read
+        self.write = write
+        self._lock = threading.Lock()
+        self._entries = None
+        self._dirty = False
+
+    def _load(self):
+        if self._entries is None:
+            data = load_json(self.path) if self.read else None
+            if isinstance(data, dict) and data.get("format") == CACHE_FORMAT:
+                self._entries = data.get("entries") or {}
+            else:
+                self._entries = {}
+        return self._entries
+
+    def get_or_compute(self, name, key, compute):
+        """Returns the cached value of `name` if its key matches, else computes it."""
+        key = _normalise_key(key)
+        with self._lock:
+            entry = self._load().get(name)
+        if self.read and isinstance(entry, dict) and entry.get("key") == key:
+            return entry.get("value")
+
+        killed = killed_commands()
+        value = compute()
+        if killed_commands() != killed or value is TIMED_OUT or value == "Unknown":
+            return value
+        with self._lock:
+            self._entries[name] = {"key": key, "value": value}
+            self._dirty = True
+        return value
+
+    def wrap(self, name, key_func, func):
+        """Returns a probe function that goes through the cache."""
+        def cached_probe(*args):
+            try:
+                key = key_func()
+            except Exception:
+                return func(*args)  # No usable key, never cache
+            return self.get_or_compute(name, key, lambda: func(*args))
+        return cached_probe
+
+    def save(self):
+        """Writes the cache back to disk if anything changed."""
+        with self._lock:
+            if not (self.write and self._dirty):
+                return
+            entries = dict(self._entries)
+            self._dirty = False
+        save_json(self.path, {"format": CACHE_FORMAT, "entries": entries})
@@ -1,10 +1,334 @@
 #!/usr/bin/env python3
 # kernelview/cli.py
-from .core import get_system_info, display_system_info
+import argparse
+import sys
 
-def main():
-    system_info = get_system_info()
-    display_system_info(system_info)
+from . import __version__, disk_sampler
+from .cpu_sampler import DEFAULT_MIN_WINDOW
+from .core import PROBES, collect_system_info, display_system_info, format_fields, get_system_info, iter_system_info
+from .output import FORMATS, write_json, write_ndjson
+from .watch import DEFAULT_INTERVAL, watch
+
+# Subcommands and the daemon client import their modules (http.server,
+# socketserver, tracemalloc, ...) when they run, keeping plain runs fast.
+DEFAULT_SOCKET_HELP = "$XDG_RUNTIME_DIR/kernelview.sock"
+
+
+def _field_list(value):
+    fields = [field.strip() for field in value.split(",") if field.strip()]
+    for field in fields:
+        try:
+            PROBES.resolve(field)
+        except KeyError as e:
+            raise argparse.ArgumentTypeError(e.args[0])
+    return fields
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="kernelview", description="Show system information.")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    parser.add_argument(
+        "-j", "--workers", type=int, default=None, metavar="N",
+        help="number of probes to run concurrently (1 disables concurrency)",
+    )
+    parser.add_argument(
+        "--cpu-window", type=float, default=None, metavar="SECONDS",
+        help=f"minimum window CPU usage is sampled over (default: {DEFAULT_MIN_WINDOW})",
+    )
+    parser.add_argument(
+        "--io-window", type=float, default=None, metavar="SECONDS",
+        help=f"minimum window disk and network I/O rates are sampled over (default: {disk_sampler.DEFAULT_MIN_WINDOW})",
+    )
+    parser.add_argument(
+        "-f", "--fields", type=_field_list, default=None, metavar="FIELD[,FIELD...]",
+        help="only collect these fields, e.g. --fields ram,cpu",
+    )
+    parser.add_argument(
+        "--deadline", type=float, default=None, metavar="SECONDS",
+        help="report fields not collected within SECONDS as 'timed out' (per refresh with --watch)",
+    )
+    parser.add_argument(
+        "--probe-timeout", type=float, default=None, metavar="SECONDS",
+        help="time out every probe after SECONDS instead of its own timeout",
+    )
+    parser.add_argument(
+        "--retry-timed-out", action="store_true",
+        help="also run probes that timed out recently instead of skipping them until their cooldown expires",
+    )
+    parser.add_argument(
+        "-w", "--watch", type=float, nargs="?", const=DEFAULT_INTERVAL, default=None, metavar="INTERVAL",
+        help=f"keep refreshing the report every INTERVAL seconds (default: {DEFAULT_INTERVAL})",
+    )
+    parser.add_argument(
+        "--format", choices=FORMATS, default="text",
+        help="output format; ndjson emits each field as soon as it is collected (default: text)",
+    )
+    parser.add_argument(
+        "--from-daemon", action="store_true",
+        help="ask a running 'kernelview daemon' for its snapshot, collecting in-process if none is running",
+    )
+    parser.add_argument("--socket", default=None, metavar="PATH", help=f"daemon socket (default: {DEFAULT_SOCKET_HELP})")
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="print where the time went (per-probe wall and CPU time, commands, /proc and /sys reads) to stderr",
+    )
+    parser.add_argument(
+        "--trace", default=None, metavar="FILE",
+        help="with --profile, also write a Chrome trace-event file (chrome://tracing, ui.perfetto.dev)",
+    )
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument(
+        "--no-cache", action="store_true",
+        help="neither read nor update the cache of static facts",
+    )
+    cache_group.add_argument(
+        "--refresh", action="store_true",
+        help="recompute static facts and rewrite the cache",
+    )
+    args = parser.parse_args(argv)
+    if args.trace:
+        args.profile = True
+    if args.profile and (args.watch is not None or args.from_daemon):
+        parser.error("--profile only applies to a single in-process collection, not --watch or --from-daemon")
+    if args.from_daemon and args.watch is not None:
+        parser.error("--from-daemon cannot be combined with --watch")
+    return args
+
+
+def _daemon_main(argv):
+    from .daemon import serve, socket_path
+    from .snapshot import DEFAULT_STATIC_INTERVAL, DEFAULT_VOLATILE_INTERVAL, SnapshotRefresher
+
+    parser = argparse.ArgumentParser(
+        prog="kernelview daemon",
+        description="Keep collectors warm and serve snapshots over a Unix socket.",
+    )
+    parser.add_argument("--socket", default=None, metavar="PATH", help=f"socket to listen on (default: {socket_path()})")
+    parser.add_argument("-f", "--fields", type=_field_list, default=None, metavar="FIELD[,FIELD...]",
+                        help="only collect these fields")
+    parser.add_argument("--volatile-interval", type=float, default=DEFAULT_VOLATILE_INTERVAL, metavar="SECONDS",
+                        help="refresh interval of volatile fields (default: %(default)s)")
+    parser.add_argument("--static-interval", type=float, default=DEFAULT_STATIC_INTERVAL, metavar="SECONDS",
+                        help="refresh interval of static fields (default: %(default)s)")
+    parser.add_argument("-j", "--workers", type=int, default=None, metavar="N",
+                        help="number of probes to run concurrently")
+    parser.add_argument("--no-cache", action="store_true", help="do not use the cache of static facts")
+    args = parser.parse_args(argv)
+
+    refresher = SnapshotRefresher(
+        fields=args.fields,
+        volatile_interval=args.volatile_interval,
+        static_interval=args.static_interval,
+        max_workers=args.workers,
+        use_cache=not args.no_cache,
+    )
+    try:
+        serve(refresher, args.socket)
+    except OSError as e:
+        parser.exit(1, f"kernelview daemon: {e}\n")
+
+
+def _serve_main(argv):
+    from . import exporter
+    from .snapshot import DEFAULT_STATIC_INTERVAL, DEFAULT_VOLATILE_INTERVAL, SnapshotRefresher
+
+    parser = argparse.ArgumentParser(
+        prog="kernelview serve",
+        description="Expose system metrics over HTTP in OpenMetrics/Prometheus format.",
+    )
+    parser.add_argument("-p", "--port", type=int, default=exporter.DEFAULT_PORT,
+                        help="port to listen on (default: %(default)s)")
+    parser.add_argument("--bind", default=exporter.DEFAULT_BIND, metavar="ADDRESS",
+                        help="address to listen on (default: %(default)s, local scrapers only)")
+    parser.add_argument("--interval", type=float, default=DEFAULT_VOLATILE_INTERVAL, metavar="SECONDS",
+                        help="refresh interval of volatile metrics (default: %(default)s)")
+    parser.add_argument("--static-interval", type=float, default=DEFAULT_STATIC_INTERVAL, metavar="SECONDS",
+                        help="refresh interval of package counts and host info (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    refresher = SnapshotRefresher(
+        fields=exporter.EXPORTED_FIELDS,
+        volatile_interval=args.interval,
+        static_interval=args.static_interval,
+    )
+    try:
+        exporter.serve(refresher, args.port, args.bind)
+    except OSError as e:
+        parser.exit(1, f"kernelview serve: {e}\n")
+
+
+def _int_list(value):
+    try:
+        return [int(item) for item in value.split(",") if item.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated integers, got {value!r}")
+
+
+def _bench_main(argv):
+    from . import bench
+
+    parser = argparse.ArgumentParser(
+        prog="kernelview bench",
+        description="Benchmark every probe against generated fixture hosts, with external commands stubbed.",
+    )
+    parser.add_argument("--cores", type=_int_list, default=bench.DEFAULT_CORES, metavar="N[,N...]",
+                        help="CPU counts of the fixture hosts (default: %(default)s)")
+    parser.add_argument("--sockets", type=int, default=bench.DEFAULT_SOCKETS, metavar="N",
+                        help="sockets in the fixture /proc/net tables (default: %(default)s)")
+    parser.add_argument("-n", "--iterations", type=int, default=bench.DEFAULT_ITERATIONS, metavar="N",
+                        help="warm calls timed per probe (default: %(default)s)")
+    parser.add_argument("-f", "--fields", type=_field_list, default=None, metavar="FIELD[,FIELD...]",
+                        help="only benchmark the probes these fields need")
+    parser.add_argument("--budgets", default=None, metavar="FILE",
+                        help='JSON budget overrides, e.g. {"default": {"p95_ms": 10}, "RAM": {"alloc_kib": 64}}')
+    parser.add_argument("--format", choices=["text", "json"], default="text", help="report format")
+    args = parser.parse_args(argv)
+
+    try:
+        budgets = bench.load_budgets(args.budgets) if args.budgets else None
+    except (OSError, ValueError, KeyError) as e:
+        parser.exit(2, f"kernelview bench: cannot load budgets: {e}\n")
+    return bench.main(args.cores, args.sockets, args.iterations, args.fields, budgets, args.format)
+
+
+def _record_main(argv):
+    from . import history
+
+    parser = argparse.ArgumentParser(
+        prog="kernelview record",
+        description="Append CPU, memory, disk, VRAM and load metrics to an on-disk ring buffer.",
+    )
+    parser.add_argument("--file", default=None, metavar="PATH", help=f"history file (default: {history.default_path()})")
+    parser.add_argument("--interval", type=float, default=history.DEFAULT_INTERVAL, metavar="SECONDS",
+                        help="seconds between records (default: %(default)s)")
+    parser.add_argument("--capacity", type=int, default=history.DEFAULT_CAPACITY, metavar="N",
+                        help="records kept before the oldest are overwritten, when creating the file "
+                             "(default: %(default)s)")
+    parser.add_argument("-n", "--count", type=int, default=None, metavar="N", help="stop after N records")
+    args = parser.parse_args(argv)
+
+    try:
+        history.record(args.file, args.interval, args.capacity, args.count)
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"kernelview record: {e}\n")
+
+
+def _duration(value):
+    from .history import parse_duration
+    try:
+        return parse_duration(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a duration like 90s, 5m, 1h or 2d, got {value!r}")
+
+
+def _history_main(argv):
+    import time
+    from . import history
+
+    parser = argparse.ArgumentParser(
+        prog="kernelview history",
+        description="Summarise metrics recorded by 'kernelview record': min, average and max per time bucket.",
+    )
+    parser.add_argument("--file", default=None, metavar="PATH", help=f"history file (default: {history.default_path()})")
+    parser.add_argument("--since", type=_duration, default=3600.0, metavar="DURATION",
+                        help="how far back to look, e.g. 30m, 1h, 7d (default: 1h)")
+    parser.add_argument("--step", type=_duration, default=None, metavar="DURATION",
+                        help="bucket width (default: a twelfth of --since)")
+    parser.add_argument("-f", "--field", default="cpu,ram", metavar="METRIC[,METRIC...]",
+                        help=f"metrics to show, among {', '.join(history.METRICS)} (default: %(default)s)")
+    parser.add_argument("--format", choices=["text", "json"], default="text", help="output format")
+    args = parser.parse_args(argv)
+
+    metrics = [metric.strip().lower() for metric in args.field.split(",") if metric.strip()]
+    unknown = [metric for metric in metrics if metric not in history.METRICS]
+    if unknown or not metrics:
+        parser.error(f"unknown metric(s) {', '.join(unknown)}; choose among {', '.join(history.METRICS)}")
+    columns = [column for metric in metrics for column in history.METRICS[metric]]
+    now = time.time()
+    try:
+        with history.HistoryFile(args.file) as recorded:
+            rows = recorded.summarise(columns, now - args.since, args.step or args.since / 12, now)
+    except FileNotFoundError:
+        parser.exit(1, "kernelview history: nothing recorded yet, run 'kernelview record' first\n")
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"kernelview history: {e}\n")
+    if args.format == "json":
+        import json
+        print(json.dumps([
+            {"start": round(start, 3), "metrics": {
+                column: dict(zip(("min", "max", "avg"), summary)) if summary else None
+                for column, summary in summaries.items()
+            }}
+            for start, summaries in rows
+        ], indent=2))
+    else:
+        history.write_summary(rows, columns)
+
+
+# Subcommands, dispatched on the first argument
+COMMANDS = {
+    "daemon": _daemon_main,
+    "serve": _serve_main,
+    "bench": _bench_main,
+    "record": _record_main,
+    "history": _history_main,
+}
+
+
+def _from_daemon(args):
+    """Returns raw values from a running daemon, or None if there is none."""
+    fields = [PROBES.resolve(field) for field in args.fields] if args.fields else None
+    try:
+        from .daemon import fetch, record_values
+        return record_values(fetch(fields, args.socket))
+    except (OSError, ImportError, AttributeError):
+        return None
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+
+    args = _parse_args(argv)
+    options = dict(
+        fields=args.fields,
+        max_workers=args.workers,
+        cpu_window=args.cpu_window,
+        io_window=args.io_window,
+        use_cache=not args.no_cache,
+        refresh_cache=args.refresh,
+        deadline=args.deadline,
+        probe_timeout=args.probe_timeout,
+        use_breaker=not args.retry_timed_out,
+    )
+    profiler = None
+    if args.profile:
+        from .profiling import Profiler
+        profiler = options["profiler"] = Profiler()
+    raw = _from_daemon(args) if args.from_daemon else None
+    if raw is not None:
+        if args.format == "ndjson":
+            write_ndjson(raw.items())
+        elif args.format == "json":
+            write_json(raw)
+        else:
+            display_system_info(format_fields(raw))
+    elif args.watch is not None:
+        watch(interval=args.watch, output=args.format, **options)
+    elif args.format == "ndjson":
+        write_ndjson(iter_system_info(**options))
+    elif args.format == "json":
+        write_json(collect_system_info(**options))
+    else:
+        system_info = get_system_info(**options)
+        display_system_info(system_info)
+
+    if profiler is not None:
+        print("\n".join(profiler.summary()), file=sys.stderr)
+        if args.trace:
+            profiler.write_trace(args.trace)
+            print(f"Trace written to {args.trace}", file=sys.stderr)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
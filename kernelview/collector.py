@@ -0,0 +1,329 @@
+import queue
+import threading
+import time
+
+from .probes import TIMED_OUT
+
+# Most probes spend their time waiting on a subprocess or on I/O, so a pool
+# larger than the CPU count still pays off.
+DEFAULT_MAX_WORKERS = 16
+
+_local = threading.local()
+
+
+def time_left():
+    """Seconds until the probe running on this thread times out (None without a limit).
+
+    External commands use this as their timeout, so a probe that runs over
+    has its child killed instead of leaving it behind.
+    """
+    deadline = getattr(_local, "deadline", None)
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+def command_killed():
+    """Records that a command of the probe running on this thread was killed.
+
+    The probe then returns a fallback rather than what it was after, which
+    FactCache must not keep (see killed_commands).
+    """
+    _local.killed = killed_commands() + 1
+
+
+def killed_commands():
+    """Number of commands killed on this thread so far."""
+    return getattr(_local, "killed", 0)
+
+
+def command_runner():
+    """The function external commands of the probe running on this thread go
+    through (None to run them directly).
+
+    get_system_info_async sets one that runs them on its event loop.
+    """
+    return getattr(_local, "runner", None)
+
+
+def _run_probe(probe, args, end, on_start=None, runner=None):
+    # The probe's timeout starts now, when a worker picks it up, not when it
+    # was queued; on_start(start time) tells the scheduler it has started
+    started = time.monotonic()
+    deadline = _probe_deadline(probe, started, end)
+    if on_start is not None:
+        on_start(started)
+    _local.deadline = deadline
+    _local.runner = runner
+    try:
+        result = probe.func(*args)
+    finally:
+        _local.deadline = None
+        _local.runner = None
+    # Commands killed at the deadline make probes return their fallback in
+    # time for it: a probe that overran still counts as timed out
+    if deadline is not None and time.monotonic() >= deadline:
+        return TIMED_OUT
+    return result
+
+
+class _DaemonPool:
+    """A minimal thread pool whose workers are daemon threads.
+
+    ThreadPoolExecutor joins its workers at interpreter exit, so a probe
+    stuck in an uninterruptible read (a hung NFS mount, a wedged driver)
+    would keep the process alive forever. Workers here are abandoned
+    instead: shutdown() never waits for them.
+    """
+
+    def __init__(self, max_workers):
+        from concurrent.futures import Future
+        self._future_class = Future
+        self._queue = queue.SimpleQueue()
+        self._workers = max_workers
+        for index in range(max_workers):
+            threading.Thread(target=self._work, name=f"kernelview_{index}", daemon=True).start()
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, func, args = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def submit(self, func, *args):
+        future = self._future_class()
+        self._queue.put((future, func, args))
+        return future
+
+    def shutdown(self):
+        for _ in range(self._workers):
+            self._queue.put(None)
+
+
+def _check_dependencies(probes):
+    names = set()
+    for probe in probes:
+        missing = [dep for dep in probe.deps if dep not in names]
+        if missing:
+            raise ValueError(f"probe {probe.name!r} needs {', '.join(missing)} to run before it")
+        names.add(probe.name)
+
+
+def _skipped(probe, args, breaker, end, now):
+    # Probes not worth starting: their input timed out, they keep timing
+    # out, or the run is already out of time
+    return (
+        any(arg is TIMED_OUT for arg in args)
+        or (breaker is not None and breaker.is_open(probe.name))
+        or (end is not None and now >= end)
+    )
+
+
+def _probe_deadline(probe, now, end):
+    deadline = now + probe.timeout if probe.timeout is not None else None
+    if end is not None:
+        deadline = end if deadline is None else min(deadline, end)
+    return deadline
+
+
+def _own_timeout_expired(probe, started, now):
+    # Only a probe that ran past its own timeout is tripped: one cut short by
+    # the run's deadline (a short --deadline, record's interval) may well
+    # complete in a run without one
+    return probe.timeout is not None and now >= started + probe.timeout
+
+
+class _Scheduler:
+    """The bookkeeping of one concurrent collection.
+
+    Shared by iter_collect and aio.collect_async: it decides which probes
+    to start, skip or time out, while the caller runs them and waits for
+    them. `submit(probe, args)` starts a probe and returns (future, started),
+    where `started` completes with the probe's start time once it is
+    actually running. A probe still queued for a worker is only held to the
+    run deadline `end`, and is never tripped in `breaker`: it did not get
+    the chance to time out on its own.
+    """
+
+    def __init__(self, probes, submit, breaker=None, end=None):
+        self.pending = list(probes)
+        self.running = {}  # future -> (probe, started)
+        self.results = {}
+        self._submit = submit
+        self._breaker = breaker
+        self._end = end
+
+    def _ready(self):
+        return [p for p in self.pending if all(dep in self.results for dep in p.deps)]
+
+    def start(self, now):
+        """Starts every probe whose dependencies are done.
+
+        Returns the (probe, TIMED_OUT) of the probes skipped instead.
+        """
+        finished = []
+        ready = self._ready()
+        while ready:
+            for probe in ready:
+                self.pending.remove(probe)
+                args = [self.results[dep] for dep in probe.deps]
+                if _skipped(probe, args, self._breaker, self._end, now):
+                    self.results[probe.name] = TIMED_OUT
+                    finished.append((probe, TIMED_OUT))
+                    continue
+                future, started = self._submit(probe, args)
+                self.running[future] = (probe, started)
+            # Skipping a probe can make the probes that depend on it ready
+            ready = self._ready()
+        return finished
+
+    def _deadline(self, probe, started):
+        return _probe_deadline(probe, started.result(), self._end) if started.done() else self._end
+
+    def _timed_out(self, probe, started, now):
+        self.results[probe.name] = TIMED_OUT
+        if self._breaker is not None and started.done() and _own_timeout_expired(probe, started.result(), now):
+            self._breaker.trip(probe.name)
+
+    def waitables(self):
+        """The futures to wait on: the running probes, and the start of the
+        queued ones (which sets their deadline)."""
+        waitables = list(self.running)
+        waitables.extend(started for _, started in self.running.values() if not started.done())
+        return waitables
+
+    def timeout(self, now):
+        """Seconds until the next deadline of a running probe (None without one)."""
+        deadlines = [self._deadline(probe, started) for probe, started in self.running.values()]
+        deadlines = [deadline for deadline in deadlines if deadline is not None]
+        return max(0.0, min(deadlines) - now) if deadlines else None
+
+    def finish(self, done, now):
+        """Records the probes whose future is in `done`; returns their (probe, result).
+
+        A probe that only returned once past its deadline (see _run_probe)
+        is recorded as TIMED_OUT.
+        """
+        finished = []
+        for future in done:
+            if future not in self.running:  # The start of a probe
+                continue
+            probe, started = self.running.pop(future)
+            result = future.result()
+            if result is TIMED_OUT:
+                self._timed_out(probe, started, now)
+            else:
+                self.results[probe.name] = result
+                if self._breaker is not None:
+                    self._breaker.reset(probe.name)
+            finished.append((probe, self.results[probe.name]))
+        return finished
+
+    def expire(self, now):
+        """Gives up on the probes past their deadline; returns their (probe, TIMED_OUT).
+
+        Their futures are cancelled, which only stops the ones still queued:
+        probes already running are left to finish (or hang) on their thread.
+        """
+        finished = []
+        for future, (probe, started) in list(self.running.items()):
+            deadline = self._deadline(probe, started)
+            if deadline is None or now < deadline:
+                continue
+            del self.running[future]
+            future.cancel()
+            self._timed_out(probe, started, now)
+            finished.append((probe, TIMED_OUT))
+        return finished
+
+    def cancel(self):
+        for future in self.running:
+            future.cancel()
+
+
+def iter_collect(probes, max_workers=None, deadline=None, breaker=None):
+    """Runs probes concurrently, each as soon as its dependencies are done.
+
+    `probes` is a sequence of Probe objects in dependency order (as returned
+    by ProbeRegistry.closure). Yields (name, result) for every non-hidden
+    probe as soon as it finishes, so consumers can start on fast fields
+    before the slowest probe is done.
+
+    A probe still running `timeout` seconds after a worker started it, or
+    once `deadline` seconds have passed since the start, yields TIMED_OUT
+    and is abandoned, so a hung probe never stalls the caller. With a
+    CircuitBreaker, probes that run past their own timeout are tripped and
+    probes it has open are skipped (TIMED_OUT).
+    """
+    probes = list(probes)
+    _check_dependencies(probes)
+    results = {}
+    if max_workers is None:
+        max_workers = min(DEFAULT_MAX_WORKERS, len(probes))
+    end = time.monotonic() + deadline if deadline is not None else None
+
+    if max_workers <= 1:
+        # Sequential fallback, useful for debugging and on constrained hosts.
+        # Probes cannot be abandoned here, only the commands they run are
+        # killed; a probe that overran still counts as timed out.
+        for probe in probes:
+            args = [results[dep] for dep in probe.deps]
+            if _skipped(probe, args, breaker, end, time.monotonic()):
+                results[probe.name] = TIMED_OUT
+            else:
+                starts = []
+                results[probe.name] = _run_probe(probe, args, end, starts.append)
+                if results[probe.name] is TIMED_OUT:
+                    if breaker is not None and _own_timeout_expired(probe, starts[0], time.monotonic()):
+                        breaker.trip(probe.name)
+                elif breaker is not None:
+                    breaker.reset(probe.name)
+            if not probe.hidden:
+                yield probe.name, results[probe.name]
+        return
+    if not probes:
+        return
+
+    # Imported here: a single probe (e.g. --fields os) runs without a pool
+    from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+    pool = _DaemonPool(min(max_workers, len(probes)))
+
+    def submit(probe, args):
+        started = Future()
+        return pool.submit(_run_probe, probe, args, end, started.set_result), started
+
+    schedule = _Scheduler(probes, submit, breaker, end)
+    try:
+        while schedule.pending or schedule.running:
+            for probe, result in schedule.start(time.monotonic()):
+                if not probe.hidden:
+                    yield probe.name, result
+            if not schedule.running:
+                continue
+
+            done, _ = wait(schedule.waitables(), timeout=schedule.timeout(time.monotonic()),
+                           return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+            for probe, result in schedule.finish(done, now) + schedule.expire(now):
+                if not probe.hidden:
+                    yield probe.name, result
+    finally:
+        schedule.cancel()
+        pool.shutdown()
+
+
+def collect(probes, max_workers=None, deadline=None, breaker=None):
+    """Runs probes like iter_collect and returns their results as a dict.
+
+    The dict keeps the order of `probes`, regardless of the order in which
+    they finish.
+    """
+    probes = list(probes)
+    results = dict(iter_collect(probes, max_workers, deadline, breaker))
+    return {probe.name: results[probe.name] for probe in probes if not probe.hidden}
@@ -1,11 +1,21 @@
+import functools
 import os
-import platform
-import psutil
-import socket
-import subprocess
-import time
-import datetime
 import re
+import sys
+import time
+
+# psutil, subprocess, socket, platform and the like are imported by the
+# probes that need them, so that importing this module and collecting a few
+# cheap fields stays fast.
+from . import cpu_sampler, cpu_telemetry, disk_sampler, gpu, network, profiling, session, storage
+from .cache import FactCache
+from .breaker import CircuitBreaker
+from .collector import command_killed, command_runner, iter_collect, time_left
+from .languages import installed_languages
+from .packages import DARWIN_BACKENDS, LINUX_BACKENDS, WINDOWS_BACKENDS, count_packages
+from .probes import TIMED_OUT, ProbeRegistry
+from .state import file_stamp
+from .terminal import CLEAR_SCREEN, is_terminal, use_color
 
 # Modern color scheme with better contrast
 COLOR_HEADER = "\033[34m"  # Bright blue
@@ -15,32 +25,93 @@ COLOR_VALUE = "\033[38;5;249m"  # Light gray
 COLOR_ACCENT = "\033[34m"  # Blue
 COLOR_RESET = "\033[0m"
 
-SYSTEM_NAME = platform.system()
+# platform.system() values for sys.platform, without importing platform
+_SYSTEM_NAMES = {"linux": "Linux", "darwin": "Darwin", "win32": "Windows"}
+
+
+def _system_name():
+    if sys.platform in _SYSTEM_NAMES:
+        return _SYSTEM_NAMES[sys.platform]
+    import platform
+    return platform.system()
+
 
-# Helper to remove ANSI escape codes for accurate string length calculation
-def _strip_ansi(text):
-    return re.sub(r'\x1b\[[0-9;]*m', '', text)
+SYSTEM_NAME = _system_name()
 
-def _run_command(command, shell=False, suppress_errors=True):
-    """Helper to run shell commands and return stripped output."""
+# Roots of the filesystems the Linux probes read, overridable for fixtures
+# (see bench.py; ports.PROCFS_PATH and gpu.SYSFS_PATH work the same way)
+PROCFS_PATH = "/proc"
+SYSFS_PATH = "/sys"
+ETC_PATH = "/etc"
+
+# Longest an external command may run outside a probe deadline
+DEFAULT_COMMAND_TIMEOUT = 10.0
+
+
+def _kill(process):
+    # The child runs in its own session, so kill the whole group: with
+    # shell=True the shell would otherwise leave the pipeline running.
+    # Returns process.wait(), which the asyncio version must await
+    import signal
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except OSError:
+        pass
+    return process.wait()
+
+
+def _run_command(command, shell=False, suppress_errors=True, timeout=None):
+    """Helper to run shell commands and return stripped output.
+
+    Commands that run past `timeout` seconds (by default, the time left to
+    the probe running them, see collector.time_left) are killed and give "".
+    """
+    import subprocess
+    if timeout is None:
+        timeout = time_left()
+    if timeout is None:
+        timeout = DEFAULT_COMMAND_TIMEOUT
+    record = profiling.current()
+    started = time.perf_counter()
     try:
-        output = subprocess.check_output(
+        runner = command_runner()
+        if runner is not None:
+            # Probe running for get_system_info_async
+            return runner(command, shell, suppress_errors, timeout)
+        process = subprocess.Popen(
             command,
             shell=shell,
+            stdin=subprocess.DEVNULL, # Never wait for input
+            stdout=subprocess.PIPE,
             stderr=subprocess.DEVNULL if suppress_errors else None, # Use DEVNULL for cleaner suppression
             text=True,
-            encoding='utf-8'
-        ).strip()
-        return output
-    except (subprocess.CalledProcessError, FileNotFoundError, PermissionError): # Catch PermissionError
+            encoding='utf-8',
+            start_new_session=True,
+        )
+        with process:
+            try:
+                output, _ = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                _kill(process)
+                command_killed()
+                return ""
+        return output.strip() if process.returncode == 0 else ""
+    except (FileNotFoundError, PermissionError): # Catch PermissionError
         return ""
+    finally:
+        if record is not None:
+            record.command(command, started, time.perf_counter())
 
 
 def get_os_info():
     """Fetches detailed OS information."""
     if SYSTEM_NAME == "Linux":
-        if os.path.exists("/etc/os-release"):
-            with open("/etc/os-release") as f:
+        os_release_path = os.path.join(ETC_PATH, "os-release")
+        if os.path.exists(os_release_path):
+            with open(os_release_path) as f:
                 os_release = dict(
                     line.strip().split('=', 1) for line in f if '=' in line
                 )
@@ -48,8 +119,9 @@ def get_os_info():
             if pretty_name:
                 return pretty_name
 
-        if os.path.exists("/etc/lsb-release"):
-            with open("/etc/lsb-release") as f:
+        lsb_release_path = os.path.join(ETC_PATH, "lsb-release")
+        if os.path.exists(lsb_release_path):
+            with open(lsb_release_path) as f:
                 lsb_release = dict(
                     line.strip().split('=', 1) for line in f if '=' in line
                 )
@@ -63,22 +135,24 @@ def get_os_info():
                 )
 
         distro_files = {
-            '/etc/redhat-release': 'Red Hat',
-            '/etc/debian_version': 'Debian',
-            '/etc/alpine-release': 'Alpine Linux',
-            '/etc/arch-release': 'Arch Linux',
-            '/etc/gentoo-release': 'Gentoo',
-            '/etc/slackware-version': 'Slackware'
+            'redhat-release': 'Red Hat',
+            'debian_version': 'Debian',
+            'alpine-release': 'Alpine Linux',
+            'arch-release': 'Arch Linux',
+            'gentoo-release': 'Gentoo',
+            'slackware-version': 'Slackware'
         }
         for file, name in distro_files.items():
+            file = os.path.join(ETC_PATH, file)
             if os.path.exists(file):
                 with open(file) as f:
                     return f"{name} {f.read().strip()}"
 
-        return f"Linux {platform.release()}"
+        return f"Linux {os.uname().release}"
 
     elif SYSTEM_NAME == "Windows":
         # Using platform module for basic Windows version, more reliable than parsing wmic
+        import platform
         version_info = platform.win32_ver()
         product_name = version_info[0]
         build_number = version_info[2]
@@ -90,6 +164,7 @@ def get_os_info():
         build_version = _run_command(["sw_vers", "-buildVersion"])
         return f"macOS {product_version} (Build {build_version})"
     else:
+        import platform
         return platform.platform()
 
 
@@ -127,6 +202,7 @@ def get_shell():
                 return "CMD"
 
         # Last resort: try to get parent process name
+        import psutil
         try:
             parent_process = psutil.Process(os.getppid()).name().lower()
             if 'cmd.exe' in parent_process:
@@ -146,9 +222,8 @@ def get_shell():
 def get_kernel_info():
     """Retrieves kernel name and version."""
     if SYSTEM_NAME == "Linux":
-        kernel_name = _run_command("uname -s", shell=True)
-        kernel_version = _run_command("uname -r", shell=True)
-        return f"{kernel_name} {kernel_version}"
+        uname = os.uname()
+        return f"{uname.sysname} {uname.release}"
     elif SYSTEM_NAME == "Windows":
         # platform.win32_ver()[0] is product name, not kernel.
         # Use subprocess to get actual kernel version.
@@ -158,31 +233,38 @@ def get_kernel_info():
         except Exception:
             return "Windows NT Kernel" # Fallback
     elif SYSTEM_NAME == "Darwin":
-        kernel_name = "Darwin"
-        kernel_version = _run_command("uname -r", shell=True)
-        return f"{kernel_name} {kernel_version}"
+        return f"Darwin {os.uname().release}"
     return "Unknown"
 
 
 def get_cpu_info():
     """Extracts detailed CPU information."""
+    import platform
     if SYSTEM_NAME == "Windows":
         # platform.processor() is quite reliable on Windows for the human-readable name
         return platform.processor()
     elif SYSTEM_NAME == "Linux":
         try:
-            with open("/proc/cpuinfo") as f:
-                cpuinfo = f.read()
-            model_name_match = re.search(r"model name\s*:\s*(.*)", cpuinfo)
-            if model_name_match:
-                return model_name_match.group(1).strip()
+            # Stream the file: it repeats every field once per logical CPU, so
+            # the first block has everything and reading it whole costs
+            # hundreds of KiB on large hosts.
+            implementer = part = None
+            with open(os.path.join(PROCFS_PATH, "cpuinfo")) as f:
+                for line in f:
+                    key, _, value = line.partition(":")
+                    key = key.strip()
+                    if key == "model name":
+                        return value.strip()
+                    if key == "CPU implementer" and implementer is None:
+                        implementer = value.strip()
+                    elif key == "CPU part" and part is None:
+                        part = value.strip()
+                    if implementer is not None and part is not None:
+                        break
 
             if "ARM" in platform.machine() or "aarch64" in platform.machine():
-                implementer_match = re.search(r"CPU implementer\s*:\s*(.*)", cpuinfo)
-                part_match = re.search(r"CPU part\s*:\s*(.*)", cpuinfo)
-
-                implementer = implementer_match.group(1).strip() if implementer_match else "Unknown"
-                part = part_match.group(1).strip() if part_match else "Unknown"
+                implementer = implementer or "Unknown"
+                part = part or "Unknown"
 
                 implementer_map = {
                     "0x41": "ARM Ltd.", "0x61": "Apple", "0x51": "Qualcomm",
@@ -210,49 +292,130 @@ def get_cpu_info():
     return f"Unknown ({platform.machine()})"
 
 
-def get_cpu_speed():
-    """Fetches current CPU frequency, gracefully handling permissions."""
+def get_cpu_frequency():
+    """Fetches current CPU frequency in Hz (None if unknown), gracefully handling permissions.
+
+    On Linux this is the median across all CPUs (see get_cpu_frequency_stats).
+    """
     try:
         if SYSTEM_NAME == "Linux":
-            # Try dynamic frequency from sysfs (may require root, handle PermissionError)
-            try:
-                with open("/sys/devices/system/cpu/cpu0/cpufreq/scaling_cur_freq") as f:
-                    freq_khz = float(f.read().strip())
-                    return f"{freq_khz / 1000:.2f} MHz"
-            except (FileNotFoundError, PermissionError):
-                # Fallback to nominal frequency from /proc/cpuinfo
-                with open("/proc/cpuinfo") as f:
-                    for line in f:
-                        if "cpu MHz" in line:
-                            return f"{float(line.split(':')[1].strip()):.2f} MHz"
-            return "Unknown"
+            stats = get_cpu_frequency_stats()
+            return stats["median_hz"] if stats else None
         elif SYSTEM_NAME == "Windows":
-            # Use PowerShell to get current clock speed
+            # Use PowerShell to get current clock speed (in MHz)
             output = _run_command("powershell.exe -NoProfile -Command \"(Get-CimInstance Win32_Processor).CurrentClockSpeed\"")
-            return f"{output} MHz" if output else "Unknown"
+            return int(output) * 1000000 if output else None
         elif SYSTEM_NAME == "Darwin":
             # Use sysctl for CPU frequency (in Hz)
             output = _run_command(["sysctl", "-n", "hw.cpufrequency"])
-            if output:
-                freq_hz = float(output)
-                return f"{freq_hz / 1e9:.2f} GHz"
-            return "Unknown"
-        return "Unknown"
+            return int(output) if output else None
+        return None
     except Exception:
+        return None
+
+
+def format_frequency(freq_hz):
+    return f"{freq_hz / 1e6:.2f} MHz" if freq_hz else "Unknown"
+
+
+def get_cpu_frequency_stats():
+    """Returns the current frequency across CPUs in Hz (None if unknown).
+
+    On Linux every CPU is read (see cpu_telemetry.read_frequencies) and the
+    result has the median, min and max, a histogram, the scaling governors
+    and per-CPU frequencies; elsewhere the single frequency the OS reports
+    stands for every CPU.
+    """
+    if SYSTEM_NAME == "Linux":
+        try:
+            return cpu_telemetry.read_frequencies().stats()
+        except Exception:
+            return None
+    freq_hz = get_cpu_frequency()
+    if not freq_hz:
+        return None
+    return {"median_hz": freq_hz, "min_hz": freq_hz, "max_hz": freq_hz, "histogram": [], "governors": {},
+            "cpus": [], "per_cpu_hz": []}
+
+
+def format_frequency_stats(stats):
+    if not stats:
+        return "Unknown"
+    text = format_frequency(stats["median_hz"])
+    if stats["min_hz"] != stats["max_hz"]:
+        text += f" ({stats['min_hz'] / 1e6:.0f}-{stats['max_hz'] / 1e6:.0f} MHz)"
+    if stats["governors"]:
+        text += f", {'/'.join(stats['governors'])}"
+    return text
+
+
+def get_cpu_topology():
+    """Returns sockets, cores, threads, NUMA nodes and caches (Linux only, None elsewhere)."""
+    if SYSTEM_NAME == "Linux":
+        try:
+            return cpu_telemetry.read_topology()
+        except Exception:
+            return None
+    return None
+
+
+def _format_cache_size(size):
+    if size is None:
+        return "?"
+    if size >= 1024**2:
+        return f"{size / 1024**2:g} MiB"
+    return f"{size / 1024:g} KiB"
+
+
+def format_cpu_topology(topology):
+    if not topology:
         return "Unknown"
+    parts = []
+    if topology["sockets"]:
+        parts.append(f"{topology['sockets']} socket{'s' if topology['sockets'] != 1 else ''}")
+    if topology["numa_nodes"]:
+        count = len(topology["numa_nodes"])
+        parts.append(f"{count} NUMA node{'s' if count != 1 else ''}")
+    for cache in topology["caches"]:
+        suffix = {"Data": "d", "Instruction": "i"}.get(cache["type"], "")
+        parts.append(f"L{cache['level']}{suffix} {_format_cache_size(cache['size_bytes'])} x{cache['instances']}")
+    return ", ".join(parts) if parts else "Unknown"
+
+
+def get_cpu_speed():
+    """Fetches current CPU frequency as display text."""
+    return format_frequency(get_cpu_frequency())
+
 
+def get_cpu_usage_stats(min_window=None):
+    """Returns overall and per-CPU usage percentages (None on failure).
 
-def get_cpu_usage():
-    """Fetches CPU usage percentage."""
-    # psutil.cpu_percent with interval is reliable and platform-agnostic
+    Usage is measured since the sampler's baseline (process start, or the
+    previous run's persisted sample), sleeping only if that baseline is younger
+    than `min_window` seconds.
+    """
     try:
-        return f"{psutil.cpu_percent(interval=1)}%"
+        usage = cpu_sampler.sample(min_window)
     except Exception:
-        return "N/A" # Cannot get dynamic CPU usage
+        return None # Cannot get dynamic CPU usage
+    return _cpu_usage_stats(usage)
 
 
-def get_gpu_info():
-    """Retrieves GPU information."""
+def _cpu_usage_stats(usage):
+    return {"percent": usage.overall, "per_cpu": usage.per_cpu, "window_seconds": round(usage.window, 3)}
+
+
+def format_cpu_usage(stats):
+    return f"{stats['percent']}%" if stats else "N/A"
+
+
+def get_cpu_usage(min_window=None):
+    """Fetches CPU usage percentage (see get_cpu_usage_stats)."""
+    return format_cpu_usage(get_cpu_usage_stats(min_window))
+
+
+def get_gpu_info(devices=None):
+    """Retrieves GPU information (every GPU, comma-separated)."""
     if SYSTEM_NAME == "Windows":
         wmic_output = _run_command("wmic path Win32_VideoController get Caption")
         lines = wmic_output.splitlines()
@@ -260,45 +423,76 @@ def get_gpu_info():
             return lines[1].strip()
         return "Unknown"
     elif SYSTEM_NAME == "Linux":
-        output = _run_command("lspci -v | grep -i 'VGA\\|3D\\|Display'")
+        if devices is not None or gpu.pci_bus_available():
+            # Enumerate display controllers from sysfs, no lspci pipeline
+            if devices is None:
+                devices = gpu.gpu_devices(names=False)
+            devices = gpu.resolve_names(devices)
+            return ", ".join(device.name for device in devices) if devices else "Unknown"
+        output = _run_command("lspci -v | grep -i 'VGA\\|3D\\|Display'", shell=True)
         match = re.search(r'\[(.*?)\]:\s*(.*)', output)
         if match:
             return match.group(2).strip()
         return output.split(":")[-1].strip() if output else "Unknown"
     elif SYSTEM_NAME == "Darwin":
-        output = _run_command("system_profiler SPDisplaysDataType | grep 'Chipset Model'")
+        output = _run_command("system_profiler SPDisplaysDataType | grep 'Chipset Model'", shell=True)
         return output.split(": ")[-1].strip() if output else "Unknown"
     return "Unknown"
 
 
-def get_vram_info():
-    """Attempts to get VRAM total, used, and percentage."""
+def _nvidia_vram():
+    """Returns (total, used, free) bytes summed over all NVIDIA GPUs, or None."""
+    output = _run_command([
+        "nvidia-smi", "--query-gpu=memory.total,memory.used,memory.free", "--format=csv,noheader,nounits"
+    ])
+    total_vram = used_vram = free_vram = 0
+    for line in output.splitlines(): # One line per GPU
+        try:
+            total_str, used_str, free_str = line.split(',')
+            total_vram += int(total_str.strip())
+            used_vram += int(used_str.strip())
+            free_vram += int(free_str.strip())
+        except ValueError:
+            continue
+    # nvidia-smi reports whole MiB
+    return (total_vram * 1024**2, used_vram * 1024**2, free_vram * 1024**2) if total_vram > 0 else None
+
+
+def get_vram_info(devices=None):
+    """Attempts to get VRAM total, used, and percentage (bytes, summed over all GPUs)."""
     total_vram, used_vram, free_vram, vram_usage = None, None, None, None
 
+    if SYSTEM_NAME == "Linux" and (devices is not None or gpu.pci_bus_available()):
+        if devices is None:
+            devices = gpu.gpu_devices()
+        # amdgpu exposes VRAM in sysfs; NVIDIA needs nvidia-smi, so only run
+        # it when an NVIDIA device is actually present.
+        total_vram = sum(device.vram_total or 0 for device in devices)
+        used_vram = sum(device.vram_used or 0 for device in devices if device.vram_total)
+        if any(device.vendor_id == "10de" for device in devices):
+            nvidia = _nvidia_vram()
+            if nvidia:
+                total_vram += nvidia[0]
+                used_vram += nvidia[1]
+        if total_vram > 0:
+            vram_usage = (used_vram / total_vram) * 100
+            return total_vram, used_vram, total_vram - used_vram, round(vram_usage, 1)
+
+        # Intel GPUs often use shared memory
+        if any(device.vendor_id == "8086" for device in devices):
+            return None, None, None, "Shared" # Indicate shared memory
+        return None, None, None, None
+
     # Try NVIDIA first (common across OSes if nvidia-smi is in PATH)
-    output = _run_command(
-        "nvidia-smi --query-gpu=memory.total,memory.used,memory.free --format=csv,noheader,nounits"
-    )
-    if output:
-        try:
-            total_str, used_str, free_str = output.split(',')
-            total_vram = int(total_str.strip())
-            used_vram = int(used_str.strip())
-            free_vram = int(free_str.strip())
-            if total_vram > 0:
-                vram_usage = (used_vram / total_vram) * 100
-                return total_vram, used_vram, free_vram, round(vram_usage, 1)
-        except (ValueError, IndexError):
-            pass # Continue to other methods
+    import shutil
+    if shutil.which("nvidia-smi"):
+        nvidia = _nvidia_vram()
+        if nvidia:
+            total_vram, used_vram, free_vram = nvidia
+            vram_usage = (used_vram / total_vram) * 100
+            return total_vram, used_vram, free_vram, round(vram_usage, 1)
 
     if SYSTEM_NAME == "Linux":
-        # AMD via rocminfo (for total VRAM)
-        output = _run_command("rocminfo")
-        match = re.search(r'VRAM Total Memory:\s*(\d+)MB', output)
-        if match:
-            total_vram = int(match.group(1))
-            return total_vram, None, None, None # Usage is hard without specific tools
-
         # Intel GPUs often use shared memory
         if "Intel" in get_gpu_info():
             return None, None, None, "Shared" # Indicate shared memory
@@ -308,28 +502,32 @@ def get_vram_info():
         output = _run_command("wmic path Win32_VideoController get AdapterRAM /value")
         match = re.search(r'AdapterRAM=(\d+)', output)
         if match:
-            total_vram = int(match.group(1)) // (1024**2) # Convert bytes to MB
+            total_vram = int(match.group(1))
             return total_vram, None, None, None # Windows doesn't provide used VRAM easily via WMI/CMD
 
     elif SYSTEM_NAME == "Darwin":
-        output = _run_command("system_profiler SPDisplaysDataType | grep 'VRAM (Total):'")
+        output = _run_command("system_profiler SPDisplaysDataType | grep 'VRAM (Total):'", shell=True)
         match = re.search(r'VRAM \(Total\):\s*(\d+)', output)
         if match:
-            total_vram = int(match.group(1))
+            total_vram = int(match.group(1)) * 1024**2 # Reported in MB
             return total_vram, None, None, None
 
     return total_vram, used_vram, free_vram, vram_usage # Return all Nones/Unknown if nothing found
 
 
-def get_open_ports():
-    """Lists currently open TCP/UDP ports."""
+def list_open_ports():
+    """Returns every listening TCP/UDP port as a sorted list of ints (None on failure)."""
+    from . import ports
     open_ports = []
     try:
-        if SYSTEM_NAME == "Linux":
-            # Prefer 'ss' for speed and modern systems, fallback to netstat
-            output = _run_command("ss -tulnp")
+        if SYSTEM_NAME == "Linux" and ports.available():
+            # Read the kernel's socket tables directly, no fork and no fd walk
+            return ports.listening_ports()
+        elif SYSTEM_NAME == "Linux":
+            # /proc/net unreadable (restricted container), fallback to ss/netstat
+            output = _run_command("ss -tuln")
             if not output:
-                output = _run_command("netstat -tulnp") # Older/less common fallback
+                output = _run_command("netstat -tuln") # Older/less common fallback
 
             for line in output.splitlines():
                 parts = line.split()
@@ -378,73 +576,89 @@ def get_open_ports():
                             if port.isdigit():
                                 open_ports.append(port)
     except Exception:
-        return "Unknown" # Catch any unforeseen errors
+        return None # Catch any unforeseen errors
+
+    return sorted({int(port) for port in open_ports})
+
+
+def get_open_ports():
+    """Lists currently open TCP/UDP ports (the full list, truncated only for display)."""
+    return format_list(list_open_ports())
 
-    # Filter for unique ports and limit to 5 for brevity
-    unique_ports = sorted(list(set(open_ports)), key=int)
-    return ", ".join(unique_ports[:5]) + ("..." if len(unique_ports) > 5 else "") if unique_ports else "None"
 
+def list_installed_languages():
+    """Returns the common programming languages found (None on failure).
 
-def get_swap_memory():
-    """Retrieves swap memory details."""
+    Presence is read from an index of the executables on PATH, so nothing is
+    launched; see languages.language_versions() for versions.
+    """
     try:
-        swap = psutil.swap_memory()
-        total_swap = round(swap.total / (1024**3))
-        used_swap = round(swap.used / (1024**3))
-        free_swap = total_swap - used_swap # Directly calculate free swap
-        swap_usage = swap.percent
-        return total_swap, used_swap, free_swap, swap_usage
+        return installed_languages()
     except Exception:
-        return 0, 0, 0, 0  # Return zeros if swap info not available
+        return None
 
 
 def get_installed_languages():
     """Checks for common programming languages."""
-    languages_commands = {
-        "Python": ["python3", "--version"], # Prefer python3
-        "Node.js": ["node", "--version"],
-        "C": ["gcc", "--version"],
-        "C++": ["g++", "--version"],
-        "Go": ["go", "version"],
-        "Rust": ["rustc", "--version"],
-        "Java": ["java", "-version"],
-        "Perl": ["perl", "--version"],
-        "Ruby": ["ruby", "--version"],
-        "PHP": ["php", "--version"]
-    }
-    installed = []
-    for lang, cmd in languages_commands.items():
-        # Ensure command is run without shell=True if it's a list for security/portability
-        # And specifically handle java -version which prints to stderr
-        try:
-            if lang == "Java":
-                # Java -version prints to stderr, so we need to capture stderr
-                output = subprocess.check_output(cmd, stderr=subprocess.STDOUT, text=True, encoding='utf-8')
-            else:
-                output = _run_command(cmd)
-
-            if output: # Check if command executed successfully and returned anything
-                installed.append(lang)
-        except Exception:
-            continue
-    return ", ".join(installed[:5]) + ("..." if len(installed) > 5 else "") if installed else "None"
+    return format_list(list_installed_languages())
 
 
-def get_ip_address():
-    """Determines the local IP address."""
+def get_network_interfaces():
+    """Returns {"interfaces": [records], "default_interface": name} (None on failure).
+
+    Records (see network.interfaces) hold each interface's state, MTU,
+    speed and addresses, read from the kernel without any network traffic.
+    `default_interface` carries the IPv4 default route (None without one).
+    """
     try:
-        # Try connecting to an external server (Google's DNS) to get the local IP
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        ip = s.getsockname()[0]
-        s.close()
-        return ip
+        return {"interfaces": network.interfaces(), "default_interface": network.default_route_interface()}
     except Exception:
-        # Fallback to hostname resolution if direct connection fails
-        try:
-            return socket.gethostbyname(socket.gethostname())
-        except Exception:
-            return "Unknown"
+        return None
+
+
+def _format_interface(record):
+    details = [record["state"]]
+    if record["speed_mbps"]:
+        details.append(f"{record['speed_mbps']}Mb/s")
+    if record["mtu"]:
+        details.append(f"MTU {record['mtu']}")
+    addresses = " ".join(
+        f"{address['address']}/{address['prefix']}" if address["prefix"] is not None else address["address"]
+        for address in record["addresses"]
+    )
+    return f"{record['name']}{' ' + addresses if addresses else ''} ({', '.join(details)})"
+
+
+def format_network(stats):
+    if not stats:
+        return "Unknown"
+    # Loopback is on every host and says nothing about it; links that are up come first
+    shown = sorted((record for record in stats["interfaces"] if record["name"] != "lo"),
+                   key=lambda record: record["state"] != "up")
+    # Interface details hold commas themselves, so interfaces are set apart by semicolons
+    return "; ".join(_format_interface(record) for record in shown) if shown else "None"
+
+
+def get_ip_address(interfaces=None):
+    """Determines the local IP address from the interface inventory (get_network_interfaces).
+
+    The first IPv4 address of the default route's interface, else of any
+    interface that is up, else a global IPv6 address. Nothing is sent on
+    the network and no name is resolved.
+    """
+    if not interfaces:
+        return "Unknown"
+    records = [record for record in interfaces["interfaces"] if record["name"] != "lo"]
+    records.sort(key=lambda record: (record["name"] != interfaces["default_interface"], record["state"] != "up"))
+    for family, usable in [
+        ("ipv4", lambda address: not address.startswith(("127.", "169.254."))),
+        ("ipv6", lambda address: address != "::1" and not address.lower().startswith("fe80")),
+    ]:
+        for record in records:
+            for address in record["addresses"]:
+                if address["family"] == family and usable(address["address"]):
+                    return address["address"]
+    return "Unknown"
 
 
 def get_resolution():
@@ -486,6 +700,7 @@ def get_resolution():
 
 def get_terminal():
     """Identifies the terminal emulator."""
+    import psutil
     try:
         if SYSTEM_NAME == "Linux":
             term_program = os.environ.get('TERM_PROGRAM')
@@ -538,10 +753,11 @@ def get_window_manager():
         if SYSTEM_NAME == "Linux":
             if "WAYLAND_DISPLAY" in os.environ:
                 return "Wayland"
-            # Try wmctrl for X11 Window Manager (requires wmctrl package)
-            wm_name = _run_command("wmctrl -m | grep 'Name:'", shell=True)
-            if wm_name:
-                return wm_name.split(':')[-1].strip()
+            # Without an X display there is no window manager to look for
+            if "DISPLAY" in os.environ:
+                wm_name = session.find_process(session.WINDOW_MANAGER_PROCESSES)
+                if wm_name:
+                    return wm_name
             # Fallback to XDG_CURRENT_DESKTOP for Desktop Environment (often the WM for integrated DEs)
             return os.environ.get('XDG_CURRENT_DESKTOP', 'Unknown (X11)')
         elif SYSTEM_NAME == "Windows":
@@ -560,7 +776,10 @@ def get_system_locale():
             # PowerShell for current UI culture name
             output = _run_command("powershell.exe -NoProfile -Command \"(Get-Culture).Name\"")
             return output if output else os.environ.get('LANG', 'Unknown Windows Locale')
-        elif SYSTEM_NAME == "Linux" or SYSTEM_NAME == "Darwin":
+        elif SYSTEM_NAME == "Linux":
+            # Environment first, then /etc/locale.conf or /etc/default/locale
+            return session.system_locale() or "Unknown"
+        elif SYSTEM_NAME == "Darwin":
             # Try locale command first
             locale_output = _run_command("locale", shell=True)
             lang_match = re.search(r'LANG="(.*?)"', locale_output)
@@ -595,21 +814,11 @@ def get_desktop_environment():
                 return "Wayland"
 
             # Check for common DE processes (less reliable, but a fallback)
-            processes = _run_command("ps -e", shell=True)
-            if "gnome-shell" in processes:
-                return "GNOME"
-            elif "plasmashell" in processes:
-                return "KDE Plasma"
-            elif "xfce4-session" in processes:
-                return "XFCE"
-            elif "cinnamon-session" in processes:
-                return "Cinnamon"
-            elif "mate-session" in processes:
-                return "MATE"
-            return "Unknown (possibly headless)"
+            return session.find_process(session.DESKTOP_PROCESSES) or "Unknown (possibly headless)"
         elif SYSTEM_NAME == "Windows":
             # Windows doesn't have "desktop environments" in the Linux sense.
             # We can report the Windows version.
+            import platform
             return f"Windows {platform.release()}"
         elif SYSTEM_NAME == "Darwin":
             return "macOS Aqua"
@@ -618,201 +827,536 @@ def get_desktop_environment():
         return "Unknown"
 
 
-def get_package_counts():
-    """Counts packages from various package managers."""
-    packages = {}
+def count_installed_packages(cache=None):
+    """Counts packages from various package managers ({manager: count}, None on failure).
+
+    Package databases are read directly instead of asking each package
+    manager, so no processes are spawned (except for winget, which has no
+    readable database). With a FactCache, counts are reused until the
+    database's mtime changes.
+    """
     try:
         if SYSTEM_NAME == "Linux":
-            # APT (Debian/Ubuntu)
-            if _run_command("command -v dpkg-query"):
-                try: packages["APT"] = int(_run_command("dpkg-query -f '${binary:Package}\n' -W 2>/dev/null | wc -l", shell=True))
-                except ValueError: pass
-            # Pacman (Arch)
-            if _run_command("command -v pacman"):
-                try: packages["Pacman"] = int(_run_command("pacman -Qq 2>/dev/null | wc -l", shell=True))
-                except ValueError: pass
-            # DNF (Fedora)
-            if _run_command("command -v dnf"):
-                try: packages["DNF"] = int(_run_command("dnf list installed --quiet 2>/dev/null | wc -l", shell=True))
-                except ValueError: pass
-            # Flatpak
-            if _run_command("command -v flatpak"):
-                try: packages["Flatpak"] = int(_run_command("flatpak list --columns=application | wc -l", shell=True))
-                except ValueError: pass
-            # Snap
-            if _run_command("command -v snap"):
-                try: packages["Snap"] = int(_run_command("snap list | wc -l", shell=True)) # Excludes header
-                except ValueError: pass
-
+            packages = count_packages(LINUX_BACKENDS, cache)
         elif SYSTEM_NAME == "Darwin":
-            # Homebrew
-            if _run_command("command -v brew"):
-                try: packages["Homebrew"] = int(_run_command("brew list --formula | wc -l", shell=True))
-                except ValueError: pass
-                try: packages["Homebrew Cask"] = int(_run_command("brew list --cask | wc -l", shell=True))
-                except ValueError: pass
-            # MacPorts
-            if _run_command("command -v port"):
-                try: packages["MacPorts"] = int(_run_command("port installed | wc -l", shell=True))
-                except ValueError: pass
-
+            packages = count_packages(DARWIN_BACKENDS, cache)
         elif SYSTEM_NAME == "Windows":
-            # Chocolatey
-            if _run_command("where choco", shell=True): # Check if choco is in PATH
-                try: packages["Chocolatey"] = int(_run_command("powershell.exe -NoProfile -Command \"(choco list --local-only | Measure-Object | Select-Object -ExpandProperty Count)\"", shell=True))
-                except ValueError: pass
+            packages = count_packages(WINDOWS_BACKENDS, cache)
             # Winget
-            if _run_command("where winget", shell=True):
+            import shutil
+            if shutil.which("winget"):
                 try: packages["Winget"] = int(_run_command("powershell.exe -NoProfile -Command \"(winget list --query '' | Measure-Object | Select-Object -ExpandProperty Count)\"", shell=True)) # --query '' to get all packages
                 except ValueError: pass
-            # Scoop
-            if _run_command("where scoop", shell=True):
-                try: packages["Scoop"] = int(_run_command("powershell.exe -NoProfile -Command \"(scoop list | Measure-Object | Select-Object -ExpandProperty Count)\"", shell=True))
-                except ValueError: pass
+        else:
+            packages = {}
     except Exception:
-        return "Unknown" # Catch broad errors in package counting
+        return None # Catch broad errors in package counting
+    return packages
 
+
+def format_package_counts(packages):
+    if packages is None:
+        return "Unknown"
     if packages:
         return ", ".join([f"{k} ({v})" for k, v in packages.items()])
     return "None detected"
 
 
-def get_system_info():
-    """Gathers all system information into a dictionary."""
-    total_vram, used_vram, free_vram, vram_usage = get_vram_info()
-    total_swap, used_swap, free_swap, swap_usage = get_swap_memory()
-    disk_usage = psutil.disk_usage('/')
+def get_package_counts(cache=None):
+    """Counts packages from various package managers, as display text."""
+    return format_package_counts(count_installed_packages(cache))
+
+
+def _boot_time():
+    """Returns the boot time as a Unix timestamp."""
+    if SYSTEM_NAME == "Linux":
+        # The btime line of /proc/stat is what psutil reads too, without the import
+        try:
+            with open(os.path.join(PROCFS_PATH, "stat"), "rb") as f:
+                for line in f:
+                    if line.startswith(b"btime "):
+                        return int(line.split()[1])
+        except (OSError, ValueError, IndexError):
+            pass
+    import psutil
+    return psutil.boot_time()
+
+
+def get_uptime_seconds():
+    """Returns the number of seconds elapsed since boot."""
+    return int(time.time() - _boot_time())
+
+
+def format_uptime(seconds):
+    import datetime
+    return str(datetime.timedelta(seconds=seconds))
+
+
+def get_uptime():
+    """Returns the time elapsed since boot."""
+    return format_uptime(get_uptime_seconds())
+
+
+def get_cpu_counts():
+    """Returns physical core and logical thread counts."""
+    import psutil
+    return {"cores": psutil.cpu_count(logical=False), "threads": psutil.cpu_count(logical=True)}
+
+
+def format_cpu_counts(counts):
+    return f"{counts['cores']}/{counts['threads']}"
+
+
+def _usage_stats(usage):
+    return {"total_bytes": usage.total, "used_bytes": usage.used, "free_bytes": usage.free, "percent": usage.percent}
+
+
+def get_ram_stats():
+    """Returns RAM total/used/free bytes and percentage used."""
+    import psutil
     ram = psutil.virtual_memory()
+    # `free` excludes reclaimable caches; `available` is what can be allocated
+    return dict(_usage_stats(ram), available_bytes=ram.available)
+
+
+def get_disk_stats(path='/'):
+    """Returns total/used/free bytes and percentage used of the filesystem holding `path`."""
+    import psutil
+    return _usage_stats(psutil.disk_usage(path))
+
+
+def get_storage_stats():
+    """Returns capacity per mounted filesystem and totals (see storage.storage_stats).
+
+    Mounts are queried concurrently; one that does not answer in time (a
+    stale NFS mount) is listed as timed out instead of hanging the report.
+    """
+    try:
+        return storage.storage_stats()
+    except Exception:
+        return None
+
+
+def _format_mount(record):
+    if record.get("timed_out"):
+        return f"{record['mount_point']} not responding"
+    return f"{record['mount_point']} {format_usage(record)}"
+
+
+def format_storage(stats):
+    if not stats or not stats["mounts"]:
+        return "Unknown"
+    return ", ".join([f"{format_usage(stats)} total"] + [_format_mount(record) for record in stats["mounts"]])
+
+
+def get_disk_io_stats(min_window=None):
+    """Returns read/write IOPS, bytes per second, await and utilisation per block device (None if unknown).
+
+    Rates are measured since the sampler's baseline (the previous sample,
+    or the previous run's persisted one) like CPU usage, sleeping only if
+    that baseline is younger than `min_window` seconds. Totals over all
+    devices are included.
+    """
+    if SYSTEM_NAME != "Linux":
+        return None
+    try:
+        stats = disk_sampler.sample(min_window)
+    except Exception:
+        return None
+    for key in ["read_iops", "write_iops", "read_bytes_per_second", "write_bytes_per_second"]:
+        stats[key] = round(sum(device[key] for device in stats["devices"]), 1)
+    return stats
+
+
+def _format_rate(bytes_per_second):
+    return f"{bytes_per_second / 1e6:.1f} MB/s"
+
+
+def format_disk_io(stats):
+    if not stats or not stats["devices"]:
+        return "Unknown"
+    busiest = max(stats["devices"], key=lambda device: device["utilisation_percent"])
+    return (
+        f"R {_format_rate(stats['read_bytes_per_second'])} ({stats['read_iops']:g} IOPS), "
+        f"W {_format_rate(stats['write_bytes_per_second'])} ({stats['write_iops']:g} IOPS), "
+        f"{busiest['device']} {busiest['utilisation_percent']}% busy"
+    )
+
+
+def get_network_io_stats(min_window=None):
+    """Returns rx/tx bytes and packets per second, errors and drops per interface (None if unknown).
+
+    Sampled like get_disk_io_stats, from /proc/net/dev (psutil elsewhere),
+    with totals over all interfaces but loopback.
+    """
+    try:
+        stats = network.sample(min_window)
+    except Exception:
+        return None
+    external = [record for record in stats["interfaces"] if record["interface"] != "lo"]
+    for key in ["rx_bytes_per_second", "tx_bytes_per_second", "rx_errors", "tx_errors", "rx_drops", "tx_drops"]:
+        stats[key] = sum(record[key] for record in external)
+    return stats
 
-    info = {
-        "OS": get_os_info(),
-        "Kernel": get_kernel_info(),
-        "Uptime": str(datetime.timedelta(seconds=int(time.time() - psutil.boot_time()))),
-        "Shell": get_shell(),
-        "Python": platform.python_version(), # Still showing Python version for Python tool
-        "CPU": get_cpu_info(),
-        "Cores/Threads": f"{psutil.cpu_count(logical=False)}/{psutil.cpu_count(logical=True)}",
-        "CPU Speed": get_cpu_speed(), # Use dedicated function
-        "CPU Usage": get_cpu_usage(), # Use dedicated function
-        "GPU": get_gpu_info(),
-        "VRAM": (
-            f"{used_vram}/{total_vram}MB ({vram_usage}%)"
-            if total_vram and used_vram is not None
-            else (f"{total_vram}MB (Total)" if total_vram else (vram_usage if isinstance(vram_usage, str) else "Unknown"))
-        ),
-        "RAM": f"{round(ram.used/(1024**3))}GB/{round(ram.total/(1024**3))}GB ({ram.percent}%)",
-        "Disk": f"{round(disk_usage.used/(1024**3))}GB/{round(disk_usage.total/(1024**3))}GB ({disk_usage.percent}%)",
-        "Swap": f"{used_swap}GB/{total_swap}GB ({swap_usage}%)",
-        "Hostname": socket.gethostname(),
-        "IP Address": get_ip_address(),
-        "Open Ports": get_open_ports(),
-        "Locale": get_system_locale(),
-        "Resolution": get_resolution(),
-        "Window Manager": get_window_manager(),
-        "DE": get_desktop_environment(),
-        "Terminal": get_terminal(),
-        "Packages": get_package_counts(),
-        "Languages": get_installed_languages(),
+
+def format_network_io(stats):
+    if not stats or not stats["interfaces"]:
+        return "Unknown"
+    text = f"RX {_format_rate(stats['rx_bytes_per_second'])}, TX {_format_rate(stats['tx_bytes_per_second'])}"
+    problems = stats["rx_errors"] + stats["tx_errors"] + stats["rx_drops"] + stats["tx_drops"]
+    return f"{text}, {problems} errors/drops" if problems else text
+
+
+def get_swap_stats():
+    """Returns swap total/used/free bytes and percentage used."""
+    import psutil
+    try:
+        return _usage_stats(psutil.swap_memory())
+    except Exception:
+        return {"total_bytes": 0, "used_bytes": 0, "free_bytes": 0, "percent": 0}  # Swap info not available
+
+
+def format_usage(stats):
+    """Formats byte usage stats as 'usedGB/totalGB (percent%)'."""
+    return f"{round(stats['used_bytes']/(1024**3))}GB/{round(stats['total_bytes']/(1024**3))}GB ({stats['percent']}%)"
+
+
+def get_gpu_devices():
+    """Returns the sysfs GPU inventory (without names), or None where there is none."""
+    if SYSTEM_NAME == "Linux" and gpu.pci_bus_available():
+        return gpu.gpu_devices(names=False)
+    return None
+
+
+def get_vram_stats(devices=None):
+    """Returns get_vram_info as a dict: total and used bytes and percentage, or shared memory."""
+    total_vram, used_vram, free_vram, vram_usage = get_vram_info(devices)
+    return {
+        "total_bytes": total_vram or None,
+        "used_bytes": used_vram,
+        "percent": vram_usage if isinstance(vram_usage, float) else None,
+        "shared": vram_usage == "Shared",
     }
-    return info
-
-
-def display_system_info(info):
-    """Prints the system information to the console in a compact, text-only format."""
-    os.system('cls' if os.name == 'nt' else 'clear')
-
-    # Prepare info lines, grouped by implied categories for a cleaner look
-    info_groups = [
-        ("System", [
-            ("OS", "OS"),
-            ("Kernel", "Kernel"),
-            ("Uptime", "Uptime"),
-            ("Shell", "Shell"),
-            ("Terminal", "Terminal"),
-        ]),
-        ("Hardware", [
-            ("CPU", "CPU"),
-            ("GPU", "GPU"),
-            ("RAM", "RAM"),
-            ("VRAM", "VRAM"),
-        ]),
-        ("Network", [
-            ("Hostname", "Hostname"),
-            ("IP Address", "IP Address"),
-        ]),
-        ("Storage", [
-            ("Disk", "Disk"),
-            ("Swap", "Swap"),
-        ]),
-        ("Display", [
-            ("Resolution", "Resolution"),
-            ("DE", "DE"),
-            ("WM", "Window Manager"),
-        ]),
-        ("Software", [
-            ("Packages", "Packages"),
-            ("Languages", "Languages"),
-            ("Python", "Python"),
-        ]),
-        ("CPU Stats", [
-            ("Cores/Threads", "Cores/Threads"),
-            ("Speed", "CPU Speed"),
-            ("Usage", "CPU Usage"),
-        ]),
-        ("Other", [
-            ("Locale", "Locale"),
-            ("Ports", "Open Ports"),
-        ])
-    ]
-
-    formatted_info_lines = []
-
-    # Calculate max key length across all info lines for consistent alignment
-    max_key_display_length = 0
-    for _, group_items in info_groups:
-        for key_display, _ in group_items:
-            # Only consider keys that will actually have a value to be displayed
-            # (check against info dictionary before using for length calculation)
-            if info.get(group_items[group_items.index((key_display, _))][1], "N/A") != "N/A":
-                max_key_display_length = max(max_key_display_length, len(key_display))
-
-    for category_display_name, group_items in info_groups:
-        current_category_lines = []
-        for key_display, info_dict_key in group_items:
-            value = info.get(info_dict_key, "N/A")
-            if value not in ["N/A", "Unknown", "None", "0GB/0GB (0.0%)", "0/0GB (0.0%)", "Not installed", "Shared"]: # Filter out "N/A" etc. or empty strings
-                # Refine filtering for VRAM specifically to always show if it's "Shared"
-                if info_dict_key == "VRAM" and value == "Shared":
-                     line = f"{COLOR_KEY}{key_display.ljust(max_key_display_length)}: {COLOR_VALUE}{value}{COLOR_RESET}"
-                     current_category_lines.append(line)
-                elif value and value not in ["N/A", "Unknown", "None", "0GB/0GB (0.0%)", "0/0GB (0.0%)", "Not installed"]:
-                    # Format: "Key: Value" with colors and consistent key padding
-                    line = f"{COLOR_KEY}{key_display.ljust(max_key_display_length)}: {COLOR_VALUE}{value}{COLOR_RESET}"
-                    current_category_lines.append(line)
-
-        if current_category_lines:
-            # Add category header only if there are items in the category
-            formatted_info_lines.append(f"{COLOR_CATEGORY}─── {category_display_name} ───{COLOR_RESET}")
-            formatted_info_lines.extend(current_category_lines)
-
-    # Calculate max width for the info column (using _strip_ansi for accurate length)
-    max_info_width = 0
-    for line in formatted_info_lines:
-        max_info_width = max(max_info_width, len(_strip_ansi(line)))
-
-    # Print the header (KernelView) centered over the info section
-    title_spacing = (max_info_width // 2) - (len("KernelView") // 2)
-
-    print(f"{' ' * max(0, title_spacing)}{COLOR_ACCENT}KernelView{COLOR_RESET}\n")
-
-    for line in formatted_info_lines:
-        # Calculate padding for info part to align using _strip_ansi
-        clean_info_part_len = len(_strip_ansi(line))
-        info_padding = max_info_width - clean_info_part_len if max_info_width > clean_info_part_len else 0
-
-        print(f"{line}{' ' * info_padding}")
-
-    print("\n") # Add a final newline for spacing
+
+
+def format_vram(stats):
+    total_vram = stats["total_bytes"] // 1024**2 if stats["total_bytes"] else None
+    if total_vram and stats["used_bytes"] is not None:
+        return f"{stats['used_bytes'] // 1024**2}/{total_vram}MB ({stats['percent']}%)"
+    if total_vram:
+        return f"{total_vram}MB (Total)"
+    return "Shared" if stats["shared"] else "Unknown"
+
+
+def get_python_version():
+    """Returns the version of the running Python (what platform.python_version() gives)."""
+    return sys.version.split()[0]
+
+
+def get_hostname():
+    """Returns the host name."""
+    import socket
+    return socket.gethostname()
+
+
+def format_list(items):
+    if items is None:
+        return "Unknown"
+    return ", ".join(str(item) for item in items) if items else "None"
+
+
+# Every field is produced by a named probe. Probes declare the probes whose
+# results they take as arguments; the collector runs everything else
+# concurrently. Registration order is the field order of get_system_info.
+# Probes that only read files keep the default timeout; those that may block
+# on something outside the process (an X server, DNS) get a tighter one.
+PROBES = ProbeRegistry()
+PROBES.register("OS", get_os_info)
+PROBES.register("Kernel", get_kernel_info, timeout=2.0)
+PROBES.register("Uptime", get_uptime_seconds, format=format_uptime)
+PROBES.register("Shell", get_shell)
+PROBES.register("Python", get_python_version) # Still showing Python version for Python tool
+PROBES.register("CPU", get_cpu_info)
+PROBES.register("Cores/Threads", get_cpu_counts, aliases=["cores", "threads"], format=format_cpu_counts)
+PROBES.register("CPU Speed", get_cpu_frequency_stats, aliases=["speed", "freq"], format=format_frequency_stats)
+PROBES.register("CPU Usage", get_cpu_usage_stats, aliases=["usage", "load"], format=format_cpu_usage)
+PROBES.register("CPU Topology", get_cpu_topology, aliases=["topology", "numa", "caches"], format=format_cpu_topology)
+PROBES.register("GPU Devices", get_gpu_devices, hidden=True)
+PROBES.register("GPU", get_gpu_info, deps=["GPU Devices"])
+PROBES.register("VRAM", get_vram_stats, deps=["GPU Devices"], format=format_vram)
+PROBES.register("RAM", get_ram_stats, aliases=["memory", "mem"], format=format_usage)
+PROBES.register("Disk", get_disk_stats, format=format_usage)
+PROBES.register("Storage", get_storage_stats, aliases=["mounts", "filesystems"], format=format_storage)
+PROBES.register("Disk I/O", get_disk_io_stats, aliases=["io", "iops"], format=format_disk_io)
+PROBES.register("Swap", get_swap_stats, format=format_usage)
+PROBES.register("Hostname", get_hostname, aliases=["host"])
+PROBES.register("Network", get_network_interfaces, aliases=["net", "interfaces", "nics"], format=format_network)
+PROBES.register("IP Address", get_ip_address, deps=["Network"], aliases=["ip"])
+PROBES.register("Network I/O", get_network_io_stats, aliases=["traffic", "bandwidth"], format=format_network_io)
+PROBES.register("Open Ports", list_open_ports, aliases=["ports"], format=format_list)
+PROBES.register("Locale", get_system_locale, timeout=2.0)
+PROBES.register("Resolution", get_resolution, timeout=2.0)
+PROBES.register("Window Manager", get_window_manager, aliases=["wm"], timeout=2.0)
+PROBES.register("DE", get_desktop_environment, aliases=["desktop"], timeout=2.0)
+PROBES.register("Terminal", get_terminal)
+PROBES.register("Packages", count_installed_packages, aliases=["pkgs"], format=format_package_counts, timeout=10.0)
+PROBES.register("Languages", list_installed_languages, format=format_list)
+
+
+def _boot_key():
+    # Anything that can only change across a reboot is keyed on the boot time
+    return [int(_boot_time())]
+
+
+def _os_key():
+    release_files = ["os-release", "lsb-release", "redhat-release", "debian_version"]
+    return _boot_key() + [file_stamp(os.path.join(ETC_PATH, name)) for name in release_files]
+
+
+def _topology_key():
+    # CPU hotplug changes the topology without a reboot
+    return _boot_key() + [len(cpu_telemetry.online_cpus())]
+
+
+def _shell_key():
+    shell_path = os.environ.get('SHELL', '')
+    return [shell_path, file_stamp(shell_path) if shell_path else None]
+
+
+# Fields that change from one second to the next, re-sampled on every --watch tick
+VOLATILE_FIELDS = [
+    "Uptime", "CPU Speed", "CPU Usage", "VRAM", "RAM", "Disk", "Storage", "Disk I/O", "Swap",
+    "Network", "Network I/O", "Open Ports",
+]
+
+# Fields that rarely change between runs -> invalidation key of their cached value
+STATIC_FACT_KEYS = {
+    "OS": _os_key,
+    "Kernel": _boot_key,
+    "Shell": _shell_key,
+    "CPU": _boot_key,
+    "CPU Topology": _topology_key,
+    "GPU": _boot_key,
+}
+
+
+def system_probes(fields=None, cpu_window=None, cache=None, profiler=None, probe_timeout=None, io_window=None):
+    """Returns the probes needed for `fields` (all by default) with run options
+    bound: the CPU and disk and network I/O sampling windows, caching of static facts if a FactCache
+    is given, instrumentation if a profiling.Profiler is, and `probe_timeout`
+    instead of each probe's own timeout if set."""
+    probes = []
+    for probe in (PROBES.closure(fields) if fields is not None else PROBES):
+        func = probe.func
+        if func is get_cpu_usage_stats and cpu_window is not None:
+            func = functools.partial(get_cpu_usage_stats, cpu_window)
+        if func is get_disk_io_stats and io_window is not None:
+            func = functools.partial(get_disk_io_stats, io_window)
+        if func is get_network_io_stats and io_window is not None:
+            func = functools.partial(get_network_io_stats, io_window)
+        if func is count_installed_packages:
+            # Cached per package manager rather than as a whole
+            func = functools.partial(count_installed_packages, cache)
+        elif cache is not None and probe.name in STATIC_FACT_KEYS:
+            func = cache.wrap(probe.name, STATIC_FACT_KEYS[probe.name], func)
+        if profiler is not None:
+            func = profiler.wrap(probe.name, func)
+        probes.append(probe.bind(func, probe_timeout))
+    return probes
+
+
+def iter_system_info(fields=None, max_workers=None, cpu_window=None, use_cache=True, refresh_cache=False,
+                     profiler=None, deadline=None, probe_timeout=None, use_breaker=True, io_window=None):
+    """Collects raw field values, yielding (field, value) as each probe finishes.
+
+    Takes the same arguments as get_system_info. Values are raw (see
+    format_fields); requested fields only, in completion order.
+    """
+    cache = FactCache(read=not refresh_cache) if use_cache or refresh_cache else None
+    breaker = CircuitBreaker() if use_breaker else None
+    requested = {PROBES.resolve(field) for field in fields} if fields is not None else None
+    probes = system_probes(fields, cpu_window, cache, profiler, probe_timeout, io_window)
+    for field, value in iter_collect(probes, max_workers=max_workers, deadline=deadline, breaker=breaker):
+        if requested is None or field in requested:
+            yield field, value
+    if cache is not None:
+        cache.save()
+    if breaker is not None:
+        breaker.save()
+
+
+def collect_system_info(fields=None, max_workers=None, cpu_window=None, use_cache=True, refresh_cache=False,
+                        profiler=None, deadline=None, probe_timeout=None, use_breaker=True, io_window=None):
+    """Like get_system_info, but returns raw values (bytes, Hz, percentages, lists)."""
+    raw = dict(iter_system_info(
+        fields, max_workers, cpu_window, use_cache, refresh_cache, profiler, deadline, probe_timeout, use_breaker,
+        io_window,
+    ))
+    order = fields and [PROBES.resolve(field) for field in fields]
+    return {field: raw[field] for field in (order or PROBES.fields()) if field in raw}
+
+
+def format_fields(raw):
+    """Turns raw field values into the display text get_system_info returns."""
+    return {field: PROBES[field].display(value) for field, value in raw.items()}
+
+
+def get_system_info(fields=None, max_workers=None, cpu_window=None, use_cache=True, refresh_cache=False,
+                    profiler=None, deadline=None, probe_timeout=None, use_breaker=True, io_window=None):
+    """Gathers system information into a dictionary of display strings.
+
+    `fields` selects a subset of fields by name or alias (see PROBES); only
+    the probes they need, including dependencies, are run. Probes run
+    concurrently on a thread pool of `max_workers` threads (1 runs them
+    sequentially), so the wall time is close to that of the slowest probe.
+    `cpu_window` overrides the minimum CPU usage sampling window in seconds,
+    `io_window` that of disk and network I/O rates.
+
+    Fields listed in STATIC_FACT_KEYS, and package counts, are served from the
+    on-disk fact cache while their invalidation key is unchanged. `use_cache=False`
+    bypasses the cache entirely; `refresh_cache=True` recomputes every fact and
+    rewrites it.
+
+    With a profiling.Profiler as `profiler`, every probe's wall and CPU time,
+    commands and /proc and /sys reads are recorded on it.
+
+    No call blocks for long: a probe that runs past its timeout (see
+    Probe.timeout; `probe_timeout` overrides it for all probes), or past
+    `deadline` seconds for the whole run, is abandoned, its commands are
+    killed, and its field reads "timed out" (TIMED_OUT in raw values).
+    Probes that timed out are skipped on later runs until a cooldown
+    expires (see breaker.CircuitBreaker), unless `use_breaker=False`.
+    """
+    return format_fields(collect_system_info(
+        fields, max_workers, cpu_window, use_cache, refresh_cache, profiler, deadline, probe_timeout, use_breaker,
+        io_window,
+    ))
+
+
+# Comma-separated fields that are cut short on screen (the API keeps the full list)
+DISPLAY_LIST_LIMITS = {
+    "Open Ports": 5,
+    "Storage": 4,  # The total and the first three mounts
+    "Network": 3,
+    "Languages": 5,
+}
+
+# Fields whose list items are separated by something other than ", "
+DISPLAY_LIST_SEPARATORS = {
+    "Network": "; ",
+}
+
+
+def _truncate_list(value, limit, separator=", "):
+    items = value.split(separator)
+    return separator.join(items[:limit]) + ("..." if len(items) > limit else "")
+
+
+# Fields on screen: (category, [(label, field), ...]) in display order
+DISPLAY_GROUPS = [
+    ("System", [
+        ("OS", "OS"),
+        ("Kernel", "Kernel"),
+        ("Uptime", "Uptime"),
+        ("Shell", "Shell"),
+        ("Terminal", "Terminal"),
+    ]),
+    ("Hardware", [
+        ("CPU", "CPU"),
+        ("GPU", "GPU"),
+        ("RAM", "RAM"),
+        ("VRAM", "VRAM"),
+    ]),
+    ("Network", [
+        ("Hostname", "Hostname"),
+        ("IP Address", "IP Address"),
+        ("Interfaces", "Network"),
+        ("Traffic", "Network I/O"),
+    ]),
+    ("Storage", [
+        ("Disk", "Disk"),
+        ("Mounts", "Storage"),
+        ("I/O", "Disk I/O"),
+        ("Swap", "Swap"),
+    ]),
+    ("Display", [
+        ("Resolution", "Resolution"),
+        ("DE", "DE"),
+        ("WM", "Window Manager"),
+    ]),
+    ("Software", [
+        ("Packages", "Packages"),
+        ("Languages", "Languages"),
+        ("Python", "Python"),
+    ]),
+    ("CPU Stats", [
+        ("Cores/Threads", "Cores/Threads"),
+        ("Speed", "CPU Speed"),
+        ("Usage", "CPU Usage"),
+        ("Topology", "CPU Topology"),
+    ]),
+    ("Other", [
+        ("Locale", "Locale"),
+        ("Ports", "Open Ports"),
+    ])
+]
+
+# Values not worth a line on screen
+_HIDDEN_VALUES = frozenset(["N/A", "Unknown", "None", "0GB/0GB (0.0%)", "0/0GB (0.0%)", "Not installed", "Shared"])
+
+
+def format_system_info(info, color=True):
+    """Builds the display lines (title, blank line, grouped fields) for `info`.
+
+    Visible widths are tracked while the lines are built, so alignment never
+    has to measure text with escape sequences in it. `color=False` builds
+    plain lines.
+    """
+    groups = []  # (category, [(label, value), ...])
+    key_width = 0
+    for category, items in DISPLAY_GROUPS:
+        rows = []
+        for label, field in items:
+            value = info.get(field)
+            if field in DISPLAY_LIST_LIMITS and isinstance(value, str):
+                value = _truncate_list(value, DISPLAY_LIST_LIMITS[field], DISPLAY_LIST_SEPARATORS.get(field, ", "))
+            if value and value not in _HIDDEN_VALUES:
+                rows.append((label, value))
+                key_width = max(key_width, len(label))
+        if rows:
+            # Categories without anything to show get no header either
+            groups.append((category, rows))
+
+    lines = []  # (visible width, text)
+    for category, rows in groups:
+        header = f"─── {category} ───"
+        lines.append((len(header), f"{COLOR_CATEGORY}{header}{COLOR_RESET}" if color else header))
+        for label, value in rows:
+            key = label.ljust(key_width)
+            text = f"{COLOR_KEY}{key}: {COLOR_VALUE}{value}{COLOR_RESET}" if color else f"{key}: {value}"
+            lines.append((key_width + 2 + len(value), text))
+
+    max_width = max((width for width, _ in lines), default=0)
+    # The header (KernelView) centered over the info section
+    title_spacing = (max_width // 2) - (len("KernelView") // 2)
+    title = f"{COLOR_ACCENT}KernelView{COLOR_RESET}" if color else "KernelView"
+    output_lines = [f"{' ' * max(0, title_spacing)}{title}", ""]
+    output_lines.extend(f"{text}{' ' * (max_width - width)}" for width, text in lines)
+    return output_lines
+
+
+def display_system_info(info, stream=None):
+    """Prints the system information in a compact, text-only format.
+
+    The frame goes out in a single write. On a terminal the screen is
+    cleared first with an escape sequence; colour is left out when
+    `stream` (stdout by default) is not a terminal or NO_COLOR is set.
+    """
+    stream = stream or sys.stdout
+    lines = format_system_info(info, color=use_color(stream))
+    clear = CLEAR_SCREEN if is_terminal(stream) else ""
+    stream.write(clear + "\n".join(lines) + "\n\n\n")  # A blank line after the frame, for spacing
+    stream.flush()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,146 @@
+import threading
+import time
+from array import array
+from collections import namedtuple
+
+from .state import cache_path, load_json, save_json
+
+# Shortest window CPU usage is computed over. If the baseline is younger than
+# this the sampler sleeps for the remainder, so the figure is never noise.
+DEFAULT_MIN_WINDOW = 0.1
+# A persisted baseline older than this describes a different workload and is ignored
+MAX_BASELINE_AGE = 600
+
+CpuUsage = namedtuple("CpuUsage", ["overall", "per_cpu", "window"])
+
+
+def _read_cpu_times():
+    """Returns (busy, total) jiffy counters for every logical CPU."""
+    import psutil  # Only loaded once CPU usage is actually sampled
+    samples = []
+    for times in psutil.cpu_times(percpu=True):
+        # Same accounting as psutil.cpu_percent: guest time is already part of
+        # user time, and iowait counts as idle.
+        total = sum(times) - getattr(times, "guest", 0) - getattr(times, "guest_nice", 0)
+        idle = times.idle + getattr(times, "iowait", 0)
+        samples.append((total - idle, total))
+    return samples
+
+
+def _percent(busy_delta, total_delta):
+    if total_delta <= 0:
+        return 0.0
+    return round(min(100.0, max(0.0, busy_delta / total_delta * 100)), 1)
+
+
+class CpuSampler:
+    """Reports CPU utilisation as a delta from a baseline instead of sleeping.
+
+    The baseline is taken by mark() (or by the first sample, which then waits
+    `min_window`) and every sample becomes the baseline of the next. With
+    `persist` enabled the last sample is also written to disk, so a
+    short-lived process can measure usage since the previous run.
+    """
+
+    def __init__(self, min_window=DEFAULT_MIN_WINDOW, persist=True, state_file=None):
+        self.min_window = min_window
+        self.persist = persist
+        self.state_file = state_file or cache_path("cpu_baseline.json")
+        self._lock = threading.Lock()
+        self._baseline = None  # (wall clock timestamp, [(busy, total), ...])
+        self._sampled = False
+
+    def mark(self):
+        """Takes a fresh in-process baseline."""
+        with self._lock:
+            self._baseline = (time.time(), _read_cpu_times())
+
+    def _load_persisted(self, cpu_count):
+        import psutil
+        state = load_json(self.state_file) if self.persist else None
+        if not isinstance(state, dict):
+            return None
+        try:
+            timestamp = float(state["timestamp"])
+            times = [(float(busy), float(total)) for busy, total in state["times"]]
+        except (KeyError, TypeError, ValueError):
+            return None
+        age = time.time() - timestamp
+        # Counters reset on reboot and change shape on CPU hotplug
+        if age < 0 or age > MAX_BASELINE_AGE or timestamp < psutil.boot_time() or len(times) != cpu_count:
+            return None
+        return timestamp, times
+
+    def _choose_baseline(self, cpu_count):
+        if self._sampled or not self.persist:
+            return self._baseline
+        # First sample of this process: the previous run's baseline covers a
+        # longer (more meaningful) window than the one since start-up.
+        persisted = self._load_persisted(cpu_count)
+        if persisted and (self._baseline is None or persisted[0] < self._baseline[0]):
+            return persisted
+        return self._baseline
+
+    def _window_left(self, min_window):
+        # Seconds sample() would sleep for; takes the baseline if there is none
+        with self._lock:
+            current_times = _read_cpu_times()
+            baseline = self._choose_baseline(len(current_times))
+            if baseline is None:
+                self._baseline = baseline = (time.time(), current_times)
+            return max(0.0, min_window - (time.time() - baseline[0]))
+
+    async def sample_async(self, min_window=None):
+        """Like sample(), but waits out the sampling window with asyncio.sleep.
+
+        The counters are read on the event loop's default executor, so the
+        loop itself never blocks.
+        """
+        import asyncio
+        if min_window is None:
+            min_window = self.min_window
+        loop = asyncio.get_running_loop()
+        wait = await loop.run_in_executor(None, self._window_left, min_window)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return await loop.run_in_executor(None, self.sample, 0.0)
+
+    def sample(self, min_window=None):
+        """Returns CpuUsage measured since the baseline, then moves the baseline."""
+        if min_window is None:
+            min_window = self.min_window
+        with self._lock:
+            current_times = _read_cpu_times()
+            baseline = self._choose_baseline(len(current_times))
+            if baseline is None:
+                baseline = (time.time(), current_times)
+
+            elapsed = time.time() - baseline[0]
+            if elapsed < min_window:
+                time.sleep(min_window - elapsed)
+                current_times = _read_cpu_times()
+            now = time.time()
+
+            per_cpu = array("d")
+            busy_sum = total_sum = 0.0
+            for (old_busy, old_total), (busy, total) in zip(baseline[1], current_times):
+                busy_sum += busy - old_busy
+                total_sum += total - old_total
+                per_cpu.append(_percent(busy - old_busy, total - old_total))
+
+            self._baseline = (now, current_times)
+            self._sampled = True
+            if self.persist:
+                save_json(self.state_file, {"timestamp": now, "times": current_times})
+
+        return CpuUsage(_percent(busy_sum, total_sum), per_cpu, now - baseline[0])
+
+
+# Not marked at import, which would load psutil for every run: for the CLI
+# the previous run's persisted sample is the baseline
+default_sampler = CpuSampler()
+
+
+def sample(min_window=None):
+    """Samples CPU usage with the module-level sampler."""
+    return default_sampler.sample(min_window)
@@ -0,0 +1,266 @@
+import os
+import re
+from array import array
+
+# Roots of the pseudo-filesystems read here, overridable for fixtures
+SYSFS_PATH = "/sys"
+PROCFS_PATH = "/proc"
+
+# Number of equal-width bins of the frequency histogram
+DEFAULT_HISTOGRAM_BINS = 8
+
+_POLICY = re.compile(r"policy\d+$")
+_NODE = re.compile(r"node(\d+)$")
+_CACHE_INDEX = re.compile(r"index\d+$")
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+
+
+def _cpu_dir(*parts):
+    return os.path.join(SYSFS_PATH, "devices/system/cpu", *parts)
+
+
+def _read(path):
+    # sysfs attributes are at most a page; unbuffered avoids the overhead of
+    # a text file object for each of potentially thousands of small reads
+    try:
+        with open(path, "rb", buffering=0) as f:
+            return f.read(4096).decode("ascii", "replace").strip()
+    except OSError:
+        return None
+
+
+def parse_cpu_list(text):
+    """Parses a kernel CPU list ("0-3,8,10-11") into an array of CPU numbers."""
+    cpus = array("I")
+    for part in text.split(","):
+        first, _, last = part.strip().partition("-")
+        if first.isdigit():
+            cpus.extend(range(int(first), int(last if last.isdigit() else first) + 1))
+    return cpus
+
+
+def online_cpus():
+    """Returns the online logical CPUs as an array of CPU numbers (empty if unknown)."""
+    text = _read(_cpu_dir("online"))
+    return parse_cpu_list(text) if text else array("I")
+
+
+def _parse_size(text):
+    # Cache sizes read like "32K" or "1024K"
+    match = re.fullmatch(r"(\d+)\s*([KMG]?)", text or "")
+    return int(match.group(1)) * _SIZE_UNITS[match.group(2)] if match else None
+
+
+class CoreFrequencies:
+    """The current frequency of every logical CPU, as parallel arrays.
+
+    `cpus` and `khz` hold CPU numbers and frequencies in kHz (0 if unknown);
+    `governor_index` holds, per CPU, an index into `governor_names` (255 if
+    unknown). One machine-word per CPU instead of a dict keeps hosts with
+    hundreds of CPUs cheap to sample every second.
+    """
+
+    __slots__ = ("cpus", "khz", "governor_index", "governor_names")
+
+    def __init__(self):
+        self.cpus = array("I")
+        self.khz = array("I")
+        self.governor_index = array("B")
+        self.governor_names = []
+
+    def add(self, cpu, khz, governor=None):
+        if governor is None:
+            index = 255
+        else:
+            try:
+                index = self.governor_names.index(governor)
+            except ValueError:
+                index = len(self.governor_names)
+                self.governor_names.append(governor)
+        self.cpus.append(cpu)
+        self.khz.append(khz)
+        self.governor_index.append(index)
+
+    def __len__(self):
+        return len(self.cpus)
+
+    def governors(self):
+        """Returns {governor: number of CPUs using it}."""
+        counts = [0] * len(self.governor_names)
+        for index in self.governor_index:
+            if index != 255:
+                counts[index] += 1
+        return {name: count for name, count in zip(self.governor_names, counts) if count}
+
+    def histogram(self, bins=DEFAULT_HISTOGRAM_BINS):
+        """Returns [(from_hz, to_hz, cpus), ...]: equal-width bins between the lowest and highest frequency."""
+        known = [khz for khz in self.khz if khz]
+        if not known:
+            return []
+        low, high = min(known), max(known)
+        if low == high:
+            return [(low * 1000, high * 1000, len(known))]
+        width = (high - low) / bins
+        counts = [0] * bins
+        for khz in known:
+            counts[min(bins - 1, int((khz - low) / width))] += 1
+        return [
+            (round((low + width * i) * 1000), round((low + width * (i + 1)) * 1000), count)
+            for i, count in enumerate(counts)
+        ]
+
+    def stats(self, bins=DEFAULT_HISTOGRAM_BINS):
+        """Returns the distribution across CPUs in Hz (None without any reading)."""
+        known = sorted(khz for khz in self.khz if khz)
+        if not known:
+            return None
+        middle = len(known) // 2
+        median = known[middle] if len(known) % 2 else (known[middle - 1] + known[middle]) / 2
+        per_cpu = array("Q", (khz * 1000 for khz in self.khz))
+        return {
+            "median_hz": int(median * 1000),
+            "min_hz": known[0] * 1000,
+            "max_hz": known[-1] * 1000,
+            "histogram": [{"from_hz": low, "to_hz": high, "cpus": count} for low, high, count in self.histogram(bins)],
+            "governors": self.governors(),
+            "cpus": self.cpus,
+            "per_cpu_hz": per_cpu,
+        }
+
+
+def _policy_frequencies():
+    # One cpufreq policy usually covers several CPUs (a cluster, or a whole
+    # package with acpi-cpufreq), so reading policies reads fewest files
+    directory = _cpu_dir("cpufreq")
+    try:
+        policies = [entry.name for entry in os.scandir(directory) if _POLICY.match(entry.name)]
+    except OSError:
+        return None
+    readings = []
+    for policy in policies:
+        path = os.path.join(directory, policy)
+        affected = _read(os.path.join(path, "affected_cpus"))
+        khz = _read(os.path.join(path, "scaling_cur_freq"))
+        if not affected or not khz or not khz.isdigit():
+            continue
+        governor = _read(os.path.join(path, "scaling_governor"))
+        for cpu in affected.split():
+            readings.append((int(cpu), int(khz), governor))
+    return readings or None
+
+
+def _per_cpu_frequencies(cpus):
+    # Kernels (and containers) without policy directories
+    readings = []
+    for cpu in cpus:
+        khz = _read(_cpu_dir(f"cpu{cpu}", "cpufreq/scaling_cur_freq"))
+        if khz and khz.isdigit():
+            readings.append((cpu, int(khz), _read(_cpu_dir(f"cpu{cpu}", "cpufreq/scaling_governor"))))
+    return readings or None
+
+
+def _cpuinfo_frequencies():
+    # Virtual machines often have no cpufreq driver at all, but report a
+    # "cpu MHz" line per processor
+    readings = []
+    cpu = None
+    try:
+        with open(os.path.join(PROCFS_PATH, "cpuinfo")) as f:
+            for line in f:
+                if line.startswith("processor"):
+                    cpu = int(line.partition(":")[2])
+                elif line.startswith("cpu MHz") and cpu is not None:
+                    readings.append((cpu, int(float(line.partition(":")[2]) * 1000), None))
+    except (OSError, ValueError):
+        return None
+    return readings or None
+
+
+def read_frequencies():
+    """Reads the current frequency of every CPU in one pass over sysfs.
+
+    Falls back to per-CPU cpufreq directories, then to /proc/cpuinfo.
+    Returns a CoreFrequencies (empty if no source has frequencies).
+    """
+    readings = _policy_frequencies() or _per_cpu_frequencies(online_cpus()) or _cpuinfo_frequencies() or []
+    frequencies = CoreFrequencies()
+    for cpu, khz, governor in sorted(readings, key=lambda reading: reading[0]):
+        frequencies.add(cpu, khz, governor)
+    return frequencies
+
+
+def _count_groups(cpus, path_of):
+    # Counts the distinct groups (packages, cores, caches) the CPUs form,
+    # reading each group's CPU list once: CPUs already seen as a member of
+    # a group are skipped. Returns [(first CPU, members), ...].
+    seen = bytearray(max(cpus) + 1)
+    groups = []
+    for cpu in cpus:
+        if seen[cpu]:
+            continue
+        for path in path_of(cpu):
+            text = _read(path)
+            if text:
+                break
+        else:
+            continue
+        members = parse_cpu_list(text)
+        for member in members:
+            if member < len(seen):
+                seen[member] = 1
+        groups.append((cpu, members))
+    return groups
+
+
+def _caches(cpus):
+    try:
+        indexes = sorted(
+            entry.name for entry in os.scandir(_cpu_dir(f"cpu{cpus[0]}", "cache")) if _CACHE_INDEX.match(entry.name)
+        )
+    except OSError:
+        return []
+    caches = {}  # (level, type, size) -> instances
+    for index in indexes:
+        level = _read(_cpu_dir(f"cpu{cpus[0]}", "cache", index, "level"))
+        kind = _read(_cpu_dir(f"cpu{cpus[0]}", "cache", index, "type"))
+        if not level or not level.isdigit():
+            continue
+        groups = _count_groups(cpus, lambda cpu: [_cpu_dir(f"cpu{cpu}", "cache", index, "shared_cpu_list")])
+        for cpu, _ in groups:
+            key = (int(level), kind, _parse_size(_read(_cpu_dir(f"cpu{cpu}", "cache", index, "size"))))
+            caches[key] = caches.get(key, 0) + 1
+    return [
+        {"level": level, "type": kind, "size_bytes": size, "instances": instances}
+        for (level, kind, size), instances in sorted(caches.items(), key=lambda item: (item[0][0], item[0][1] or ""))
+    ]
+
+
+def _numa_nodes():
+    directory = os.path.join(SYSFS_PATH, "devices/system/node")
+    try:
+        nodes = sorted(int(match.group(1)) for match in map(_NODE.match, os.listdir(directory)) if match)
+    except OSError:
+        return []
+    return [{"node": node, "cpus": _read(os.path.join(directory, f"node{node}", "cpulist")) or ""} for node in nodes]
+
+
+def read_topology():
+    """Returns sockets, cores, NUMA nodes and caches from sysfs (None if unavailable).
+
+    Each group's CPU list is read once rather than once per CPU, so the
+    cost grows with the number of cores and caches, not threads.
+    """
+    cpus = online_cpus()
+    if not cpus:
+        return None
+
+    def topology(name, fallback):
+        return lambda cpu: [_cpu_dir(f"cpu{cpu}", "topology", name), _cpu_dir(f"cpu{cpu}", "topology", fallback)]
+
+    return {
+        "sockets": len(_count_groups(cpus, topology("package_cpus_list", "core_siblings_list"))) or None,
+        "cores": len(_count_groups(cpus, topology("core_cpus_list", "thread_siblings_list"))) or None,
+        "threads": len(cpus),
+        "numa_nodes": _numa_nodes(),
+        "caches": _caches(cpus),
+    }
@@ -0,0 +1,178 @@
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import struct
+import sys
+import tempfile
+import threading
+
+from .output import snapshot_record
+from .probes import TIMED_OUT
+
+# How long a client waits for the daemon before falling back to collecting itself
+DEFAULT_CLIENT_TIMEOUT = 1.0
+# Largest request line accepted from a client
+MAX_REQUEST_SIZE = 64 * 1024
+
+
+def socket_path():
+    """Returns the per-user Unix socket the daemon listens on.
+
+    Without $XDG_RUNTIME_DIR it lives in a directory of its own under the
+    temp dir, which serve() creates private to this user.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, "kernelview.sock")
+    if not hasattr(os, "getuid"):
+        # Windows: the temp dir is already per-user
+        return os.path.join(tempfile.gettempdir(), f"kernelview-{os.environ.get('USERNAME', 'user')}.sock")
+    return os.path.join(tempfile.gettempdir(), f"kernelview-{os.getuid()}", "kernelview.sock")
+
+
+def _private_directory(path):
+    # The temp dir is world-writable: another user could create the directory
+    # (or a symlink) first and plant a socket in it, so only a directory this
+    # user owns and nobody else can enter is used
+    if not hasattr(os, "getuid"):
+        return
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise OSError(f"{path} is not a directory private to this user")
+
+
+def _check_owner(client, path):
+    # Only trust a daemon run by this user, whoever managed to bind the path
+    if not hasattr(os, "getuid"):
+        return
+    if hasattr(socket, "SO_PEERCRED"):
+        credentials = client.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        _, uid, _ = struct.unpack("3i", credentials)
+    else:
+        uid = os.stat(path).st_uid
+    if uid != os.getuid():
+        raise OSError(f"the kernelview daemon on {path} belongs to another user")
+
+
+class _SnapshotHandler(socketserver.StreamRequestHandler):
+    """Answers one request per connection.
+
+    The client sends one JSON line, e.g. {"fields": ["RAM", "CPU"]} (an empty
+    line asks for everything), and gets the snapshot back as one JSON line
+    in the same shape as --format json.
+    """
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline(MAX_REQUEST_SIZE) or b"{}")
+        except ValueError:
+            request = {}
+        fields = request.get("fields") if isinstance(request, dict) else None
+        try:
+            timestamp, values = self.server.refresher.snapshot(fields)
+            response = snapshot_record(values, timestamp)
+        except KeyError as e:
+            response = {"error": e.args[0]}
+        self.wfile.write(json.dumps(response, separators=(",", ":")).encode() + b"\n")
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+    # Windows builds may have no Unix sockets; fetch() then raises OSError
+    class SnapshotServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+        def __init__(self, path, refresher):
+            self.refresher = refresher
+            super().__init__(path, _SnapshotHandler)
+
+
+def _remove_stale_socket(path):
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)  # Left behind by a daemon that died
+    else:
+        raise OSError(f"a kernelview daemon is already listening on {path}")
+    finally:
+        probe.close()
+
+
+def serve(refresher, path=None):
+    """Serves `refresher` snapshots on a Unix socket until interrupted."""
+    if not hasattr(socketserver, "UnixStreamServer"):
+        raise OSError("Unix domain sockets are not available on this platform")
+    if path is None:
+        path = socket_path()
+        _private_directory(os.path.dirname(path))
+    _remove_stale_socket(path)
+    refresher.start()
+    old_umask = os.umask(0o077)  # Socket only accessible to this user
+    try:
+        server = SnapshotServer(path, refresher)
+    finally:
+        os.umask(old_umask)
+    if threading.current_thread() is threading.main_thread():
+        # systemd and friends stop daemons with SIGTERM; clean up the socket then too
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        server.server_close()
+        refresher.stop()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def fetch(fields=None, path=None, timeout=DEFAULT_CLIENT_TIMEOUT):
+    """Asks a running daemon for a snapshot record.
+
+    Raises OSError if no daemon is listening (or it does not answer within
+    `timeout`, or it runs as another user), so callers can fall back to
+    collecting in-process.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise OSError("Unix domain sockets are not available on this platform")
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(timeout)
+    path = path or socket_path()
+    try:
+        client.connect(path)
+        _check_owner(client, path)
+        client.sendall(json.dumps({"fields": fields}).encode() + b"\n")
+        chunks = []
+        while True:
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        client.close()
+    try:
+        record = json.loads(b"".join(chunks))
+    except ValueError:
+        raise OSError("malformed response from kernelview daemon") from None
+    if "error" in record:
+        raise OSError(record["error"])
+    return record
+
+
+def record_values(record):
+    """Turns a snapshot record back into {field: raw value}."""
+    return {
+        field: TIMED_OUT if entry.get("timed_out") else entry["raw"] if "raw" in entry else entry["value"]
+        for field, entry in record["fields"].items()
+    }
@@ -0,0 +1,211 @@
+import io
+import os
+import threading
+import time
+from array import array
+
+from .state import cache_path, load_json, save_json
+
+# Roots of the pseudo-filesystems read here, overridable for fixtures
+PROCFS_PATH = "/proc"
+SYSFS_PATH = "/sys"
+
+# Shortest window I/O rates are computed over; like CPU usage, a younger
+# baseline is waited out
+DEFAULT_MIN_WINDOW = 0.1
+# A persisted baseline older than this describes a different workload and is ignored
+MAX_BASELINE_AGE = 600
+# Block devices that never see real I/O
+EXCLUDED_PREFIXES = (b"loop", b"ram")
+
+# /proc/diskstats columns kept per device (0-based, after major, minor and name):
+# reads completed, sectors read, ms reading, writes completed, sectors
+# written, ms writing, ms doing I/O
+_COLUMNS = (0, 2, 3, 4, 6, 7, 9)
+_WIDTH = len(_COLUMNS)
+READS, SECTORS_READ, MS_READING, WRITES, SECTORS_WRITTEN, MS_WRITING, MS_BUSY = range(_WIDTH)
+# /proc/diskstats counts 512-byte sectors whatever the device's block size
+SECTOR_SIZE = 512
+
+
+class DiskCounters:
+    """One sample of /proc/diskstats for whole block devices.
+
+    `counters` is a flat array of _WIDTH counters per device, in the order
+    of `names`. Samples of an unchanged device list share `names` and the
+    parsed layout, so re-sampling only refills the array.
+    """
+
+    __slots__ = ("timestamp", "names", "counters")
+
+    def __init__(self, timestamp, names, counters):
+        self.timestamp = timestamp
+        self.names = names
+        self.counters = counters
+
+
+class _Layout:
+    # Which devices of /proc/diskstats are reported, worked out once per device list
+    __slots__ = ("key", "names", "slots")
+
+    def __init__(self, key):
+        self.key = key
+        self.names = []
+        self.slots = {}  # device name (bytes) -> position in DiskCounters
+        for name in key:
+            if not name.startswith(EXCLUDED_PREFIXES) and _whole_disk(name):
+                self.slots[name] = len(self.names)
+                self.names.append(name.decode())
+
+
+def _whole_disk(name):
+    # Partitions have no /sys/block entry of their own
+    return os.path.exists(os.path.join(SYSFS_PATH, "block", name.decode().replace("/", "!")))
+
+
+class DiskSampler:
+    """Reports per-device I/O rates as a delta from a baseline instead of sleeping.
+
+    Works like cpu_sampler.CpuSampler: every sample becomes the baseline of
+    the next, the first one waits `min_window` unless the previous run's
+    persisted sample can serve as the baseline.
+    """
+
+    def __init__(self, min_window=DEFAULT_MIN_WINDOW, persist=True, state_file=None):
+        self.min_window = min_window
+        self.persist = persist
+        self.state_file = state_file or cache_path("disk_baseline.json")
+        self._lock = threading.Lock()
+        self._layout = None
+        self._baseline = None  # DiskCounters
+        self._spare = None  # Array of the sample before the baseline, refilled by the next read
+        self._sampled = False
+
+    def _read(self):
+        # One buffered read of the whole file per sample. Lines are split
+        # only as far as the device name, except for reported devices.
+        with open(os.path.join(PROCFS_PATH, "diskstats"), "rb") as f:
+            data = f.read()
+        layout = self._layout or _Layout([])
+        counters = self._spare
+        if counters is None or len(counters) != len(layout.names) * _WIDTH:
+            counters = array("Q", bytes(8 * len(layout.names) * _WIDTH))
+        self._spare = None
+        names = []
+        for line in io.BytesIO(data):
+            fields = line.split(None, 3)
+            if len(fields) < 4:
+                continue
+            names.append(fields[2])
+            slot = layout.slots.get(fields[2])
+            if slot is not None:
+                values = fields[3].split()
+                position = slot * _WIDTH
+                for column in _COLUMNS:
+                    counters[position] = int(values[column])
+                    position += 1
+        if names != layout.key:
+            # Devices came or went: parse again with the new layout
+            self._layout = _Layout(names)
+            return self._read()
+        return DiskCounters(time.time(), layout.names, counters)
+
+    def _load_persisted(self):
+        state = load_json(self.state_file) if self.persist else None
+        if not isinstance(state, dict):
+            return None
+        try:
+            timestamp = float(state["timestamp"])
+            names = [str(name) for name in state["names"]]
+            counters = array("Q", (int(value) for value in state["counters"]))
+        except (KeyError, TypeError, ValueError, OverflowError):
+            return None
+        age = time.time() - timestamp
+        if age < 0 or age > MAX_BASELINE_AGE or len(counters) != len(names) * _WIDTH:
+            return None
+        return DiskCounters(timestamp, names, counters)
+
+    def mark(self):
+        """Takes a fresh in-process baseline."""
+        with self._lock:
+            self._baseline = self._read()
+
+    def sample(self, min_window=None):
+        """Returns per-device rates since the baseline (see rates), then moves the baseline."""
+        if min_window is None:
+            min_window = self.min_window
+        with self._lock:
+            current = self._read()
+            baseline = self._baseline
+            if not self._sampled and self.persist:
+                persisted = self._load_persisted()
+                if persisted and (baseline is None or persisted.timestamp < baseline.timestamp):
+                    baseline = persisted
+            if baseline is None:
+                baseline = current
+                current = None
+            elapsed = time.time() - baseline.timestamp
+            if current is None or elapsed < min_window:
+                time.sleep(max(0.0, min_window - elapsed))
+                if current is not None:
+                    self._spare = current.counters
+                current = self._read()
+
+            result = rates(baseline, current)
+            if baseline is self._baseline:
+                self._spare = baseline.counters  # Refilled by the next read
+            self._baseline = current
+            self._sampled = True
+            if self.persist:
+                save_json(self.state_file, {
+                    "timestamp": current.timestamp, "names": current.names, "counters": current.counters.tolist(),
+                })
+        return result
+
+
+def rates(baseline, current):
+    """Computes I/O rates per device between two DiskCounters samples.
+
+    Devices missing from the baseline, or whose counters went backwards (a
+    reboot, a re-attached device), are left out.
+    """
+    window = current.timestamp - baseline.timestamp
+    if window <= 0:
+        return {"window_seconds": 0.0, "devices": []}
+    if baseline.names is current.names or baseline.names == current.names:
+        positions = range(len(current.names))
+        offsets = positions
+    else:
+        index = {name: position for position, name in enumerate(baseline.names)}
+        pairs = [(position, index[name]) for position, name in enumerate(current.names) if name in index]
+        positions = [position for position, _ in pairs]
+        offsets = [offset for _, offset in pairs]
+
+    old, new = baseline.counters, current.counters
+    devices = []
+    for position, offset in zip(positions, offsets):
+        start, old_start = position * _WIDTH, offset * _WIDTH
+        delta = [new[start + k] - old[old_start + k] for k in range(_WIDTH)]
+        if min(delta) < 0:
+            continue
+        reads, writes = delta[READS], delta[WRITES]
+        devices.append({
+            "device": current.names[position],
+            "read_iops": round(reads / window, 1),
+            "write_iops": round(writes / window, 1),
+            "read_bytes_per_second": round(delta[SECTORS_READ] * SECTOR_SIZE / window),
+            "write_bytes_per_second": round(delta[SECTORS_WRITTEN] * SECTOR_SIZE / window),
+            "read_await_ms": round(delta[MS_READING] / reads, 2) if reads else 0.0,
+            "write_await_ms": round(delta[MS_WRITING] / writes, 2) if writes else 0.0,
+            "await_ms": round((delta[MS_READING] + delta[MS_WRITING]) / (reads + writes), 2) if reads + writes else 0.0,
+            "utilisation_percent": round(min(100.0, delta[MS_BUSY] / (window * 1000) * 100), 1),
+        })
+    return {"window_seconds": round(window, 3), "devices": devices}
+
+
+default_sampler = DiskSampler()
+
+
+def sample(min_window=None):
+    """Samples I/O rates with the module-level sampler."""
+    return default_sampler.sample(min_window)
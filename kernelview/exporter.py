@@ -0,0 +1,224 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .probes import TIMED_OUT
+
+DEFAULT_PORT = 9725
+DEFAULT_BIND = "127.0.0.1"
+
+# Fields the exporter needs; nothing else is collected
+EXPORTED_FIELDS = [
+    "OS", "Kernel", "Hostname", "Uptime", "CPU Speed", "CPU Usage",
+    "RAM", "Swap", "Storage", "Disk I/O", "Network", "Network I/O", "VRAM", "Open Ports", "Packages",
+]
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class _Families:
+    """Accumulates metric families and renders them in exposition format."""
+
+    def __init__(self):
+        self._families = []
+
+    def add(self, name, metric_type, help_text, samples, unit=None):
+        # samples: [(labels dict, value)]; families without samples are dropped
+        samples = [(labels, value) for labels, value in samples if value is not None]
+        if samples:
+            self._families.append((name, metric_type, help_text, unit, samples))
+
+    def render(self, openmetrics=True):
+        lines = []
+        for name, metric_type, help_text, unit, samples in self._families:
+            sample_name = name
+            if metric_type == "info":
+                sample_name = f"{name}_info"
+                if not openmetrics:  # The Prometheus text format has no info type
+                    name, metric_type = sample_name, "gauge"
+            lines.append(f"# TYPE {name} {metric_type}")
+            if unit and openmetrics:
+                lines.append(f"# UNIT {name} {unit}")
+            lines.append(f"# HELP {name} {_escape(help_text)}")
+            for labels, value in samples:
+                lines.append(f"{sample_name}{_labels(labels)} {value}")
+        if openmetrics:
+            lines.append("# EOF")
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _usage(families, prefix, what, stats, labels=None):
+    if not stats:
+        return
+    labels = labels or {}
+    families.add(f"{prefix}_total_bytes", "gauge", f"Total {what}.", [(labels, stats.get("total_bytes"))], "bytes")
+    families.add(f"{prefix}_used_bytes", "gauge", f"Used {what}.", [(labels, stats.get("used_bytes"))], "bytes")
+
+
+def render_metrics(timestamp, values, openmetrics=True):
+    """Renders a raw snapshot as OpenMetrics (or Prometheus 0.0.4) text."""
+    timed_out = sorted(field for field, value in values.items() if value is TIMED_OUT)
+    values = {field: value for field, value in values.items() if value is not TIMED_OUT}
+    families = _Families()
+    families.add(
+        "kernelview_system", "info", "Host identification.",
+        [({
+            "hostname": values.get("Hostname", ""),
+            "os": values.get("OS", ""),
+            "kernel": values.get("Kernel", ""),
+        }, 1)],
+    )
+    families.add("kernelview_uptime_seconds", "gauge", "Time since boot.", [({}, values.get("Uptime"))], "seconds")
+
+    usage = values.get("CPU Usage")
+    if usage:
+        families.add("kernelview_cpu_usage_percent", "gauge", "CPU utilisation of all CPUs.",
+                     [({}, usage.get("percent"))], "percent")
+        families.add("kernelview_cpu_core_usage_percent", "gauge", "CPU utilisation per logical CPU.",
+                     [({"cpu": str(cpu)}, percent) for cpu, percent in enumerate(usage.get("per_cpu") or [])],
+                     "percent")
+    frequency = values.get("CPU Speed") or {}
+    families.add("kernelview_cpu_frequency_hertz", "gauge", "Median current frequency of all CPUs.",
+                 [({}, frequency.get("median_hz"))], "hertz")
+    families.add("kernelview_cpu_core_frequency_hertz", "gauge", "Current frequency per logical CPU.",
+                 [({"cpu": str(cpu)}, hz) for cpu, hz in zip(frequency.get("cpus") or [], frequency.get("per_cpu_hz") or [])],
+                 "hertz")
+
+    _usage(families, "kernelview_memory", "RAM", values.get("RAM"))
+    ram = values.get("RAM") or {}
+    families.add("kernelview_memory_available_bytes", "gauge", "RAM available for allocation.",
+                 [({}, ram.get("available_bytes"))], "bytes")
+    devices = (values.get("Disk I/O") or {}).get("devices") or []
+    for key, name, help_text, unit in [
+        ("read_iops", "kernelview_disk_read_iops", "Reads completed per second.", None),
+        ("write_iops", "kernelview_disk_write_iops", "Writes completed per second.", None),
+        ("read_bytes_per_second", "kernelview_disk_read_bytes_per_second", "Bytes read per second.", None),
+        ("write_bytes_per_second", "kernelview_disk_write_bytes_per_second", "Bytes written per second.", None),
+        ("await_ms", "kernelview_disk_await_milliseconds", "Average time an I/O request took.", None),
+        ("utilisation_percent", "kernelview_disk_utilisation_percent", "Share of time the device was busy.", "percent"),
+    ]:
+        families.add(name, "gauge", help_text, [({"device": device["device"]}, device[key]) for device in devices], unit)
+    _usage(families, "kernelview_swap", "swap", values.get("Swap"))
+    mounts = (values.get("Storage") or {}).get("mounts") or []
+    for suffix, what in [("total", "Total"), ("used", "Used")]:
+        families.add(f"kernelview_disk_{suffix}_bytes", "gauge", f"{what} disk space per mounted filesystem.",
+                     [({"mountpoint": mount["mount_point"], "fstype": mount["fstype"]}, mount.get(f"{suffix}_bytes"))
+                      for mount in mounts], "bytes")
+    families.add("kernelview_disk_timed_out", "gauge", "Mounted filesystems that did not answer statvfs in time.",
+                 [({"mountpoint": mount["mount_point"], "fstype": mount["fstype"]}, 1)
+                  for mount in mounts if mount.get("timed_out")])
+    _usage(families, "kernelview_vram", "video memory", values.get("VRAM"))
+
+    links = (values.get("Network") or {}).get("interfaces") or []
+    families.add("kernelview_network_up", "gauge", "Whether the network interface is up.",
+                 [({"interface": link["name"]}, int(link["state"] == "up")) for link in links])
+    families.add("kernelview_network_speed_bytes_per_second", "gauge", "Link speed of the network interface.",
+                 [({"interface": link["name"]}, link["speed_mbps"] and link["speed_mbps"] * 125000) for link in links],
+                 "bytes_per_second")
+    families.add("kernelview_network_mtu_bytes", "gauge", "MTU of the network interface.",
+                 [({"interface": link["name"]}, link["mtu"]) for link in links], "bytes")
+    traffic = (values.get("Network I/O") or {}).get("interfaces") or []
+    for key, name, help_text in [
+        ("rx_bytes_per_second", "kernelview_network_receive_bytes_per_second", "Bytes received per second."),
+        ("tx_bytes_per_second", "kernelview_network_transmit_bytes_per_second", "Bytes sent per second."),
+        ("rx_packets_per_second", "kernelview_network_receive_packets_per_second", "Packets received per second."),
+        ("tx_packets_per_second", "kernelview_network_transmit_packets_per_second", "Packets sent per second."),
+        ("rx_errors", "kernelview_network_receive_errors", "Receive errors over the sampling window."),
+        ("tx_errors", "kernelview_network_transmit_errors", "Transmit errors over the sampling window."),
+        ("rx_drops", "kernelview_network_receive_drops", "Received packets dropped over the sampling window."),
+        ("tx_drops", "kernelview_network_transmit_drops", "Outgoing packets dropped over the sampling window."),
+    ]:
+        families.add(name, "gauge", help_text, [({"interface": record["interface"]}, record[key]) for record in traffic])
+
+    ports = values.get("Open Ports")
+    families.add("kernelview_listening_ports", "gauge", "Number of ports with a listening socket.",
+                 [({}, len(ports) if ports is not None else None)])
+    packages = values.get("Packages") or {}
+    families.add("kernelview_packages", "gauge", "Installed packages per package manager.",
+                 [({"manager": manager}, count) for manager, count in packages.items()])
+    families.add("kernelview_probe_timed_out", "gauge", "Fields without a value because their probe timed out.",
+                 [({"field": field}, 1) for field in timed_out])
+    families.add("kernelview_snapshot_timestamp_seconds", "gauge", "When the snapshot was last refreshed.",
+                 [({}, round(timestamp, 3) if timestamp else None)], "seconds")
+    return families.render(openmetrics)
+
+
+class MetricsExporter:
+    """Serves a SnapshotRefresher's snapshot in OpenMetrics format.
+
+    Scrapes never run probes: the exposition is rendered at most once per
+    snapshot refresh and the same bytes are served to every scraper until
+    the next one.
+    """
+
+    def __init__(self, refresher):
+        self.refresher = refresher
+        self._lock = threading.Lock()
+        self._rendered = {}  # openmetrics flag -> (snapshot timestamp, body)
+
+    def body(self, openmetrics=True):
+        timestamp, values = self.refresher.snapshot()
+        with self._lock:
+            cached = self._rendered.get(openmetrics)
+            if cached is None or cached[0] != timestamp:
+                cached = (timestamp, render_metrics(timestamp, values, openmetrics))
+                self._rendered[openmetrics] = cached
+            return cached[1]
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            # Prometheus asks for OpenMetrics explicitly; plain clients get 0.0.4 text
+            openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+            body = self.server.exporter.body(openmetrics)
+            content_type = OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE
+            status = 200
+        elif path == "/":
+            body = b"KernelView exporter, metrics at /metrics\n"
+            content_type = "text/plain; charset=utf-8"
+            status = 200
+        else:
+            body = b"Not found\n"
+            content_type = "text/plain; charset=utf-8"
+            status = 404
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would flood stderr
+
+
+class MetricsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, exporter):
+        self.exporter = exporter
+        super().__init__(address, _MetricsHandler)
+
+
+def serve(refresher, port=DEFAULT_PORT, bind=DEFAULT_BIND):
+    """Starts refreshing and serves /metrics on bind:port until interrupted."""
+    server = MetricsServer((bind, port), MetricsExporter(refresher))
+    refresher.start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        refresher.stop()
@@ -0,0 +1,194 @@
+import os
+import re
+import threading
+from collections import namedtuple
+
+# Root of the sysfs mount, overridable for fixtures
+SYSFS_PATH = "/sys"
+
+# Where distributions install the PCI ID database (hwdata / pciutils)
+PCI_IDS_PATHS = [
+    "/usr/share/hwdata/pci.ids",
+    "/usr/share/misc/pci.ids",
+    "/usr/share/pci.ids",
+    "/usr/local/share/pci.ids",
+]
+
+# PCI base class of display controllers (VGA, XGA, 3D, other display)
+PCI_CLASS_DISPLAY = 0x03
+
+# Fallback names when pci.ids is not installed
+KNOWN_VENDORS = {
+    "10de": "NVIDIA",
+    "1002": "AMD",
+    "8086": "Intel",
+    "1a03": "ASPEED",
+    "15ad": "VMware",
+    "1234": "QEMU",
+    "1af4": "Red Hat (virtio)",
+    "80ee": "VirtualBox",
+    "5143": "Qualcomm",
+}
+
+
+class GpuDevice(namedtuple("GpuDevice", [
+    "address", "vendor_id", "device_id", "vendor", "device", "driver", "vram_total", "vram_used",
+])):
+    """A display controller on the PCI bus. VRAM figures are in bytes (None if unknown)."""
+
+    __slots__ = ()
+
+    @property
+    def name(self):
+        if self.device:
+            return f"{self.vendor} {self.device}" if self.vendor else self.device
+        return f"{self.vendor or self.vendor_id} [{self.vendor_id}:{self.device_id}]"
+
+
+class PciIds:
+    """Vendor/device name lookup in pci.ids, loaded on first use.
+
+    The first lookup reads the file once and indexes the byte range of every
+    vendor section; device lookups then only search inside that section.
+    """
+
+    _VENDOR_LINE = re.compile(rb"^([0-9a-f]{4})  (.*)$", re.M)
+
+    def __init__(self, paths=None):
+        self.paths = paths if paths is not None else PCI_IDS_PATHS
+        self._lock = threading.Lock()
+        self._data = None
+        self._vendors = None  # vendor id -> (section start, section end, name)
+
+    def _load(self):
+        with self._lock:
+            if self._vendors is not None:
+                return
+            data = b""
+            for path in self.paths:
+                try:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                    break
+                except OSError:
+                    continue
+            # Device classes ("C xx  name") follow the vendor list and are not needed
+            classes = data.find(b"\nC ")
+            if classes != -1:
+                data = data[:classes]
+
+            vendors = {}
+            previous = None
+            for match in self._VENDOR_LINE.finditer(data):
+                if previous is not None:
+                    vendors[previous[0]] = (previous[1], match.start(), previous[2])
+                previous = (match.group(1).decode(), match.end(), match.group(2).decode("utf-8", "replace"))
+            if previous is not None:
+                vendors[previous[0]] = (previous[1], len(data), previous[2])
+            self._data = data
+            self._vendors = vendors
+
+    def vendor(self, vendor_id):
+        """Returns the vendor name for a 4-digit hex id, or None."""
+        self._load()
+        entry = self._vendors.get(vendor_id.lower())
+        return entry[2] if entry else None
+
+    def device(self, vendor_id, device_id):
+        """Returns the device name for a vendor/device id pair, or None."""
+        self._load()
+        entry = self._vendors.get(vendor_id.lower())
+        if not entry:
+            return None
+        start, end, _ = entry
+        # Devices are one tab deep; subsystems (two tabs) never match this
+        pattern = re.compile(rb"^\t" + device_id.lower().encode() + rb"  (.*)$", re.M)
+        match = pattern.search(self._data, start, end)
+        return match.group(1).decode("utf-8", "replace") if match else None
+
+
+# Shared lookup, so the database is read at most once per process
+pci_ids = PciIds()
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _read_int(path):
+    value = _read(path)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _short_vendor(vendor_id, pci_name):
+    # pci.ids spells out e.g. "Advanced Micro Devices, Inc. [AMD/ATI]"
+    if vendor_id in KNOWN_VENDORS:
+        return KNOWN_VENDORS[vendor_id]
+    return pci_name or vendor_id
+
+
+def pci_bus_available(sysfs_path=None):
+    """Whether PCI devices can be enumerated from sysfs."""
+    return os.path.isdir(os.path.join(sysfs_path or SYSFS_PATH, "bus/pci/devices"))
+
+
+def resolve_names(devices, ids=None):
+    """Returns `devices` with vendor and device names looked up in pci.ids."""
+    ids = ids or pci_ids
+    return [
+        device._replace(
+            vendor=_short_vendor(device.vendor_id, ids.vendor(device.vendor_id)),
+            device=ids.device(device.vendor_id, device.device_id),
+        )
+        for device in devices
+    ]
+
+
+def gpu_devices(sysfs_path=None, ids=None, names=True):
+    """Enumerates display controllers from /sys/bus/pci/devices.
+
+    No processes are spawned: names come from pci.ids and AMD VRAM figures
+    from the amdgpu mem_info_vram_* attributes. With `names=False` the
+    pci.ids lookup is skipped (see resolve_names) and only ids are filled in.
+    """
+    devices_dir = os.path.join(sysfs_path or SYSFS_PATH, "bus/pci/devices")
+    try:
+        addresses = sorted(os.listdir(devices_dir))
+    except OSError:
+        return []
+
+    devices = []
+    for address in addresses:
+        device_dir = os.path.join(devices_dir, address)
+        pci_class = _read(os.path.join(device_dir, "class"))
+        try:
+            if pci_class is None or int(pci_class, 16) >> 16 != PCI_CLASS_DISPLAY:
+                continue
+        except ValueError:
+            continue
+
+        vendor_id = (_read(os.path.join(device_dir, "vendor")) or "").lower().replace("0x", "")
+        device_id = (_read(os.path.join(device_dir, "device")) or "").lower().replace("0x", "")
+        try:
+            driver = os.path.basename(os.readlink(os.path.join(device_dir, "driver")))
+        except OSError:
+            driver = None
+
+        devices.append(GpuDevice(
+            address=address,
+            vendor_id=vendor_id,
+            device_id=device_id,
+            vendor=None,
+            device=None,
+            driver=driver,
+            vram_total=_read_int(os.path.join(device_dir, "mem_info_vram_total")),
+            vram_used=_read_int(os.path.join(device_dir, "mem_info_vram_used")),
+        ))
+    return resolve_names(devices, ids) if names else devices
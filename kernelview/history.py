@@ -0,0 +1,294 @@
+import bisect
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+
+from .breaker import CircuitBreaker
+from .collector import collect
+from .core import system_probes
+from .probes import TIMED_OUT
+from .state import cache_path
+
+# One record per tick, every column a little-endian double; NaN where a
+# metric was unavailable (no GPU, a probe that timed out)
+COLUMNS = (
+    "timestamp", "cpu_percent", "cpu_hz", "ram_bytes", "ram_percent", "swap_bytes", "swap_percent",
+    "disk_bytes", "disk_percent", "vram_bytes", "vram_percent", "load1", "load5", "load15",
+)
+WIDTH = len(COLUMNS)
+_RECORD = struct.Struct(f"<{WIDTH}d")
+RECORD_SIZE = _RECORD.size
+
+# Metric names accepted by `kernelview history --field`, and the columns they cover
+METRICS = {
+    "cpu": ["cpu_percent"],
+    "freq": ["cpu_hz"],
+    "ram": ["ram_percent", "ram_bytes"],
+    "swap": ["swap_percent", "swap_bytes"],
+    "disk": ["disk_percent", "disk_bytes"],
+    "vram": ["vram_percent", "vram_bytes"],
+    "load": ["load1", "load5", "load15"],
+}
+
+# Fields collected on every tick
+RECORDED_FIELDS = ["CPU Usage", "CPU Speed", "RAM", "Swap", "Disk", "VRAM"]
+
+DEFAULT_INTERVAL = 10.0
+# A week of records at the default interval, about 6.5 MiB
+DEFAULT_CAPACITY = 7 * 24 * 360
+
+# Header: magic, version, header size, columns per record, capacity,
+# records written so far (the next slot is written % capacity)
+_MAGIC = b"KVHIST\0\0"
+_VERSION = 1
+_HEADER = struct.Struct("<8sIIIIQ")
+HEADER_SIZE = 64
+_WRITTEN_OFFSET = _HEADER.size - 8
+
+
+def default_path():
+    """Returns where `kernelview record` keeps its history by default."""
+    return cache_path("history.bin")
+
+
+class HistoryFile:
+    """A fixed-size ring buffer of records in a memory-mapped file.
+
+    The file is created with room for `capacity` records; once full, each
+    new record overwrites the oldest. An existing file keeps the capacity
+    it was created with. Opened read-only unless `writable`; a writable
+    file is locked, so a second writer fails with OSError instead of
+    overwriting the same slots.
+    """
+
+    def __init__(self, path=None, capacity=DEFAULT_CAPACITY, writable=False):
+        self.path = path or default_path()
+        self.writable = writable
+        self._lock_file = None
+        if writable and not os.path.exists(self.path):
+            self._create(capacity)
+        with open(self.path, "r+b" if writable else "rb") as f:
+            if writable:
+                self._lock(f)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        try:
+            magic, version, header_size, width, self.capacity, _ = _HEADER.unpack_from(self._map)
+            if (magic, version, header_size, width) != (_MAGIC, _VERSION, HEADER_SIZE, WIDTH):
+                raise ValueError(f"{self.path} is not a KernelView history file (or from another version)")
+            if len(self._map) < HEADER_SIZE + self.capacity * RECORD_SIZE:
+                raise ValueError(f"{self.path} is truncated")
+        except (ValueError, struct.error):
+            self.close()
+            raise
+
+    def _lock(self, f):
+        try:
+            import fcntl
+        except ImportError:  # Windows: no advisory locks, writers are not guarded
+            return
+        # Held on a descriptor of its own until close()
+        self._lock_file = os.fdopen(os.dup(f.fileno()), "rb")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            # A writer creating the file at the same time may have replaced it since it was opened
+            if os.fstat(self._lock_file.fileno()).st_ino != os.stat(self.path).st_ino:
+                raise BlockingIOError
+        except BlockingIOError:
+            self._lock_file.close()
+            raise OSError(f"{self.path} is already being recorded to by another process") from None
+
+    def _create(self, capacity):
+        if capacity < 1:
+            raise ValueError("capacity must be at least one record")
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # Written in full under a temporary name, so readers never map a half-created file
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, HEADER_SIZE, WIDTH, capacity, 0).ljust(HEADER_SIZE, b"\0"))
+            f.truncate(HEADER_SIZE + capacity * RECORD_SIZE)
+        os.replace(tmp_path, self.path)
+
+    @property
+    def written(self):
+        """Records appended since the file was created (not all of them still held)."""
+        return struct.unpack_from("<Q", self._map, _WRITTEN_OFFSET)[0]
+
+    def __len__(self):
+        return min(self.written, self.capacity)
+
+    def append(self, values):
+        """Appends one record: a value per COLUMNS entry, None for unavailable."""
+        written = self.written
+        offset = HEADER_SIZE + (written % self.capacity) * RECORD_SIZE
+        _RECORD.pack_into(self._map, offset, *(math.nan if value is None else value for value in values))
+        # The count moves only once the record is complete
+        struct.pack_into("<Q", self._map, _WRITTEN_OFFSET, written + 1)
+
+    def _segments(self, view):
+        # The records in chronological order, as one or two flat runs of doubles
+        written = self.written
+        count = min(written, self.capacity)
+        data = view[HEADER_SIZE:HEADER_SIZE + self.capacity * RECORD_SIZE].cast("d")
+        if written <= self.capacity:
+            return [data[:count * WIDTH]]
+        head = (written % self.capacity) * WIDTH
+        return [data[head:], data[:head]]
+
+    def summarise(self, columns, since, step, until=None):
+        """Returns [(bucket start, {column: (min, max, avg) or None}), ...] for records since `since`.
+
+        Records from `since` to `until` (now by default, wall clock times)
+        are split into buckets of `step` seconds. Each bucket is reduced
+        over strided views of the mapped file: nothing is copied or parsed.
+        """
+        until = time.time() if until is None else until
+        buckets = max(1, math.ceil((until - since) / step))
+        indexes = [COLUMNS.index(column) for column in columns]
+        totals = [[_Summary() for _ in indexes] for _ in range(buckets)]
+        with memoryview(self._map) as view:
+            for segment in self._segments(view):
+                timestamps = segment[0::WIDTH]
+                bounds = [bisect.bisect_left(timestamps, since + step * bucket) for bucket in range(buckets)]
+                bounds.append(bisect.bisect_left(timestamps, until))
+                for column, index in enumerate(indexes):
+                    values = segment[index::WIDTH]
+                    for bucket in range(buckets):
+                        if bounds[bucket] < bounds[bucket + 1]:
+                            totals[bucket][column].add(values[bounds[bucket]:bounds[bucket + 1]])
+                    values.release()
+                timestamps.release()
+                segment.release()
+        return [
+            (since + step * bucket, {column: summary.result() for column, summary in zip(columns, summaries)})
+            for bucket, summaries in enumerate(totals)
+        ]
+
+    def close(self):
+        if self.writable:
+            self._map.flush()
+        self._map.close()
+        if self._lock_file is not None:
+            self._lock_file.close()  # Releases the lock
+            self._lock_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _Summary:
+    __slots__ = ("count", "total", "low", "high")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.low = math.inf
+        self.high = -math.inf
+
+    def add(self, values):
+        total = math.fsum(values)
+        if total != total:  # Some values are NaN; only then are they filtered one by one
+            values = [value for value in values if value == value]
+            if not values:
+                return
+            total = math.fsum(values)
+        self.count += len(values)
+        self.total += total
+        self.low = min(self.low, min(values))
+        self.high = max(self.high, max(values))
+
+    def result(self):
+        return (self.low, self.high, self.total / self.count) if self.count else None
+
+
+def _usage(value, key):
+    return value.get(key) if isinstance(value, dict) else None
+
+
+def snapshot_values(raw, timestamp, load=None):
+    """Turns raw field values (RECORDED_FIELDS) into a record: one value per COLUMNS entry."""
+    raw = {field: (None if value is TIMED_OUT else value) for field, value in raw.items()}
+    if load is None:
+        try:
+            load = os.getloadavg()
+        except (AttributeError, OSError):  # Windows has no load average
+            load = (None, None, None)
+    values = [timestamp, _usage(raw.get("CPU Usage"), "percent"), _usage(raw.get("CPU Speed"), "median_hz")]
+    for field in ["RAM", "Swap", "Disk", "VRAM"]:
+        values += [_usage(raw.get(field), "used_bytes"), _usage(raw.get(field), "percent")]
+    return values + list(load)
+
+
+def record(path=None, interval=DEFAULT_INTERVAL, capacity=DEFAULT_CAPACITY, ticks=None, max_workers=None):
+    """Appends a record every `interval` seconds until interrupted (or `ticks` records).
+
+    CPU usage is measured over the time since the previous tick, so no
+    tick sleeps to sample it. Every collection is bounded by the interval.
+    """
+    probes = system_probes(RECORDED_FIELDS)
+    breaker = CircuitBreaker()
+    count = 0
+    next_tick = time.monotonic()
+    with HistoryFile(path, capacity, writable=True) as history:
+        try:
+            while True:
+                raw = collect(probes, max_workers=max_workers, deadline=interval, breaker=breaker)
+                history.append(snapshot_values(raw, time.time()))
+                count += 1
+                if ticks is not None and count >= ticks:
+                    break
+                # Fixed schedule, like --watch
+                next_tick += interval
+                time.sleep(max(0.0, next_tick - time.monotonic()))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            breaker.save()
+
+
+def parse_duration(text):
+    """Parses "90", "90s", "5m", "1h" or "2d" into seconds."""
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    text = text.strip().lower()
+    scale = units.get(text[-1:], None)
+    number = text[:-1] if scale else text
+    value = float(number) * (scale or 1)
+    if not value > 0:
+        raise ValueError(f"duration must be positive: {text!r}")
+    return value
+
+
+def _format_value(column, value):
+    if column.endswith("_percent"):
+        return f"{value:.1f}%"
+    if column.endswith("_bytes"):
+        return f"{value / 1024**3:.2f}GB"
+    if column.endswith("_hz"):
+        return f"{value / 1e9:.2f}GHz"
+    return f"{value:.2f}"
+
+
+def write_summary(rows, columns, stream=None):
+    """Writes summarise() output as a table: one line per bucket, min/avg/max per column."""
+    stream = stream or sys.stdout
+    header = ["time"] + [f"{column} min/avg/max" for column in columns]
+    lines = []
+    for start, summaries in rows:
+        cells = [time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(start))]
+        for column in columns:
+            summary = summaries[column]
+            cells.append("-" if summary is None else "/".join(
+                _format_value(column, value) for value in (summary[0], summary[2], summary[1])
+            ))
+        lines.append(cells)
+    widths = [max(len(cells[i]) for cells in [header] + lines) for i in range(len(header))]
+    stream.write("".join(
+        "  ".join(cell.ljust(width) for cell, width in zip(cells, widths)).rstrip() + "\n"
+        for cells in [header] + lines
+    ))
+    stream.flush()
@@ -0,0 +1,150 @@
+import os
+import re
+import sys
+import threading
+from collections import namedtuple
+
+# A language is present when one of its `binaries` is on PATH. Its version
+# comes from running the first binary found with `version_args` (stdout and
+# stderr combined, since `java -version` prints to stderr) and taking the
+# first group of `version_pattern`.
+Language = namedtuple("Language", ["name", "binaries", "version_args", "version_pattern"])
+
+LANGUAGES = [
+    Language("Python", ("python3",), ("--version",), r"Python (\S+)"),
+    Language("Node.js", ("node",), ("--version",), r"v?(\d\S*)"),
+    Language("C", ("gcc",), ("--version",), r"(\d+\.\d+(?:\.\d+)?)(?:\s|$)"),
+    Language("C++", ("g++",), ("--version",), r"(\d+\.\d+(?:\.\d+)?)(?:\s|$)"),
+    Language("Go", ("go",), ("version",), r"go(\d\S*)"),
+    Language("Rust", ("rustc",), ("--version",), r"rustc (\S+)"),
+    Language("Java", ("java",), ("-version",), r'version "?([^"\s]+)'),
+    Language("Perl", ("perl",), ("--version",), r"\(v(\S+)\)"),
+    Language("Ruby", ("ruby",), ("--version",), r"ruby (\S+)"),
+    Language("PHP", ("php",), ("--version",), r"PHP (\S+)"),
+]
+
+
+def register_language(name, binaries, version_args=("--version",), version_pattern=r"(\d+(?:\.\d+)+)"):
+    """Adds a language to the detection table, replacing one with the same name."""
+    language = Language(name, tuple(binaries), tuple(version_args), version_pattern)
+    for i, existing in enumerate(LANGUAGES):
+        if existing.name == name:
+            LANGUAGES[i] = language
+            break
+    else:
+        LANGUAGES.append(language)
+    return language
+
+
+class PathIndex:
+    """In-memory index of the executables on PATH, built with one scan.
+
+    Lookups follow PATH precedence (first directory wins) like shutil.which,
+    but after the initial scan cost a dict lookup plus one access() check.
+    """
+
+    def __init__(self, path=None):
+        self.path = os.environ.get("PATH", os.defpath) if path is None else path
+        self._entries = {}
+        if sys.platform == "win32":
+            extensions = [ext.lower() for ext in os.environ.get("PATHEXT", ".EXE;.BAT;.CMD").split(";") if ext]
+        else:
+            extensions = None
+
+        for directory in self.path.split(os.pathsep):
+            if not directory:
+                continue
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for name in names:
+                key = name
+                if extensions is not None:
+                    stem, ext = os.path.splitext(name)
+                    if ext.lower() not in extensions:
+                        continue
+                    key = stem.lower()
+                self._entries.setdefault(key, []).append(os.path.join(directory, name))
+
+    def which(self, name):
+        """Returns the full path of executable `name`, or None."""
+        if sys.platform == "win32":
+            name = name.lower()
+        for candidate in self._entries.get(name, ()):
+            if os.access(candidate, os.X_OK) and not os.path.isdir(candidate):
+                return candidate
+        return None
+
+
+_index_lock = threading.Lock()
+_index = None
+
+
+def path_index():
+    """Returns the PathIndex for the current PATH, rebuilding it only if PATH changed."""
+    global _index
+    with _index_lock:
+        if _index is None or _index.path != os.environ.get("PATH", os.defpath):
+            _index = PathIndex()
+        return _index
+
+
+def detect_languages(index=None):
+    """Returns (Language, binary path) for every language found on PATH, in table order."""
+    index = index or path_index()
+    found = []
+    for language in LANGUAGES:
+        for binary in language.binaries:
+            path = index.which(binary)
+            if path:
+                found.append((language, path))
+                break
+    return found
+
+
+def installed_languages(index=None):
+    """Returns the names of every language found on PATH, without running anything."""
+    return [language.name for language, _ in detect_languages(index)]
+
+
+# (binary path, mtime_ns, version args) -> version string
+_version_cache = {}
+_version_lock = threading.Lock()
+
+
+def language_version(language, path, timeout=10):
+    """Runs `path` to find the version of `language`, memoised by binary path and mtime."""
+    try:
+        key = (path, os.stat(path).st_mtime_ns, language.version_args)
+    except OSError:
+        return None
+    with _version_lock:
+        if key in _version_cache:
+            return _version_cache[key]
+
+    import subprocess  # Detection alone never runs anything
+    try:
+        output = subprocess.run(
+            [path, *language.version_args],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            timeout=timeout,
+        ).stdout.decode("utf-8", errors="replace")
+    except (OSError, subprocess.SubprocessError):
+        output = ""
+    match = re.search(language.version_pattern, output)
+    version = match.group(1) if match else None
+
+    with _version_lock:
+        _version_cache[key] = version
+    return version
+
+
+def language_versions(index=None):
+    """Returns {language name: version} for every detected language.
+
+    This is the only call that launches interpreters; detection alone never does.
+    """
+    return {language.name: language_version(language, path) for language, path in detect_languages(index)}
@@ -0,0 +1,264 @@
+import time
+from array import array
+
+from .core import collect_system_info
+from .probes import TIMED_OUT
+
+
+def _plain(value):
+    # JSON-ready form of a record attribute
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, array):
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _plain(item) for key, item in value.items()}
+    return value
+
+
+class Record:
+    """Base of the snapshot records: a fixed set of attributes, None when unknown.
+
+    Attributes hold raw numbers (integer bytes and Hz, float percentages);
+    turning them into text is left to the display layer. Records have no
+    per-instance dict, so holding many snapshots stays cheap.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values.pop(name, None))
+        if values:
+            raise TypeError(f"{type(self).__name__} has no attribute(s) {', '.join(values)}")
+
+    def to_dict(self):
+        """Returns the record as plain dicts, lists and numbers, ready for json.dumps."""
+        return {name: _plain(getattr(self, name)) for name in self.__slots__}
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None  # Mutable, and compared by value
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+
+class Usage(Record):
+    """Capacity of RAM, swap, a filesystem or video memory."""
+
+    __slots__ = ("total_bytes", "used_bytes", "free_bytes", "available_bytes", "percent")
+
+
+class Cpu(Record):
+    """The processor: model, counts, frequencies and utilisation.
+
+    `per_cpu_hz` and `per_cpu_percent` are arrays indexed like `cpus`.
+    """
+
+    __slots__ = (
+        "model", "sockets", "cores", "threads", "frequency_hz", "min_frequency_hz", "max_frequency_hz",
+        "cpus", "per_cpu_hz", "usage_percent", "per_cpu_percent",
+    )
+
+
+class MountUsage(Record):
+    """One mounted filesystem; `usage` is None if it did not answer in time (`timed_out`)."""
+
+    __slots__ = ("mount_point", "source", "fstype", "device", "usage", "timed_out")
+
+
+class DiskIo(Record):
+    """I/O rates of one block device."""
+
+    __slots__ = (
+        "device", "read_iops", "write_iops", "read_bytes_per_second", "write_bytes_per_second", "await_ms",
+        "utilisation_percent",
+    )
+
+
+class Storage(Record):
+    """`disk` is the filesystem holding /, `total` all filesystems counted once."""
+
+    __slots__ = ("disk", "total", "mounts", "io")
+
+
+class Gpu(Record):
+    """`vram` is None where the GPU shares system memory (`shared_memory`)."""
+
+    __slots__ = ("name", "vram", "shared_memory")
+
+
+# Traffic of an interface over the sampling window (see network.rates)
+_TRAFFIC = (
+    "rx_bytes_per_second", "tx_bytes_per_second", "rx_packets_per_second", "tx_packets_per_second",
+    "rx_errors", "tx_errors", "rx_drops", "tx_drops",
+)
+
+
+class Interface(Record):
+    """One network interface: link, addresses ("address/prefix") and traffic rates."""
+
+    __slots__ = ("name", "state", "mtu", "speed_mbps", "mac", "virtual", "addresses") + _TRAFFIC
+
+
+class Network(Record):
+    __slots__ = ("hostname", "ip_address", "interfaces", "open_ports")
+
+
+class Software(Record):
+    """`packages` maps package managers to package counts."""
+
+    __slots__ = (
+        "os", "kernel", "shell", "terminal", "python", "locale", "desktop", "window_manager", "resolution",
+        "packages", "languages",
+    )
+
+
+class Snapshot(Record):
+    """One collection of system information, as typed records.
+
+    Subsystems whose fields were not collected (see the `fields` argument
+    of get_snapshot) or timed out hold None.
+    """
+
+    __slots__ = ("timestamp", "uptime_seconds", "cpu", "memory", "swap", "storage", "gpu", "network", "software")
+
+    @classmethod
+    def from_raw(cls, raw, timestamp=None):
+        """Builds a Snapshot from raw field values (collect_system_info)."""
+        def get(field):
+            value = raw.get(field)
+            return None if value is TIMED_OUT else value
+
+        return cls(
+            timestamp=timestamp if timestamp is not None else time.time(),
+            uptime_seconds=get("Uptime"),
+            cpu=_cpu(get),
+            memory=_usage(get("RAM")),
+            swap=_usage(get("Swap")),
+            storage=_storage(get),
+            gpu=_gpu(get),
+            network=_network(get),
+            software=_software(get),
+        )
+
+
+def _usage(stats):
+    if not stats or stats.get("total_bytes") is None:
+        return None
+    return Usage(**{name: stats.get(name) for name in Usage.__slots__})
+
+
+def _any(get, fields):
+    return any(get(field) is not None for field in fields)
+
+
+def _cpu(get):
+    if not _any(get, ["CPU", "Cores/Threads", "CPU Speed", "CPU Usage", "CPU Topology"]):
+        return None
+    counts = get("Cores/Threads") or {}
+    speed = get("CPU Speed") or {}
+    usage = get("CPU Usage") or {}
+    return Cpu(
+        model=get("CPU"),
+        sockets=(get("CPU Topology") or {}).get("sockets"),
+        cores=counts.get("cores"),
+        threads=counts.get("threads"),
+        frequency_hz=speed.get("median_hz"),
+        min_frequency_hz=speed.get("min_hz"),
+        max_frequency_hz=speed.get("max_hz"),
+        cpus=speed.get("cpus"),
+        per_cpu_hz=speed.get("per_cpu_hz"),
+        usage_percent=usage.get("percent"),
+        per_cpu_percent=usage.get("per_cpu"),
+    )
+
+
+def _storage(get):
+    if not _any(get, ["Disk", "Storage", "Disk I/O"]):
+        return None
+    stats = get("Storage") or {}
+    mounts = tuple(
+        MountUsage(
+            mount_point=mount["mount_point"], source=mount["source"], fstype=mount["fstype"], device=mount["device"],
+            usage=_usage(mount), timed_out=bool(mount.get("timed_out")),
+        )
+        for mount in stats.get("mounts") or []
+    )
+    devices = (get("Disk I/O") or {}).get("devices") or []
+    return Storage(
+        disk=_usage(get("Disk")),
+        total=_usage(stats) if mounts else None,
+        mounts=mounts,
+        io=tuple(DiskIo(**{name: device[name] for name in DiskIo.__slots__}) for device in devices),
+    )
+
+
+def _gpu(get):
+    if not _any(get, ["GPU", "VRAM"]):
+        return None
+    vram = get("VRAM") or {}
+    return Gpu(name=get("GPU"), vram=_usage(vram), shared_memory=bool(vram.get("shared")))
+
+
+def _network(get):
+    if not _any(get, ["Hostname", "IP Address", "Network", "Network I/O", "Open Ports"]):
+        return None
+    traffic = {record["interface"]: record for record in (get("Network I/O") or {}).get("interfaces") or []}
+    interfaces = []
+    for link in (get("Network") or {}).get("interfaces") or []:
+        rates = traffic.get(link["name"], {})
+        interfaces.append(Interface(
+            name=link["name"], state=link["state"], mtu=link["mtu"], speed_mbps=link["speed_mbps"], mac=link["mac"],
+            virtual=link["virtual"],
+            addresses=tuple(
+                address["address"] if address["prefix"] is None else f"{address['address']}/{address['prefix']}"
+                for address in link["addresses"]
+            ),
+            **{name: rates.get(name) for name in _TRAFFIC},
+        ))
+    ports = get("Open Ports")
+    return Network(
+        hostname=get("Hostname"),
+        ip_address=get("IP Address"),
+        interfaces=tuple(interfaces),
+        open_ports=array("H", ports) if ports is not None else None,
+    )
+
+
+def _software(get):
+    fields = {
+        "os": "OS", "kernel": "Kernel", "shell": "Shell", "terminal": "Terminal", "python": "Python",
+        "locale": "Locale", "desktop": "DE", "window_manager": "Window Manager", "resolution": "Resolution",
+        "packages": "Packages",
+    }
+    if not _any(get, list(fields.values()) + ["Languages"]):
+        return None
+    languages = get("Languages")
+    return Software(
+        languages=tuple(languages) if languages is not None else None,
+        **{name: get(field) for name, field in fields.items()},
+    )
+
+
+def get_snapshot(fields=None, **options):
+    """Collects system information as a Snapshot of typed records.
+
+    Takes the same arguments as collect_system_info. Unlike get_system_info,
+    nothing is rounded or turned into text: sizes are integer bytes,
+    frequencies integer Hz and percentages floats.
+    """
+    return Snapshot.from_raw(collect_system_info(fields, **options), time.time())
+
+
+async def get_snapshot_async(fields=None, **options):
+    """Coroutine version of get_snapshot (see aio.collect_system_info_async)."""
+    from .aio import collect_system_info_async
+    return Snapshot.from_raw(await collect_system_info_async(fields, **options), time.time())
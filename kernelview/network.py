@@ -0,0 +1,283 @@
+import os
+import threading
+import time
+from array import array
+
+from .state import cache_path, load_json, save_json
+
+# Roots of the pseudo-filesystems read here, overridable for fixtures
+PROCFS_PATH = "/proc"
+SYSFS_PATH = "/sys"
+
+# Shortest window traffic rates are computed over (see disk_sampler)
+DEFAULT_MIN_WINDOW = 0.1
+# A persisted baseline older than this describes different traffic and is ignored
+MAX_BASELINE_AGE = 600
+
+# Counters kept per interface, in this order
+COUNTERS = ("rx_bytes", "rx_packets", "rx_errors", "rx_drops", "tx_bytes", "tx_packets", "tx_errors", "tx_drops")
+_WIDTH = len(COUNTERS)
+# Their columns in a /proc/net/dev line, after the interface name
+_DEV_COLUMNS = (0, 1, 2, 3, 8, 9, 10, 11)
+# Their names in psutil.net_io_counters(pernic=True), elsewhere
+_PSUTIL_COUNTERS = (
+    "bytes_recv", "packets_recv", "errin", "dropin", "bytes_sent", "packets_sent", "errout", "dropout",
+)
+
+IFF_UP = 0x1
+_RTF_UP = 0x1
+
+
+def _read(path):
+    try:
+        with open(path, "rb", buffering=0) as f:
+            return f.read(4096).decode("ascii", "replace").strip()
+    except OSError:  # speed, for one, cannot be read while the link is down
+        return None
+
+
+def _prefix_length(netmask):
+    import ipaddress
+    try:
+        return ipaddress.ip_network(f"0.0.0.0/{netmask}" if "." in netmask else f"::/{netmask}").prefixlen
+    except ValueError:
+        return None
+
+
+def interface_addresses():
+    """Returns {interface: [{"family", "address", "prefix"}, ...]} for IPv4 and IPv6.
+
+    Read with getifaddrs (through psutil), which asks the kernel about
+    local interfaces only: nothing is sent on the network.
+    """
+    import socket
+    import psutil
+    families = {socket.AF_INET: "ipv4", socket.AF_INET6: "ipv6"}
+    addresses = {}
+    for name, entries in psutil.net_if_addrs().items():
+        for entry in entries:
+            if entry.family not in families:
+                continue
+            addresses.setdefault(name, []).append({
+                "family": families[entry.family],
+                "address": entry.address.split("%", 1)[0],  # fe80::1%eth0
+                "prefix": _prefix_length(entry.netmask) if entry.netmask else None,
+            })
+    return addresses
+
+
+def _sysfs_link(name):
+    directory = os.path.join(SYSFS_PATH, "class/net", name)
+    state = _read(os.path.join(directory, "operstate")) or "unknown"
+    if state == "unknown":
+        # Loopback and most tunnels never report an operstate
+        try:
+            if int(_read(os.path.join(directory, "flags")) or "0", 16) & IFF_UP:
+                state = "up"
+        except ValueError:
+            pass  # Unreadable flags: the state stays unknown
+    mtu = _read(os.path.join(directory, "mtu"))
+    speed = _read(os.path.join(directory, "speed"))
+    return {
+        "state": state,
+        "mtu": int(mtu) if mtu and mtu.isdigit() else None,
+        # Virtual interfaces report -1, or nothing at all
+        "speed_mbps": int(speed) if speed and speed.isdigit() and int(speed) > 0 else None,
+        "mac": _read(os.path.join(directory, "address")) or None,
+        "virtual": not os.path.exists(os.path.join(directory, "device")),
+    }
+
+
+def _psutil_links():
+    import psutil
+    return {
+        name: {
+            "state": "up" if stats.isup else "down",
+            "mtu": stats.mtu or None,
+            "speed_mbps": stats.speed or None,
+            "mac": None,
+            "virtual": None,
+        }
+        for name, stats in psutil.net_if_stats().items()
+    }
+
+
+def default_route_interface():
+    """Returns the interface of the IPv4 default route with the lowest metric (None if there is none)."""
+    try:
+        with open(os.path.join(PROCFS_PATH, "net/route")) as f:
+            lines = f.read().splitlines()[1:]
+    except OSError:
+        return None
+    best = None
+    for line in lines:
+        fields = line.split()
+        try:
+            if fields[1] != "00000000" or not int(fields[3], 16) & _RTF_UP:
+                continue
+            metric = int(fields[6])
+        except (IndexError, ValueError):
+            continue
+        if best is None or metric < best[0]:
+            best = (metric, fields[0])
+    return best and best[1]
+
+
+def interfaces():
+    """Returns a record per network interface, sorted by name.
+
+    Records hold the link state, MTU, speed in Mb/s, MAC address, whether
+    the interface is virtual (a VLAN, bridge or tunnel) and its addresses.
+    On Linux links come from /sys/class/net, elsewhere from psutil.
+    """
+    sysfs = os.path.join(SYSFS_PATH, "class/net")
+    if os.path.isdir(sysfs):
+        links = {name: _sysfs_link(name) for name in os.listdir(sysfs)}
+    else:
+        links = _psutil_links()
+    addresses = interface_addresses()
+    return [
+        dict(name=name, addresses=addresses.get(name, []), **links[name])
+        for name in sorted(links)
+    ]
+
+
+class NetCounters:
+    """One sample of the traffic counters: _WIDTH counters per interface, in the order of `names`."""
+
+    __slots__ = ("timestamp", "names", "counters")
+
+    def __init__(self, timestamp, names, counters):
+        self.timestamp = timestamp
+        self.names = names
+        self.counters = counters
+
+
+def read_counters():
+    """Reads every interface's traffic counters in one pass over /proc/net/dev (psutil elsewhere)."""
+    path = os.path.join(PROCFS_PATH, "net/dev")
+    names = []
+    counters = array("Q")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            lines = f.read().splitlines()[2:]  # Two header lines
+        for line in lines:
+            name, _, values = line.partition(b":")
+            values = values.split()
+            if len(values) < 16:
+                continue
+            names.append(name.strip().decode())
+            counters.extend(int(values[column]) for column in _DEV_COLUMNS)
+    else:
+        import psutil
+        for name, stats in psutil.net_io_counters(pernic=True).items():
+            names.append(name)
+            counters.extend(getattr(stats, counter) for counter in _PSUTIL_COUNTERS)
+    return NetCounters(time.time(), names, counters)
+
+
+class NetworkSampler:
+    """Reports per-interface traffic as a delta from a baseline instead of sleeping.
+
+    Works like disk_sampler.DiskSampler: every sample becomes the baseline
+    of the next, the first one waits `min_window` unless the previous run's
+    persisted sample can serve as the baseline.
+    """
+
+    def __init__(self, min_window=DEFAULT_MIN_WINDOW, persist=True, state_file=None):
+        self.min_window = min_window
+        self.persist = persist
+        self.state_file = state_file or cache_path("net_baseline.json")
+        self._lock = threading.Lock()
+        self._baseline = None  # NetCounters
+        self._sampled = False
+
+    def _load_persisted(self):
+        state = load_json(self.state_file) if self.persist else None
+        if not isinstance(state, dict):
+            return None
+        try:
+            timestamp = float(state["timestamp"])
+            names = [str(name) for name in state["names"]]
+            counters = array("Q", (int(value) for value in state["counters"]))
+        except (KeyError, TypeError, ValueError, OverflowError):
+            return None
+        age = time.time() - timestamp
+        if age < 0 or age > MAX_BASELINE_AGE or len(counters) != len(names) * _WIDTH:
+            return None
+        return NetCounters(timestamp, names, counters)
+
+    def mark(self):
+        """Takes a fresh in-process baseline."""
+        with self._lock:
+            self._baseline = read_counters()
+
+    def sample(self, min_window=None):
+        """Returns per-interface rates since the baseline (see rates), then moves the baseline."""
+        if min_window is None:
+            min_window = self.min_window
+        with self._lock:
+            current = read_counters()
+            baseline = self._baseline
+            if not self._sampled and self.persist:
+                persisted = self._load_persisted()
+                if persisted and (baseline is None or persisted.timestamp < baseline.timestamp):
+                    baseline = persisted
+            if baseline is None:
+                baseline = current
+                current = None
+            elapsed = time.time() - baseline.timestamp
+            if current is None or elapsed < min_window:
+                time.sleep(max(0.0, min_window - elapsed))
+                current = read_counters()
+
+            result = rates(baseline, current)
+            self._baseline = current
+            self._sampled = True
+            if self.persist:
+                save_json(self.state_file, {
+                    "timestamp": current.timestamp, "names": current.names, "counters": current.counters.tolist(),
+                })
+        return result
+
+
+def rates(baseline, current):
+    """Computes traffic per interface between two NetCounters samples.
+
+    Bytes and packets are per second; errors and drops are counts over the
+    window. Interfaces missing from the baseline, or whose counters went
+    backwards (a re-created interface), are left out.
+    """
+    window = current.timestamp - baseline.timestamp
+    if window <= 0:
+        return {"window_seconds": 0.0, "interfaces": []}
+    index = {name: position for position, name in enumerate(baseline.names)}
+    old, new = baseline.counters, current.counters
+    records = []
+    for position, name in enumerate(current.names):
+        if name not in index:
+            continue
+        start, old_start = position * _WIDTH, index[name] * _WIDTH
+        delta = dict(zip(COUNTERS, (new[start + k] - old[old_start + k] for k in range(_WIDTH))))
+        if min(delta.values()) < 0:
+            continue
+        records.append({
+            "interface": name,
+            "rx_bytes_per_second": round(delta["rx_bytes"] / window),
+            "tx_bytes_per_second": round(delta["tx_bytes"] / window),
+            "rx_packets_per_second": round(delta["rx_packets"] / window, 1),
+            "tx_packets_per_second": round(delta["tx_packets"] / window, 1),
+            "rx_errors": delta["rx_errors"],
+            "tx_errors": delta["tx_errors"],
+            "rx_drops": delta["rx_drops"],
+            "tx_drops": delta["tx_drops"],
+        })
+    return {"window_seconds": round(window, 3), "interfaces": records}
+
+
+default_sampler = NetworkSampler()
+
+
+def sample(min_window=None):
+    """Samples traffic rates with the module-level sampler."""
+    return default_sampler.sample(min_window)
@@ -0,0 +1,75 @@
+import json
+import sys
+import time
+from array import array
+
+from .core import PROBES
+from .probes import TIMED_OUT
+
+FORMATS = ["text", "json", "ndjson"]
+
+
+def _jsonable(value):
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, array):
+        return value.tolist()
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = sorted(value) if isinstance(value, (set, frozenset)) else value
+        return [_jsonable(item) for item in items]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def field_record(field, value):
+    """Returns {"value": display text, "raw": raw value} for one field.
+
+    `raw` is only present for fields whose probe returns raw numbers (bytes,
+    Hz, percentages, lists); for the others the display text is the value.
+    Fields that timed out are {"value": "timed out", "timed_out": true}.
+    """
+    if value is TIMED_OUT:
+        return {"value": str(TIMED_OUT), "timed_out": True}
+    probe = PROBES[field]
+    record = {"value": probe.display(value)}
+    if probe.format is not None:
+        record["raw"] = _jsonable(value)
+    return record
+
+
+def snapshot_record(raw, timestamp=None):
+    """Returns one JSON-ready record holding every field of a raw snapshot."""
+    return {
+        "timestamp": round(timestamp if timestamp is not None else time.time(), 3),
+        "fields": {field: field_record(field, value) for field, value in raw.items()},
+    }
+
+
+def _dump(record, stream, indent=None):
+    separators = None if indent else (",", ":")
+    stream.write(json.dumps(record, indent=indent, separators=separators) + "\n")
+    stream.flush()
+
+
+def write_json(raw, stream=None):
+    """Writes a raw snapshot as one pretty-printed JSON document."""
+    _dump(snapshot_record(raw), stream or sys.stdout, indent=2)
+
+
+def write_snapshot_line(raw, stream=None, timestamp=None):
+    """Writes a raw snapshot as a single NDJSON line (one record per --watch tick)."""
+    _dump(snapshot_record(raw, timestamp), stream or sys.stdout)
+
+
+def write_ndjson(fields, stream=None):
+    """Streams (field, raw value) pairs as NDJSON, one line per field.
+
+    Each line is flushed as soon as its field arrives, so with
+    core.iter_system_info consumers see fast fields before slow probes finish.
+    """
+    stream = stream or sys.stdout
+    for field, value in fields:
+        record = {"timestamp": round(time.time(), 3), "field": field}
+        record.update(field_record(field, value))
+        _dump(record, stream)
@@ -0,0 +1,157 @@
+import os
+from collections import namedtuple
+
+from .state import file_stamp
+
+# A package manager whose installed set can be counted from its database on
+# disk. `paths` are candidate database locations (the first existing one is
+# used); the count is cached for as long as that database's mtime is unchanged.
+Backend = namedtuple("Backend", ["name", "paths", "counter"])
+
+
+def _count_dpkg(status_path):
+    """Counts installed packages in the dpkg status file without loading it whole."""
+    count = 0
+    with open(status_path, "rb") as f:
+        for line in f:
+            # One stanza per package; skip removed packages that only keep
+            # their config files ("deinstall ok config-files").
+            if line.startswith(b"Status: ") and line.rstrip().endswith(b" installed"):
+                count += 1
+    return count
+
+
+def _count_subdirs(path, exclude=()):
+    with os.scandir(path) as entries:
+        return sum(1 for entry in entries if entry.name not in exclude and entry.is_dir())
+
+
+def _count_pacman(local_db):
+    # One "<name>-<version>" directory per installed package
+    return _count_subdirs(local_db)
+
+
+def _sqlite_count(db_path, query):
+    import sqlite3  # Optional in some Python builds, only needed here
+
+    # mode=ro never takes a write lock; immutable=1 also works when the WAL
+    # shared-memory file cannot be created by an unprivileged user.
+    for options in ("mode=ro", "mode=ro&immutable=1"):
+        try:
+            connection = sqlite3.connect(f"file:{db_path}?{options}", uri=True)
+            try:
+                return connection.execute(query).fetchone()[0]
+            finally:
+                connection.close()
+        except sqlite3.Error:
+            continue
+    raise OSError(f"cannot read {db_path}")
+
+
+def _count_rpm(rpmdb_dir):
+    return _sqlite_count(os.path.join(rpmdb_dir, "rpmdb.sqlite"), "SELECT count(*) FROM Packages")
+
+
+def _count_flatpak(installations):
+    # Same refs `flatpak list` shows: <kind>/<name>/<arch>/<branch>
+    count = 0
+    for installation in installations.split(os.pathsep):
+        for kind in ("app", "runtime"):
+            kind_dir = os.path.join(installation, kind)
+            try:
+                names = os.listdir(kind_dir)
+            except OSError:
+                continue
+            for name in names:
+                try:
+                    arches = os.listdir(os.path.join(kind_dir, name))
+                except OSError:
+                    continue
+                for arch in arches:
+                    arch_dir = os.path.join(kind_dir, name, arch)
+                    if os.path.isdir(arch_dir):
+                        count += _count_subdirs(arch_dir)
+    return count
+
+
+def _count_snap(snap_dir):
+    # /snap/<name>/<revision>, plus the /snap/bin helper directory
+    return _count_subdirs(snap_dir, exclude=("bin",))
+
+
+def _count_macports(registry_dir):
+    return _sqlite_count(
+        os.path.join(registry_dir, "registry.db"), "SELECT count(*) FROM ports WHERE state = 'installed'"
+    )
+
+
+_FLATPAK_INSTALLATIONS = os.pathsep.join(
+    ["/var/lib/flatpak", os.path.expanduser("~/.local/share/flatpak")]
+)
+
+LINUX_BACKENDS = [
+    Backend("APT", ["/var/lib/dpkg/status"], _count_dpkg),
+    Backend("Pacman", ["/var/lib/pacman/local"], _count_pacman),
+    Backend("RPM", ["/var/lib/rpm", "/usr/lib/sysimage/rpm"], _count_rpm),
+    Backend("Flatpak", [_FLATPAK_INSTALLATIONS], _count_flatpak),
+    Backend("Snap", ["/snap", "/var/lib/snapd/snap"], _count_snap),
+]
+
+DARWIN_BACKENDS = [
+    Backend("Homebrew", ["/opt/homebrew/Cellar", "/usr/local/Cellar"], _count_subdirs),
+    Backend("Homebrew Cask", ["/opt/homebrew/Caskroom", "/usr/local/Caskroom"], _count_subdirs),
+    Backend("MacPorts", ["/opt/local/var/macports/registry"], _count_macports),
+]
+
+WINDOWS_BACKENDS = [
+    Backend(
+        "Chocolatey",
+        [os.path.join(os.environ.get("ChocolateyInstall", r"C:\ProgramData\chocolatey"), "lib")],
+        _count_subdirs,
+    ),
+    Backend(
+        "Scoop",
+        [os.path.join(os.environ.get("SCOOP", os.path.expanduser(r"~\scoop")), "apps")],
+        lambda path: _count_subdirs(path, exclude=("scoop",)),
+    ),
+]
+
+
+def _stamps(path):
+    """Invalidation key of a backend database: the mtimes of everything it consists of."""
+    parts = path.split(os.pathsep)
+    key = [file_stamp(part) for part in parts]
+    for part in parts:
+        # Flatpak installs touch the per-kind directories, sqlite DBs the WAL
+        key += [file_stamp(os.path.join(part, sub)) for sub in ("app", "runtime", "rpmdb.sqlite-wal")]
+    return key
+
+
+def _exists(path):
+    return any(os.path.exists(part) for part in path.split(os.pathsep))
+
+
+def count_packages(backends, cache=None):
+    """Counts installed packages for every backend whose database is present.
+
+    With a FactCache, each backend's count is cached by its database mtime.
+    """
+    counts = {}
+    for backend in backends:
+        path = next((p for p in backend.paths if _exists(p)), None)
+        if path is None:
+            continue
+
+        def compute(backend=backend, path=path):
+            try:
+                return backend.counter(path)
+            except (OSError, ValueError):
+                return None
+
+        if cache is not None:
+            count = cache.get_or_compute(f"Packages:{backend.name}", _stamps(path), compute)
+        else:
+            count = compute()
+        if count:
+            counts[backend.name] = count
+    return counts
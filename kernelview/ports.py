@@ -0,0 +1,107 @@
+import os
+import socket
+import struct
+from collections import namedtuple
+
+# Root of the procfs mount, overridable for fixtures (same idea as psutil.PROCFS_PATH)
+PROCFS_PATH = "/proc"
+
+# Socket states as printed (in hex) in the `st` column of /proc/net/*
+TCP_LISTEN = "0A"
+UDP_UNCONNECTED = "07"  # Bound UDP sockets, what `ss -uln` reports
+
+# (protocol, table relative to PROCFS_PATH, state that means "listening")
+NET_TABLES = [
+    ("tcp", "net/tcp", TCP_LISTEN),
+    ("tcp6", "net/tcp6", TCP_LISTEN),
+    ("udp", "net/udp", UDP_UNCONNECTED),
+    ("udp6", "net/udp6", UDP_UNCONNECTED),
+]
+
+ListeningSocket = namedtuple("ListeningSocket", ["protocol", "address", "port", "inode", "pid"])
+
+
+def _decode_address(hex_address):
+    """Decodes '0100007F:0016' into ('127.0.0.1', 22)."""
+    hex_ip, hex_port = hex_address.split(":")
+    # The kernel prints the address as 32-bit words in host byte order
+    words = [int(hex_ip[i:i + 8], 16) for i in range(0, len(hex_ip), 8)]
+    packed = struct.pack(f"={len(words)}I", *words)
+    family = socket.AF_INET if len(words) == 1 else socket.AF_INET6
+    return socket.inet_ntop(family, packed), int(hex_port, 16)
+
+
+def _iter_table(path, listen_state):
+    """Streams (local address, inode) of sockets in `listen_state` from one table."""
+    try:
+        f = open(path, encoding="ascii", errors="replace")
+    except OSError:
+        return
+    with f:
+        next(f, None)  # Column header
+        for line in f:
+            # sl local_address rem_address st tx:rx tr:when retrnsmt uid timeout inode ...
+            fields = line.split(None, 10)
+            if len(fields) < 10 or fields[3] != listen_state:
+                continue
+            yield fields[1], int(fields[9])
+
+
+def _socket_owners(inodes, procfs_path):
+    """Maps socket inodes to the pid holding them by walking /proc/<pid>/fd."""
+    owners = {}
+    wanted = {f"socket:[{inode}]": inode for inode in inodes}
+    try:
+        pids = [entry for entry in os.listdir(procfs_path) if entry.isdigit()]
+    except OSError:
+        return owners
+    for pid in pids:
+        fd_dir = os.path.join(procfs_path, pid, "fd")
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            continue  # Process exited or belongs to another user
+        for fd in fds:
+            try:
+                target = os.readlink(os.path.join(fd_dir, fd))
+            except OSError:
+                continue
+            inode = wanted.pop(target, None)
+            if inode is not None:
+                owners[inode] = int(pid)
+        if not wanted:
+            break
+    return owners
+
+
+def listening_sockets(with_process=False, procfs_path=None):
+    """Lists listening TCP and bound UDP sockets from /proc/net.
+
+    Resolving the owning process means walking every process's fds, which is
+    expensive on busy hosts, so it only happens with `with_process=True`;
+    otherwise `pid` is None.
+    """
+    procfs_path = procfs_path or PROCFS_PATH
+    sockets = []
+    for protocol, table, listen_state in NET_TABLES:
+        for hex_address, inode in _iter_table(os.path.join(procfs_path, table), listen_state):
+            try:
+                address, port = _decode_address(hex_address)
+            except (ValueError, struct.error, OSError):
+                continue
+            sockets.append(ListeningSocket(protocol, address, port, inode, None))
+
+    if with_process and sockets:
+        owners = _socket_owners([s.inode for s in sockets], procfs_path)
+        sockets = [s._replace(pid=owners.get(s.inode)) for s in sockets]
+    return sockets
+
+
+def listening_ports(procfs_path=None):
+    """Returns the sorted unique port numbers that have a listening socket."""
+    return sorted({s.port for s in listening_sockets(procfs_path=procfs_path)})
+
+
+def available(procfs_path=None):
+    """Whether the /proc/net tables can be read on this host."""
+    return os.access(os.path.join(procfs_path or PROCFS_PATH, "net/tcp"), os.R_OK)
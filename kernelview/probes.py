@@ -0,0 +1,116 @@
+import re
+
+# Seconds a probe may run before its field is reported as timed out
+DEFAULT_PROBE_TIMEOUT = 5.0
+
+
+class _TimedOut:
+    __slots__ = ()
+
+    def __repr__(self):
+        return "TIMED_OUT"
+
+    def __str__(self):
+        return "timed out"
+
+
+# Result of a probe that ran past its timeout or the run's deadline (or was
+# skipped by the circuit breaker, or depends on a probe that timed out)
+TIMED_OUT = _TimedOut()
+
+
+def _normalise(name):
+    # "CPU Usage", "cpu-usage" and "cpu_usage" all select the same probe
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+class Probe:
+    """A named unit of collection.
+
+    `func` is called with the results of `deps` as positional arguments, in
+    order. Probes with a `format` function return raw values (bytes, Hz,
+    percentages, lists) that `format` turns into display text; the others
+    return display text directly. Hidden probes produce intermediate data
+    for other probes (e.g. the GPU inventory shared by GPU and VRAM) and
+    never appear in the output. A probe still running after `timeout`
+    seconds is abandoned and produces TIMED_OUT.
+    """
+
+    __slots__ = ("name", "func", "deps", "aliases", "hidden", "format", "timeout")
+
+    def __init__(self, name, func, deps=(), aliases=(), hidden=False, format=None, timeout=DEFAULT_PROBE_TIMEOUT):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.aliases = tuple(aliases)
+        self.hidden = hidden
+        self.format = format
+        self.timeout = timeout
+
+    def bind(self, func, timeout=None):
+        """Returns a copy of this probe that runs `func` instead (and times out after `timeout`)."""
+        timeout = self.timeout if timeout is None else timeout
+        return Probe(self.name, func, self.deps, self.aliases, self.hidden, self.format, timeout)
+
+    def display(self, value):
+        """Returns the display text for a value produced by this probe."""
+        if value is TIMED_OUT:
+            return str(value)
+        return self.format(value) if self.format is not None else value
+
+    def __repr__(self):
+        return f"Probe({self.name!r}, deps={list(self.deps)!r})"
+
+
+class ProbeRegistry:
+    """Ordered collection of probes and their dependency graph.
+
+    A probe can only depend on probes registered before it, so registration
+    order is always a valid (topological) execution order.
+    """
+
+    def __init__(self):
+        self._probes = {}
+        self._lookup = {}
+
+    def register(self, name, func, deps=(), aliases=(), hidden=False, format=None, timeout=DEFAULT_PROBE_TIMEOUT):
+        """Adds a probe and returns it."""
+        missing = [dep for dep in deps if dep not in self._probes]
+        if missing:
+            raise ValueError(f"probe {name!r} depends on unregistered probes: {', '.join(missing)}")
+        probe = Probe(name, func, deps, aliases, hidden, format, timeout)
+        self._probes[name] = probe
+        for key in (name, *aliases):
+            self._lookup[_normalise(key)] = name
+        return probe
+
+    def __iter__(self):
+        return iter(self._probes.values())
+
+    def __getitem__(self, name):
+        return self._probes[name]
+
+    def __contains__(self, name):
+        return name in self._probes
+
+    def fields(self):
+        """Names of the probes that produce output fields."""
+        return [probe.name for probe in self if not probe.hidden]
+
+    def resolve(self, field):
+        """Maps a user-supplied field name or alias to a probe name."""
+        try:
+            return self._lookup[_normalise(field)]
+        except KeyError:
+            raise KeyError(f"unknown field {field!r} (known fields: {', '.join(self.fields())})") from None
+
+    def closure(self, fields):
+        """Returns the probes needed to produce `fields`, dependencies first."""
+        needed = set()
+        stack = [self.resolve(field) for field in fields]
+        while stack:
+            name = stack.pop()
+            if name not in needed:
+                needed.add(name)
+                stack.extend(self._probes[name].deps)
+        return [probe for probe in self if probe.name in needed]
@@ -0,0 +1,225 @@
+import builtins
+import functools
+import json
+import os
+import threading
+import time
+
+# Reads under these roots are counted as pseudo-filesystem I/O
+PSEUDO_FS_ROOTS = ("/proc/", "/sys/")
+
+_local = threading.local()
+_install_lock = threading.Lock()
+_installed = 0
+_original_open = builtins.open
+
+
+def current():
+    """Returns the ProbeRecord of the probe running on this thread, if it is being profiled."""
+    return getattr(_local, "record", None)
+
+
+class _CountingFile:
+    """Proxy of a file object that adds the size of everything read to a ProbeRecord."""
+
+    def __init__(self, file, record):
+        self._file = file
+        self._record = record
+
+    def _count(self, data):
+        if data:
+            self._record.bytes_read += len(data)
+        return data
+
+    def read(self, *args):
+        return self._count(self._file.read(*args))
+
+    def readline(self, *args):
+        return self._count(self._file.readline(*args))
+
+    def readlines(self, *args):
+        lines = self._file.readlines(*args)
+        self._record.bytes_read += sum(map(len, lines))
+        return lines
+
+    def readinto(self, buffer):
+        size = self._file.readinto(buffer)
+        if size:
+            self._record.bytes_read += size
+        return size
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self._count(next(self._file))
+
+    def __enter__(self):
+        self._file.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._file.__exit__(*exc_info)
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
+def _counting_open(file, *args, **kwargs):
+    f = _original_open(file, *args, **kwargs)
+    record = current()
+    if record is not None and isinstance(file, (str, bytes, os.PathLike)):
+        path = os.fsdecode(file)
+        if path.startswith(PSEUDO_FS_ROOTS):
+            record.files_read += 1
+            return _CountingFile(f, record)
+    return f
+
+
+def _install():
+    # open() is swapped only while some profiler is running; threads that
+    # are not being profiled get the real file object back
+    global _installed
+    with _install_lock:
+        _installed += 1
+        if _installed == 1:
+            builtins.open = _counting_open
+
+
+def _uninstall():
+    global _installed
+    with _install_lock:
+        _installed -= 1
+        if _installed == 0:
+            builtins.open = _original_open
+
+
+class ProbeRecord:
+    """What one probe did: timings, commands run and pseudo-filesystem reads."""
+
+    __slots__ = ("name", "thread", "start", "wall", "cpu", "commands", "bytes_read", "files_read")
+
+    def __init__(self, name):
+        self.name = name
+        self.thread = threading.current_thread()
+        self.start = None
+        self.wall = None
+        self.cpu = None
+        self.commands = []  # (argv, start, duration)
+        self.bytes_read = 0
+        self.files_read = 0
+
+    def command(self, argv, start, end):
+        self.commands.append((argv, start, end - start))
+
+
+class Profiler:
+    """Records where the time of a collection run goes.
+
+    Pass one to get_system_info (or collect_system_info / iter_system_info)
+    as `profiler=`; afterwards summary() ranks the probes by wall time and
+    write_trace() saves a Chrome trace-event file (chrome://tracing, Perfetto).
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.records = []
+        self._lock = threading.Lock()
+
+    def wrap(self, name, func):
+        """Returns `func` instrumented as probe `name`."""
+        @functools.wraps(func)
+        def profiled(*args):
+            record = ProbeRecord(name)
+            previous = getattr(_local, "record", None)
+            _local.record = record
+            _install()
+            cpu_start = time.thread_time()
+            record.start = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                record.wall = time.perf_counter() - record.start
+                record.cpu = time.thread_time() - cpu_start
+                _uninstall()
+                _local.record = previous
+                with self._lock:
+                    self.records.append(record)
+        return profiled
+
+    def ranked(self):
+        """Probe records, slowest first."""
+        with self._lock:
+            return sorted(self.records, key=lambda record: record.wall, reverse=True)
+
+    def summary(self, commands=True):
+        """Returns the ranked summary as lines of text."""
+        records = self.ranked()
+        if not records:
+            return ["No probes were profiled."]
+        width = max(len("probe"), *(len(record.name) for record in records))
+        total = max(record.start + record.wall for record in records) - self.origin
+        lines = [
+            f"Collected {len(records)} probes in {total * 1000:.1f} ms",
+            f"{'probe'.ljust(width)}  {'wall ms':>9}  {'cpu ms':>9}  {'cmds':>4}  {'files':>5}  {'read KiB':>8}",
+        ]
+        for record in records:
+            lines.append(
+                f"{record.name.ljust(width)}  {record.wall * 1000:9.2f}  {record.cpu * 1000:9.2f}"
+                f"  {len(record.commands):4d}  {record.files_read:5d}  {record.bytes_read / 1024:8.1f}"
+            )
+            if commands:
+                for argv, _, duration in record.commands:
+                    lines.append(f"{'':{width}}    {duration * 1000:7.2f} ms  $ {_command_line(argv)}")
+        return lines
+
+    def trace_events(self):
+        """Returns the run as Chrome trace events (one track per worker thread)."""
+        pid = os.getpid()
+        events = []
+        threads = {}
+        for record in self.ranked():
+            tid = record.thread.ident or 0
+            threads[tid] = record.thread.name
+            events.append({
+                "name": record.name,
+                "cat": "probe",
+                "ph": "X",
+                "ts": _micros(record.start - self.origin),
+                "dur": _micros(record.wall),
+                "pid": pid,
+                "tid": tid,
+                "args": {
+                    "cpu_ms": round(record.cpu * 1000, 3),
+                    "commands": len(record.commands),
+                    "files_read": record.files_read,
+                    "bytes_read": record.bytes_read,
+                },
+            })
+            for argv, start, duration in record.commands:
+                events.append({
+                    "name": _command_line(argv),
+                    "cat": "command",
+                    "ph": "X",
+                    "ts": _micros(start - self.origin),
+                    "dur": _micros(duration),
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"argv": argv if isinstance(argv, str) else list(argv)},
+                })
+        for tid, name in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+        return events
+
+    def write_trace(self, path):
+        """Writes a Chrome trace-event JSON file."""
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, f)
+
+
+def _micros(seconds):
+    return round(seconds * 1e6, 1)
+
+
+def _command_line(argv):
+    return argv if isinstance(argv, str) else " ".join(str(arg) for arg in argv)
@@ -0,0 +1,95 @@
+import os
+
+# Roots read here, overridable for fixtures
+PROCFS_PATH = "/proc"
+ETC_PATH = "/etc"
+
+# The kernel truncates process names in /proc/<pid>/comm to 15 bytes
+COMM_LENGTH = 15
+
+# Session processes of desktop environments -> name reported
+DESKTOP_PROCESSES = {
+    "gnome-shell": "GNOME",
+    "plasmashell": "KDE Plasma",
+    "xfce4-session": "XFCE",
+    "cinnamon-session": "Cinnamon",
+    "mate-session": "MATE",
+    "lxqt-session": "LXQt",
+    "lxsession": "LXDE",
+    "budgie-wm": "Budgie",
+}
+
+# X11 window manager processes -> name reported (as wmctrl -m would)
+WINDOW_MANAGER_PROCESSES = {
+    "kwin_x11": "KWin",
+    "gnome-shell": "GNOME Shell",
+    "mutter": "Mutter",
+    "muffin": "Muffin",
+    "marco": "Marco",
+    "xfwm4": "Xfwm4",
+    "openbox": "Openbox",
+    "fluxbox": "Fluxbox",
+    "icewm": "IceWM",
+    "i3": "i3",
+    "awesome": "awesome",
+    "bspwm": "bspwm",
+    "herbstluftwm": "herbstluftwm",
+    "dwm": "dwm",
+    "qtile": "Qtile",
+    "enlightenment": "Enlightenment",
+    "compiz": "Compiz",
+    "budgie-wm": "Budgie",
+}
+
+# Files the system-wide locale is configured in: systemd, then Debian
+LOCALE_FILES = ["locale.conf", "default/locale"]
+
+
+def find_process(names):
+    """Returns names[comm] for the first running process whose name is a key of `names`.
+
+    Walks /proc/<pid>/comm in PID order and stops at the first match, so a
+    desktop session (started early, low PID) is found after a few reads; a
+    host without one costs one small read per process. Returns None when
+    nothing matches or /proc cannot be read.
+    """
+    wanted = {name[:COMM_LENGTH].encode(): result for name, result in names.items()}
+    try:
+        entries = [entry.name for entry in os.scandir(PROCFS_PATH) if entry.name.isdigit()]
+    except OSError:
+        return None
+    for pid in sorted(entries, key=int):
+        try:
+            with open(os.path.join(PROCFS_PATH, pid, "comm"), "rb", buffering=0) as f:
+                comm = f.read(64).rstrip(b"\n")
+        except OSError:  # The process exited, or is hidden from us
+            continue
+        result = wanted.get(comm)
+        if result is not None:
+            return result
+    return None
+
+
+def _locale_from_file(path):
+    try:
+        with open(path) as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    for line in lines:
+        key, _, value = line.strip().partition("=")
+        if key == "LANG" and value:
+            return value.strip('"\'')
+    return None
+
+
+def system_locale():
+    """Returns the locale in effect: LC_ALL, then LANG, then the system-wide setting (None if unset)."""
+    for variable in ("LC_ALL", "LANG"):
+        if os.environ.get(variable):
+            return os.environ[variable]
+    for name in LOCALE_FILES:
+        value = _locale_from_file(os.path.join(ETC_PATH, name))
+        if value:
+            return value
+    return None
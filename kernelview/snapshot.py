@@ -0,0 +1,103 @@
+import sys
+import threading
+import time
+
+from .breaker import CircuitBreaker
+from .cache import FactCache
+from .collector import collect
+from .core import PROBES, VOLATILE_FIELDS, system_probes
+from .probes import TIMED_OUT
+
+# Seconds between refreshes of volatile fields (CPU, memory, ...) and of
+# everything else (OS, packages, ...)
+DEFAULT_VOLATILE_INTERVAL = 2.0
+DEFAULT_STATIC_INTERVAL = 600.0
+
+
+class SnapshotRefresher:
+    """Keeps an in-memory snapshot of raw field values fresh in the background.
+
+    Every field is refreshed on its own schedule: VOLATILE_FIELDS every
+    `volatile_interval` seconds, the rest every `static_interval` seconds
+    (static facts also go through the fact cache). Readers get a copy of
+    the latest snapshot without running any probe. A field whose probe
+    times out keeps its last good value; probes that keep timing out are
+    skipped by a CircuitBreaker until their cooldown expires.
+    """
+
+    def __init__(self, fields=None, volatile_interval=DEFAULT_VOLATILE_INTERVAL,
+                 static_interval=DEFAULT_STATIC_INTERVAL, max_workers=None, cpu_window=None, use_cache=True):
+        self.fields = [PROBES.resolve(field) for field in fields] if fields is not None else PROBES.fields()
+        self.intervals = {
+            field: volatile_interval if field in VOLATILE_FIELDS else static_interval for field in self.fields
+        }
+        self.max_workers = max_workers
+        self.cpu_window = cpu_window
+        self.cache = FactCache() if use_cache else None
+        self.breaker = CircuitBreaker()
+        self._lock = threading.Lock()
+        self._values = {}
+        self._refreshed = {}  # field -> monotonic time of the last refresh
+        self._updated = None  # wall clock time of the last refresh
+        self._stop = threading.Event()
+        self._thread = None
+
+    def due_fields(self, now=None):
+        """Fields whose refresh interval has elapsed."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return [
+                field for field in self.fields
+                if field not in self._refreshed or now - self._refreshed[field] >= self.intervals[field]
+            ]
+
+    def refresh(self, fields=None):
+        """Collects `fields` (the due ones by default) and merges them into the snapshot."""
+        fields = self.due_fields() if fields is None else fields
+        if not fields:
+            return
+        probes = system_probes(fields, self.cpu_window, self.cache)
+        values = collect(probes, max_workers=self.max_workers, breaker=self.breaker)
+        if self.cache is not None:
+            self.cache.save()
+        self.breaker.save()
+        now = time.monotonic()
+        with self._lock:
+            for field in fields:
+                if field in values:
+                    if values[field] is not TIMED_OUT or field not in self._values:
+                        self._values[field] = values[field]
+                    self._refreshed[field] = now
+            self._updated = time.time()
+
+    def snapshot(self, fields=None):
+        """Returns (timestamp, {field: raw value}) for `fields` (all by default)."""
+        wanted = [PROBES.resolve(field) for field in fields] if fields is not None else self.fields
+        with self._lock:
+            return self._updated, {field: self._values[field] for field in wanted if field in self._values}
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:  # Keep serving the last good snapshot
+                print(f"kernelview: refresh failed: {e}", file=sys.stderr)
+            now = time.monotonic()
+            with self._lock:
+                next_due = min(
+                    (self._refreshed.get(field, now) + self.intervals[field] for field in self.fields),
+                    default=now + DEFAULT_VOLATILE_INTERVAL,
+                )
+            self._stop.wait(max(0.05, next_due - now))
+
+    def start(self):
+        """Takes a first full snapshot, then keeps refreshing it in a daemon thread."""
+        self.refresh(self.fields)
+        self._thread = threading.Thread(target=self._run, name="kernelview-refresher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,54 @@
+import json
+import os
+
+
+def cache_dir():
+    """Returns the directory KernelView keeps its state in between runs."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "kernelview")
+
+
+def cache_path(name):
+    """Returns the path of a state file inside cache_dir()."""
+    return os.path.join(cache_dir(), name)
+
+
+def file_stamp(path):
+    """Returns an invalidation stamp for a file or directory (None if missing)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [path, st.st_mtime_ns, st.st_ino]
+
+
+def load_json(path):
+    """Reads a JSON state file, returning None if it is missing or corrupt."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_json(path, data):
+    """Atomically replaces a JSON state file.
+
+    State is only ever an optimisation, so failures (read-only home, full
+    disk) are silently ignored.
+    """
+    import tempfile  # Only needed when something changed
+    directory = os.path.dirname(path)
+    tmp_path = None
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError):
+        if tmp_path:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
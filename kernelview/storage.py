@@ -0,0 +1,159 @@
+import os
+import re
+import threading
+from collections import namedtuple
+
+from .collector import _DaemonPool, time_left
+
+# Root of the procfs mount, overridable for fixtures
+PROCFS_PATH = "/proc"
+
+# Longest a single statvfs may take before its mount is reported as not
+# responding (a stale NFS or FUSE mount can block forever)
+DEFAULT_STATVFS_TIMEOUT = 1.0
+MAX_STATVFS_WORKERS = 8
+
+# Filesystems that hold no user data: kernel interfaces, memory-backed
+# scratch space and read-only images (snaps)
+PSEUDO_FILESYSTEMS = frozenset([
+    "autofs", "binfmt_misc", "bpf", "cgroup", "cgroup2", "configfs", "debugfs", "devpts", "devtmpfs",
+    "efivarfs", "fusectl", "hugetlbfs", "mqueue", "nsfs", "proc", "pstore", "ramfs", "rpc_pipefs",
+    "securityfs", "selinuxfs", "squashfs", "sysfs", "tmpfs", "tracefs", "fuse.gvfsd-fuse", "fuse.portal",
+])
+
+_ESCAPE = re.compile(r"\\([0-7]{3})")
+
+
+class Mount(namedtuple("Mount", ["mount_point", "source", "fstype", "device"])):
+    """A mounted filesystem. `device` is "major:minor", shared by bind mounts of the same filesystem."""
+
+    __slots__ = ()
+
+
+def _unescape(field):
+    # mountinfo escapes spaces, tabs, newlines and backslashes as octal
+    return _ESCAPE.sub(lambda match: chr(int(match.group(1), 8)), field)
+
+
+def parse_mountinfo(text):
+    """Parses /proc/self/mountinfo into Mounts, in mount order."""
+    mounts = []
+    for line in text.splitlines():
+        fields = line.split()
+        try:
+            separator = fields.index("-", 6)
+            mounts.append(Mount(_unescape(fields[4]), _unescape(fields[separator + 2]), fields[separator + 1], fields[2]))
+        except (ValueError, IndexError):
+            continue
+    return mounts
+
+
+def list_mounts(include_pseudo=False):
+    """Returns the mounted filesystems, without pseudo-filesystems unless `include_pseudo`.
+
+    A mount point mounted over keeps only its topmost (visible) mount.
+    """
+    if os.path.exists(os.path.join(PROCFS_PATH, "self/mountinfo")):
+        with open(os.path.join(PROCFS_PATH, "self/mountinfo")) as f:
+            mounts = parse_mountinfo(f.read())
+    else:
+        import psutil
+        mounts = [
+            Mount(partition.mountpoint, partition.device, partition.fstype, partition.device)
+            for partition in psutil.disk_partitions(all=include_pseudo)
+        ]
+    visible = {}
+    for mount in mounts:
+        visible.pop(mount.mount_point, None)
+        if include_pseudo or mount.fstype not in PSEUDO_FILESYSTEMS:
+            visible[mount.mount_point] = mount
+    return list(visible.values())
+
+
+def _disk_usage(path):
+    if os.name != "posix":
+        import psutil
+        usage = psutil.disk_usage(path)
+        return usage.total, usage.used, usage.free
+    st = os.statvfs(path)
+    # Same figures as df and psutil.disk_usage: "free" is what unprivileged
+    # users can still write, blocks reserved for root count as neither
+    return st.f_blocks * st.f_frsize, (st.f_blocks - st.f_bfree) * st.f_frsize, st.f_bavail * st.f_frsize
+
+
+def _usage_record(total, used, free):
+    usable = used + free
+    percent = round(used / usable * 100, 1) if usable else 0.0
+    return {"total_bytes": total, "used_bytes": used, "free_bytes": free, "percent": percent}
+
+
+# Mount point -> statvfs still running from an earlier call. A mount that
+# hangs is not queried again until that call returns, so a stale mount
+# costs one stuck thread rather than one per refresh.
+_pending = {}
+_pending_lock = threading.Lock()
+
+
+def mount_usage(mounts, timeout=DEFAULT_STATVFS_TIMEOUT):
+    """Returns a usage record per mount, querying all mounts concurrently.
+
+    Records have the Mount fields plus total/used/free bytes and percent.
+    A mount that does not answer within `timeout` seconds (or the time
+    left to the probe, if less) gets {"timed_out": True} instead; mounts
+    that cannot be queried at all (permissions, vanished) are left out.
+    """
+    from concurrent.futures import wait  # Only the threads need it
+
+    left = time_left()
+    if left is not None:
+        timeout = min(timeout, left)
+    pool = None
+    futures = []
+    submitted = []
+    with _pending_lock:
+        for mount in mounts:
+            future = _pending.get(mount.mount_point)
+            if future is None or future.done():
+                if pool is None:
+                    pool = _DaemonPool(min(MAX_STATVFS_WORKERS, len(mounts)))
+                future = _pending[mount.mount_point] = pool.submit(_disk_usage, mount.mount_point)
+                submitted.append(future)
+            futures.append(future)
+    if pool is not None:
+        pool.shutdown()  # Workers exit once the queue is drained
+    if submitted:
+        # Mounts still stuck from an earlier call are not waited for again
+        wait(submitted, timeout=timeout)
+
+    records = []
+    for mount, future in zip(mounts, futures):
+        record = mount._asdict()
+        if not future.done():
+            record["timed_out"] = True
+        elif future.exception() is not None:
+            continue
+        else:
+            record.update(_usage_record(*future.result()))
+        records.append(record)
+    return records
+
+
+def storage_stats(mounts=None, timeout=DEFAULT_STATVFS_TIMEOUT):
+    """Returns {"mounts": [usage records], totals, "timed_out": [mount points]}.
+
+    Totals count every filesystem once, however many times it is mounted.
+    """
+    records = mount_usage(list_mounts() if mounts is None else mounts, timeout)
+    seen = set()
+    total = used = free = 0
+    for record in records:
+        if record.get("timed_out") or record["device"] in seen:
+            continue
+        seen.add(record["device"])
+        total += record["total_bytes"]
+        used += record["used_bytes"]
+        free += record["free_bytes"]
+    stats = {"mounts": records}
+    stats.update(_usage_record(total, used, free))
+    stats["timed_out"] = [record["mount_point"] for record in records if record.get("timed_out")]
+    return stats
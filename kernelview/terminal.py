@@ -0,0 +1,45 @@
+import os
+
+# ANSI control sequences; nothing here spawns a process
+CLEAR_SCREEN = "\033[H\033[2J"
+CLEAR_TO_END_OF_LINE = "\033[K"
+CLEAR_TO_END_OF_SCREEN = "\033[J"
+HIDE_CURSOR = "\033[?25l"
+SHOW_CURSOR = "\033[?25h"
+
+_ENABLE_VIRTUAL_TERMINAL_PROCESSING = 0x0004
+_windows_console_ready = None
+
+
+def _enable_windows_escapes():
+    # The Windows console only interprets escape sequences once asked to
+    # (os.system('cls') used to do it as a side effect)
+    global _windows_console_ready
+    if _windows_console_ready is None:
+        try:
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+            mode = ctypes.c_uint32()
+            _windows_console_ready = bool(
+                kernel32.GetConsoleMode(handle, ctypes.byref(mode))
+                and kernel32.SetConsoleMode(handle, mode.value | _ENABLE_VIRTUAL_TERMINAL_PROCESSING)
+            )
+        except (AttributeError, OSError):
+            _windows_console_ready = False
+    return _windows_console_ready
+
+
+def is_terminal(stream):
+    """Returns whether `stream` is an interactive terminal that understands escape sequences."""
+    try:
+        if not stream.isatty():
+            return False
+    except (AttributeError, ValueError):  # No isatty, or closed
+        return False
+    return os.name != "nt" or _enable_windows_escapes()
+
+
+def use_color(stream):
+    """Returns whether output to `stream` should be coloured: a terminal, and NO_COLOR unset or empty."""
+    return not os.environ.get("NO_COLOR") and is_terminal(stream)
@@ -0,0 +1,103 @@
+import sys
+import time
+
+from .breaker import CircuitBreaker
+from .cache import FactCache
+from .collector import collect
+from .core import PROBES, VOLATILE_FIELDS, format_fields, format_system_info, system_probes
+from .output import write_snapshot_line
+from .terminal import (
+    CLEAR_SCREEN, CLEAR_TO_END_OF_LINE, CLEAR_TO_END_OF_SCREEN, HIDE_CURSOR, SHOW_CURSOR, is_terminal, use_color,
+)
+
+DEFAULT_INTERVAL = 2.0
+
+
+def _move_to(row):
+    return f"\033[{row};1H"
+
+
+def render_diff(previous, lines):
+    """Returns the escape sequence that turns frame `previous` into `lines`.
+
+    Only rows whose text changed are rewritten; rows left over from a longer
+    previous frame are cleared.
+    """
+    if previous is None:
+        return CLEAR_SCREEN + "\n".join(lines) + "\n"
+    out = []
+    for row, line in enumerate(lines, start=1):
+        if row > len(previous) or previous[row - 1] != line:
+            out.append(f"{_move_to(row)}{line}{CLEAR_TO_END_OF_LINE}")
+    if len(lines) < len(previous):
+        out.append(_move_to(len(lines) + 1) + CLEAR_TO_END_OF_SCREEN)
+    # Park the cursor below the frame
+    out.append(_move_to(len(lines) + 1))
+    return "".join(out)
+
+
+def watch(interval=DEFAULT_INTERVAL, fields=None, max_workers=None, cpu_window=None,
+          use_cache=True, refresh_cache=False, stream=None, ticks=None, output="text",
+          deadline=None, probe_timeout=None, use_breaker=True, io_window=None):
+    """Redraws the report every `interval` seconds until interrupted.
+
+    `fields` restricts the report as in get_system_info. Static fields are
+    collected once; only VOLATILE_FIELDS are re-sampled on later ticks. CPU
+    usage and disk I/O are measured over the time since the previous tick,
+    so no tick sleeps to sample them. `ticks` limits the number of frames.
+    `deadline`, `probe_timeout` and `use_breaker` bound every collection as
+    in get_system_info, so a hung probe shows "timed out" instead of
+    freezing the display. When `stream` is not a terminal (a pipe, a log
+    file), every frame is written in full, without escape sequences.
+    """
+    stream = stream or sys.stdout
+    cache = FactCache(read=not refresh_cache) if use_cache or refresh_cache else None
+    if fields is None:
+        fields = PROBES.fields()
+    fields = [PROBES.resolve(field) for field in fields]
+    volatile_fields = [field for field in fields if field in VOLATILE_FIELDS]
+    volatile_probes = system_probes(volatile_fields, cpu_window, probe_timeout=probe_timeout, io_window=io_window)
+
+    breaker = CircuitBreaker() if use_breaker else None
+    info = collect(system_probes(fields, cpu_window, cache, probe_timeout=probe_timeout, io_window=io_window),
+                   max_workers=max_workers, deadline=deadline, breaker=breaker)
+    if cache is not None:
+        cache.save()
+
+    text = output == "text"
+    terminal = text and is_terminal(stream)
+    color = text and use_color(stream)
+    previous = None
+    frame = 0
+    next_tick = time.monotonic()
+    if terminal:
+        stream.write(HIDE_CURSOR)
+    try:
+        while True:
+            if text:
+                lines = format_system_info(format_fields(info), color=color)
+                if terminal:
+                    stream.write(render_diff(previous, lines))
+                    previous = lines
+                else:
+                    stream.write("\n".join(lines) + "\n\n")
+                stream.flush()
+            else:
+                write_snapshot_line(info, stream)
+
+            frame += 1
+            if ticks is not None and frame >= ticks:
+                break
+            # Fixed schedule, so slow ticks do not make the display drift
+            next_tick += interval
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+            if volatile_probes:
+                info.update(collect(volatile_probes, max_workers=max_workers, deadline=deadline, breaker=breaker))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if breaker is not None:
+            breaker.save()
+        if terminal:
+            stream.write(SHOW_CURSOR)
+            stream.flush()